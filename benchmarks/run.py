@@ -0,0 +1,330 @@
+'''Benchmarks of the hot paths of pynetworks.
+
+Every benchmark runs on seeded random networks, built with the public
+API only, so results of different versions of pynetworks can be
+compared. For every case, the fastest and median wall time, the peak
+memory allocated and the nodes expanded by searches (both measured in a
+separate run) and the hit rate of the path-finding cache are recorded,
+as well as the bytes taken by every node and edge.
+
+Usage::
+
+    python benchmarks/run.py --output new.json
+    python benchmarks/run.py --compare old.json new.json
+
+``--compare`` exits with status 1 if a case got slower by more than
+``--threshold``.
+'''
+
+import argparse
+import contextlib
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+import pynetworks
+from pynetworks import Network, Node, dotgraph, generate_network
+from pynetworks import path_exists, shortest_path
+from pynetworks import shortest_path_through_network
+from pynetworks import shortest_paths_from
+
+SIZES = [(1000, 4), (1000, 32), (10000, 4), (10000, 32)]  # nodes, degree
+QUICK_SIZES = [(200, 4), (200, 32)]
+N_QUERIES = 200
+
+
+def random_network(n_nodes, degree, seed=0):
+    '''Network of ``n_nodes`` nodes with ``degree`` edges per node on
+    average, on a ring so that it's strongly connected.'''
+    rng = random.Random(seed)
+    nodes = [Node(f'Node {i}') for i in range(n_nodes)]
+    for i, node in enumerate(nodes):
+        node.connect(nodes[(i + 1) % n_nodes], rng.randint(1, 10))
+    for _ in range(max(0, n_nodes * degree // 2 - n_nodes)):
+        rng.choice(nodes).connect(rng.choice(nodes), rng.randint(1, 10))
+    return Network(nodes)
+
+
+def random_pairs(network, n_pairs, seed=0):
+    rng = random.Random(seed)
+    nodes = sorted(network, key=lambda node: node.name)
+    return [(rng.choice(nodes), rng.choice(nodes)) for _ in range(n_pairs)]
+
+
+def clear_caches():
+    for func in (shortest_path, path_exists, shortest_path_through_network):
+        if hasattr(func, 'cache_clear'):
+            func.cache_clear()
+        elif hasattr(func, 'cache'):  # before PathCache
+            func.cache.clear()
+
+
+def cases(sizes):
+    '''Yield ``(name, setup, run, cached)``. ``setup()`` returns the
+    argument of ``run``, ``cached`` is the memoized function to report
+    the hit rate of.'''
+    for n_nodes, degree in sizes:
+        size = f'n={n_nodes},degree={degree}'
+
+        def network(n_nodes=n_nodes, degree=degree):
+            return random_network(n_nodes, degree)
+
+        def queries(n_nodes=n_nodes, degree=degree):
+            net = random_network(n_nodes, degree)
+            return random_pairs(net, N_QUERIES)
+
+        def cold_queries(pairs):
+            for start, end in pairs:
+                shortest_path(start, end, save_to_cache=False)
+
+        def warm_queries(pairs):  # every query asked twice
+            for start, end in pairs + pairs:
+                shortest_path(start, end)
+
+        def exists_queries(pairs):
+            for start, end in pairs:
+                path_exists(start, end)
+
+        edge_prob = degree / (n_nodes - 1)
+        yield (f'generate_network[{size}]',
+               lambda: None,
+               lambda _, n=n_nodes, p=edge_prob: generate_network(
+                   n, edge_prob=p), None)
+        yield f'shortest_path.cold[{size}]', queries, cold_queries, None
+        yield (f'shortest_path.warm[{size}]', queries, warm_queries,
+               shortest_path)
+        yield f'path_exists[{size}]', queries, exists_queries, path_exists
+
+        def flaps(net):  # every link fails and comes back, one at a time
+            start = min(net, key=lambda node: node.name)
+            try:  # a tree that repairs itself
+                tree = shortest_paths_from(start, dynamic=True)
+                dynamic = True
+            except TypeError:  # not supported by this version
+                tree = None
+                dynamic = False
+            for edge in net.edges[:N_QUERIES]:
+                edge.node1.disconnect(edge.node2, edge.weight)
+                edge.node1.connect(edge.node2, edge.weight)
+                if not dynamic:
+                    tree = shortest_paths_from(start)
+                tree.distance(edge.node2)
+
+        yield f'link_flaps[{size}]', network, flaps, None
+        yield (f'Network.update[{size}]', network,
+               lambda net: net.update(), None)
+        yield (f'Network.strongly_connected[{size}]', network,
+               lambda net: net.strongly_connected, None)
+        yield f'dotgraph[{size}]', network, str, None
+        yield (f'dotgraph.edges[{size}]', network,
+               lambda net: dotgraph(edges=net.edges), None)
+
+        # point-to-point searches between far-apart nodes of a network
+        # with coordinates
+        def geometric(n_nodes=n_nodes, degree=degree):
+            positions = {}
+            net = pynetworks.generate_geometric_network(
+                n_nodes, math.sqrt(degree / (math.pi * n_nodes)),
+                positions=positions, seed=0)
+            nodes = sorted(net, key=lambda node: (positions[node][0],
+                                                  node.name))
+            pairs = list(zip(nodes[:N_QUERIES // 4],
+                             nodes[-N_QUERIES // 4:][::-1]))
+            return net, positions, pairs
+
+        def point_to_point(algorithm, heuristic=None):
+            def run(args):
+                net, positions, pairs = args
+                guide = None
+                if heuristic == 'euclidean':
+                    guide = pynetworks.euclidean_heuristic(positions)
+                elif heuristic == 'landmarks':
+                    guide = pynetworks.LandmarkHeuristic(net, 8, seed=0)
+                options = {} if guide is None else {'heuristic': guide}
+                for start, end in pairs:
+                    shortest_path(start, end, algorithm=algorithm,
+                                  save_to_cache=False, **options)
+            return run
+
+        for algorithm, heuristic in [('dijkstra', None),
+                                     ('bidirectional', None),
+                                     ('bidirectional', 'euclidean'),
+                                     ('a-star', 'euclidean'),
+                                     ('a-star', 'landmarks')]:
+            label = algorithm + (f',{heuristic}' if heuristic else '')
+            yield (f'shortest_path.geometric[{size},{label}]', geometric,
+                   point_to_point(algorithm, heuristic), None)
+
+    for n_nodes in (8, 11):
+        def tour_network(n_nodes=n_nodes):
+            net = random_network(n_nodes, 3, seed=n_nodes)
+            return min(net, key=lambda node: node.name), net
+
+        yield (f'shortest_path_through_network[n={n_nodes}]', tour_network,
+               lambda args: shortest_path_through_network(*args),
+               shortest_path_through_network)
+
+
+def measure(setup, run, cached, repeat):
+    '''Time ``run(setup())`` ``repeat`` times, with cold caches.'''
+    times = []
+    hits = misses = 0
+    for _ in range(repeat):
+        argument = setup()
+        clear_caches()
+        start = time.perf_counter()
+        run(argument)
+        times.append(time.perf_counter() - start)
+        if cached is not None and hasattr(cached, 'cache_info'):
+            info = cached.cache_info()
+            hits += info.hits
+            misses += info.misses
+
+    argument = setup()
+    clear_caches()
+    collect = getattr(pynetworks, 'collect_stats', None)
+    with collect() if collect else contextlib.nullcontext() as stats:
+        tracemalloc.start()
+        try:
+            run(argument)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    result = {'seconds': min(times), 'median_seconds': statistics.median(
+        times), 'peak_bytes': peak, 'repeat': repeat}
+    if hits + misses:
+        result['cache_hit_rate'] = hits / (hits + misses)
+    if stats is not None and stats.expanded:
+        result['expanded'] = stats.expanded
+    return result
+
+
+def memory(n_nodes, n_edges, seed=0):
+    '''Bytes allocated per node, per edge held by the nodes, and per
+    edge held by a :class:`Network` over them.'''
+    rng = random.Random(seed)
+    tracemalloc.start()
+    try:
+        nodes = [Node(f'Node {i}') for i in range(n_nodes)]
+        with_nodes = tracemalloc.get_traced_memory()[0]
+        for _ in range(n_edges):
+            rng.choice(nodes).connect(rng.choice(nodes), rng.randint(1, 10))
+        with_edges = tracemalloc.get_traced_memory()[0]
+        network = Network(nodes)
+        with_network = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return {'bytes_per_node': with_nodes / n_nodes,
+            'bytes_per_edge': (with_edges - with_nodes) / n_edges,
+            'network_bytes_per_edge': (with_network - with_edges) / n_edges}
+
+
+def run_all(sizes, repeat, selected=None):
+    results = {}
+    for name, setup, run, cached in cases(sizes):
+        if selected and not any(word in name for word in selected):
+            continue
+        try:
+            results[name] = measure(setup, run, cached, repeat)
+        except Exception as error:  # e.g. API missing in older versions
+            results[name] = {'error': f'{type(error).__name__}: {error}'}
+        print(f'{name:50} {format_result(results[name])}', file=sys.stderr)
+    n_nodes, degree = sizes[-1]
+    usage = memory(n_nodes, n_nodes * degree // 2)
+    for name, value in usage.items():
+        print(f'{name:50} {value:10.1f}', file=sys.stderr)
+    return {
+        'pynetworks': pynetworks.__version__,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'numpy': _has_numpy(),
+        'memory': usage,
+        'results': results,
+    }
+
+
+def _has_numpy():
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def format_result(result):
+    if 'error' in result:
+        return result['error']
+    text = (f"{result['seconds'] * 1000:10.2f} ms"
+            f"{result['peak_bytes'] / 2 ** 20:10.2f} MiB")
+    if 'cache_hit_rate' in result:
+        text += f"  hits {result['cache_hit_rate']:.0%}"
+    if 'expanded' in result:
+        text += f"  expanded {result['expanded']}"
+    return text
+
+
+def compare(old, new, threshold):
+    '''Print the speedup of every case in both runs and return the
+    names of the cases that got slower by more than ``threshold``.'''
+    print(f"{'case':50} {old['pynetworks']:>10} {new['pynetworks']:>10}"
+          f" {'ratio':>7}")
+    regressions = []
+    for name, result in new['results'].items():
+        before = old['results'].get(name)
+        if before is None or 'seconds' not in before or (
+                'seconds' not in result):
+            continue
+        ratio = result['seconds'] / before['seconds']
+        flag = ''
+        if ratio > threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:50} {before['seconds'] * 1000:8.2f}ms"
+              f" {result['seconds'] * 1000:8.2f}ms {ratio:7.2f}{flag}")
+    for name, value in new.get('memory', {}).items():
+        before = old.get('memory', {}).get(name)
+        if before:
+            print(f'{name:50} {before:10.1f} {value:10.1f}'
+                  f' {value / before:7.2f}')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--output', '-o', help='write results to this file')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--quick', action='store_true',
+                        help='only run small networks')
+    parser.add_argument('--select', nargs='*',
+                        help='only run cases whose name contains a word')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'),
+                        help='compare two result files instead')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='slowdown ratio reported as a regression')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            old = json.load(f)
+        with open(args.compare[1]) as f:
+            new = json.load(f)
+        return 1 if compare(old, new, args.threshold) else 0
+
+    report = run_all(QUICK_SIZES if args.quick else SIZES, args.repeat,
+                     args.select)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
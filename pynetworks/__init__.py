@@ -8,14 +8,49 @@ nodes using the DOT language for representation.
 from .networks import Edge
 from .networks import Network
 from .networks import Node
-from .networks import generate_network
+from .networks import read_dot
+from .generators import generate_geometric_network
+from .generators import generate_grid_network
+from .generators import generate_network
+from .generators import generate_scale_free_network
+from .frozen import FrozenNetwork
+from .cache import CacheInfo
+from .cache import DiskPathCache
+from .cache import PathCache
 from .dot import dotgraph
 from .dot import escape_dot_id
+from .dot import iter_dot
+from .dot import parse_dot
+from .dot import unescape_dot_id
+from .dot import write_dot
+from .stats import CallStats
+from .stats import SearchStats
+from .stats import add_stats_callback
+from .stats import collect_stats
+from .stats import remove_stats_callback
+from .pathfinding import DynamicShortestPathTree
 from .pathfinding import Path
+from .pathfinding import ShortestPathTree
+from .pathfinding import TourEstimate
+from .pathfinding import approximate_path_through_network
 from .pathfinding import memoize
 from .pathfinding import path_exists
 from .pathfinding import shortest_path
 from .pathfinding import shortest_path_through_network
+from .pathfinding import shortest_paths
+from .pathfinding import shortest_paths_from
+from .heuristics import LandmarkHeuristic
+from .heuristics import euclidean_heuristic
+from .allpairs import DistanceMatrix
+from .allpairs import all_pairs_shortest_paths
+from .storage import load_network
+from .storage import save_network
+from .hierarchy import ContractionHierarchy
+from .hierarchy import build_hierarchy
+from .hierarchy import load_hierarchy
+from .hierarchy import save_hierarchy
+from .parallel import iter_shortest_paths
+from .parallel import parallel_shortest_paths
 
 
 __version__ = "0.6.1"
@@ -23,12 +58,47 @@ __version__ = "0.6.1"
 __all__ = ['Edge',
            'Network',
            'Node',
+           'read_dot',
+           'generate_geometric_network',
+           'generate_grid_network',
            'generate_network',
+           'generate_scale_free_network',
+           'FrozenNetwork',
+           'CacheInfo',
+           'DiskPathCache',
+           'PathCache',
            'dotgraph',
            'escape_dot_id',
+           'iter_dot',
+           'parse_dot',
+           'unescape_dot_id',
+           'write_dot',
+           'CallStats',
+           'SearchStats',
+           'add_stats_callback',
+           'collect_stats',
+           'remove_stats_callback',
+           'DynamicShortestPathTree',
            'Path',
+           'ShortestPathTree',
+           'TourEstimate',
+           'approximate_path_through_network',
            'memoize',
            'path_exists',
            'shortest_path',
-           'shortest_path_through_network'
+           'shortest_path_through_network',
+           'shortest_paths',
+           'shortest_paths_from',
+           'LandmarkHeuristic',
+           'euclidean_heuristic',
+           'DistanceMatrix',
+           'all_pairs_shortest_paths',
+           'load_network',
+           'save_network',
+           'ContractionHierarchy',
+           'build_hierarchy',
+           'load_hierarchy',
+           'save_hierarchy',
+           'iter_shortest_paths',
+           'parallel_shortest_paths',
            ]
@@ -0,0 +1,191 @@
+import bisect
+from array import array
+from .frozen import FrozenNetwork
+from .pathfinding import Path
+from .pathfinding import _csr_dijkstra
+
+try:
+    import numpy
+except ImportError:  # numpy is optional
+    numpy = None
+
+
+class DistanceMatrix:
+    '''Shortest distances between every pair of nodes in a network.
+
+    Use :meth:`all_pairs_shortest_paths` to create one. Paths aren't
+    stored; they are rebuilt from the predecessor matrix on demand.
+
+    Parameters
+    ----------
+    graph : :class:`FrozenNetwork`
+        Snapshot the distances were computed on.
+    distances : 2D numpy array or list of array
+        ``distances[i][j]`` is the weight of the shortest path from
+        node ``i`` to node ``j``, or ``inf`` if there is none.
+    predecessors : 2D numpy array or list of array
+        ``predecessors[i][j]`` is the slot of ``graph`` holding the last
+        edge of the shortest path from node ``i`` to node ``j``, or
+        ``-1`` if there is none.
+
+    Attributes
+    ----------
+    graph
+    distances
+    predecessors
+    nodes : list of :class:`Node`
+        Node of every row and column.
+    '''
+
+    def __init__(self, graph, distances, predecessors):
+        self.graph = graph
+        self.distances = distances
+        self.predecessors = predecessors
+        self.nodes = graph.nodes
+
+    def index(self, node):
+        '''
+        Parameters
+        ----------
+        node : :class:`Node`
+
+        Returns
+        -------
+        int
+            Row and column of ``node``.
+        '''
+        return self.graph.index(node)
+
+    def distance(self, start, end):
+        '''Weight of the shortest path from ``start`` to ``end``.
+
+        Parameters
+        ----------
+        start : :class:`Node`
+        end : :class:`Node`
+
+        Returns
+        -------
+        float
+            ``inf`` if there is no path.
+        '''
+        return float(self.distances[self.index(start)][self.index(end)])
+
+    def path(self, start, end):
+        '''Rebuild the shortest path from ``start`` to ``end``.
+
+        Parameters
+        ----------
+        start : :class:`Node`
+        end : :class:`Node`
+
+        Returns
+        -------
+        :class:`Path` ``None``
+            ``None`` if there is no path.
+        '''
+        source = self.index(start)
+        node = self.index(end)
+        row = self.predecessors[source]
+        if node != source and row[node] == -1:
+            return None
+        slots = []
+        while node != source:
+            slot = int(row[node])
+            slots.append(slot)
+            node = bisect.bisect_right(self.graph.offsets, slot) - 1
+        return Path(self.graph.edge(slot) for slot in reversed(slots))
+
+    def shortest_paths(self, pairs):
+        '''Answer many shortest-path queries at once.
+
+        Parameters
+        ----------
+        pairs : iterable of tuple
+            ``(start, end)`` pairs of :class:`Node` objects.
+
+        Returns
+        -------
+        list of :class:`Path` ``None``
+            Shortest path of every pair, in order.
+        '''
+        return [self.path(start, end) for start, end in pairs]
+
+
+def all_pairs_shortest_paths(network, *, method='auto'):
+    '''Compute the shortest distance between every pair of nodes.
+
+    Parameters
+    ----------
+    network : :class:`Network` :class:`FrozenNetwork`
+    method : {'auto', 'floyd-warshall', 'dijkstra'}, optional
+        ``'floyd-warshall'`` runs a vectorized O(V^3) Floyd-Warshall
+        and needs NumPy. ``'dijkstra'`` runs one O(E log V) Dijkstra per
+        node. ``'auto'`` (the default) picks Floyd-Warshall for small or
+        dense networks when NumPy is installed, Dijkstra otherwise.
+
+    Returns
+    -------
+    :class:`DistanceMatrix`
+
+    Raises
+    ------
+    ValueError
+        If ``method`` is not recognized, or is ``'floyd-warshall'``
+        without NumPy installed.
+
+    Example
+    -------
+    >>> matrix = all_pairs_shortest_paths(network)
+    >>> matrix.path(a, b).weight == matrix.distance(a, b)
+    True
+    '''
+    if method not in ('auto', 'floyd-warshall', 'dijkstra'):
+        raise ValueError(f'unknown method: {method!r}')
+    if method == 'floyd-warshall' and numpy is None:
+        raise ValueError("'floyd-warshall' requires numpy")
+    graph = (network if isinstance(network, FrozenNetwork)
+             else network.freeze())
+    n_nodes = len(graph.nodes)
+    if method == 'auto':
+        dense = len(graph.targets) * 16 >= n_nodes * n_nodes
+        method = ('floyd-warshall' if numpy is not None and n_nodes <= 2048
+                  and (n_nodes <= 256 or dense) else 'dijkstra')
+    if method == 'floyd-warshall':
+        return _floyd_warshall(graph, n_nodes)
+
+    distances = []
+    predecessors = []
+    for source in range(n_nodes):
+        row_distances, row_previous = _csr_dijkstra(graph, source)
+        distances.append(array('d', row_distances))
+        predecessors.append(array('q', row_previous))
+    if numpy is not None:
+        distances = numpy.array(distances).reshape(n_nodes, n_nodes)
+        predecessors = numpy.array(predecessors, dtype=numpy.int64).reshape(
+            n_nodes, n_nodes)
+    return DistanceMatrix(graph, distances, predecessors)
+
+
+def _floyd_warshall(graph, n_nodes):
+    distances = numpy.full((n_nodes, n_nodes), numpy.inf)
+    predecessors = numpy.full((n_nodes, n_nodes), -1, dtype=numpy.int64)
+    offsets = numpy.frombuffer(graph.offsets, dtype=numpy.int64)
+    sources = numpy.repeat(numpy.arange(n_nodes), numpy.diff(offsets))
+    targets = numpy.frombuffer(graph.targets, dtype=numpy.int64)
+    weights = numpy.asarray(graph.weights, dtype=float)  # may hold ints
+    numpy.minimum.at(distances, (sources, targets), weights)
+    lightest = weights == distances[sources, targets]  # of parallel edges
+    predecessors[sources[lightest], targets[lightest]] = numpy.flatnonzero(
+        lightest)
+    diagonal = numpy.arange(n_nodes)
+    distances[diagonal, diagonal] = 0
+    predecessors[diagonal, diagonal] = -1
+
+    for k in range(n_nodes):
+        through = distances[:, k, None] + distances[None, k, :]
+        shorter = through < distances
+        distances = numpy.where(shorter, through, distances)
+        predecessors = numpy.where(shorter, predecessors[None, k, :],
+                                   predecessors)
+    return DistanceMatrix(graph, distances, predecessors)
@@ -0,0 +1,360 @@
+import collections
+import collections.abc
+import json
+import sqlite3
+
+_generation = 0
+_stores = []  # open DiskPathCache objects, consulted by memoize
+
+
+def generation():
+    '''Current graph generation.
+
+    The generation advances every time any :class:`Node` is connected,
+    disconnected, reweighted or isolated. Cached results store the
+    generation they were computed in and expire once it advances.
+
+    Returns
+    -------
+    int
+    '''
+    return _generation
+
+
+def bump_generation():
+    '''Advance the graph generation, expiring every cached result.
+
+    :meth:`Node.connect`, :meth:`Node.disconnect`,
+    :meth:`Node.reweight` and :meth:`Node.isolate` call this
+    themselves.
+    '''
+    global _generation
+    _generation += 1
+
+
+CacheInfo = collections.namedtuple(
+    'CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize'])
+CacheInfo.__doc__ = '''Statistics of a :class:`PathCache`.
+
+Attributes
+----------
+hits : int
+    Lookups answered from the cache.
+misses : int
+    Lookups not in the cache or expired by a graph change.
+evictions : int
+    Entries dropped to stay within ``maxsize``.
+maxsize : int ``None``
+currsize : int
+    Number of entries that haven't expired.
+'''
+
+
+class PathCache(collections.abc.MutableMapping):
+    '''Least-recently-used mapping of path-finding results that expire
+    when the graph changes.
+
+    Every entry is stored with the graph generation (see
+    :meth:`generation`) it was added in, and is treated as missing once
+    any :class:`Node` has been connected, disconnected, reweighted or
+    isolated since.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        Most entries to keep. When full, the least recently used entry
+        is evicted. If left out, the cache is unbounded.
+
+    Attributes
+    ----------
+    maxsize
+    hits : int
+    misses : int
+    evictions : int
+    '''
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict()  # key -> (generation, value)
+
+    def __getitem__(self, key):
+        entry_generation, value = self._entries[key]
+        if entry_generation != _generation:
+            del self._entries[key]
+            raise KeyError(key)
+        self._entries.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._entries[key] = (_generation, value)
+        self._entries.move_to_end(key)
+        if self.maxsize is not None:
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def __delitem__(self, key):
+        del self._entries[key]
+
+    def __iter__(self):
+        self._purge()
+        return iter(list(self._entries))
+
+    def __len__(self):
+        self._purge()
+        return len(self._entries)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({dict(self.items())!r})'
+
+    def _purge(self):
+        stale = [key for key, (entry_generation, _) in self._entries.items()
+                 if entry_generation != _generation]
+        for key in stale:
+            del self._entries[key]
+
+    def lookup(self, key):
+        '''Get the value of ``key``, counting a hit or a miss.
+
+        Parameters
+        ----------
+        key
+
+        Returns
+        -------
+        object
+
+        Raises
+        ------
+        KeyError
+            If ``key`` is missing or has expired.
+        '''
+        try:
+            value = self[key]
+        except KeyError:
+            self.misses += 1
+            raise
+        self.hits += 1
+        return value
+
+    def clear(self):
+        '''Remove all entries and reset the statistics.'''
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def copy(self):
+        '''
+        Returns
+        -------
+        dict
+            The entries that haven't expired.
+        '''
+        return dict(self.items())
+
+    def info(self):
+        '''
+        Returns
+        -------
+        :class:`CacheInfo`
+            Current statistics of this cache.
+        '''
+        return CacheInfo(self.hits, self.misses, self.evictions,
+                         self.maxsize, len(self))
+
+
+class _Unstorable(Exception):
+    pass
+
+
+class DiskPathCache:
+    '''Keep the results of cached path-finding functions about one
+    :class:`Network` in an SQLite file, so they survive restarts.
+
+    While it's open, functions cached by :meth:`memoize` look up
+    results they don't have in memory in the file before computing
+    them, and store what they compute there. Results are filed under
+    the ``fingerprint`` of the network, so they're only used while the
+    network has the same content as when they were computed, and under
+    the names of the nodes of the query, so a new process can use them.
+    Nothing is read until it's needed.
+
+    Queries naming nodes outside the network or options that can't be
+    stored as text (such as a ``heuristic`` or a ``graph``) aren't
+    stored, and neither are results for networks whose node names
+    aren't unique. Nothing is stored either while an edge leads out of
+    the network: searches would follow it, and changes beyond it
+    don't change the fingerprint.
+
+    Parameters
+    ----------
+    file : str or path-like
+        SQLite database, created if missing. Several caches may share
+        one.
+    network : :class:`Network`
+    max_fingerprints : int, optional
+        Most versions of networks to keep results of. Results of the
+        least recently used fingerprints are deleted when a new one is
+        used.
+
+    Attributes
+    ----------
+    network
+    max_fingerprints
+
+    Example
+    -------
+    >>> with DiskPathCache('paths.db', network):
+    ...     tour = shortest_path_through_network(depot, network)
+    '''
+
+    def __init__(self, file, network, *, max_fingerprints=8):
+        self.network = network
+        self.max_fingerprints = max_fingerprints
+        self._connection = sqlite3.connect(str(file))
+        with self._connection:
+            self._connection.executescript('''
+                CREATE TABLE IF NOT EXISTS fingerprints (
+                    fingerprint TEXT PRIMARY KEY, used INTEGER);
+                CREATE TABLE IF NOT EXISTS results (
+                    fingerprint TEXT, query TEXT, result TEXT,
+                    PRIMARY KEY (fingerprint, query));
+            ''')
+        self._fingerprint = None  # that _names were found for
+        self._names = None  # name -> Node, or None if names repeat
+        _stores.append(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self._connection.execute(
+            'SELECT COUNT(*) FROM results WHERE fingerprint = ?',
+            (self.network.fingerprint,)).fetchone()[0]
+
+    def close(self):
+        '''Stop using the file.'''
+        if self in _stores:
+            _stores.remove(self)
+            self._connection.close()
+
+    def clear(self):
+        '''Delete every stored result, of every fingerprint.'''
+        with self._connection:
+            self._connection.execute('DELETE FROM results')
+            self._connection.execute('DELETE FROM fingerprints')
+        self._fingerprint = None
+
+    def collect_garbage(self):
+        '''Delete the results of all but the ``max_fingerprints`` most
+        recently used fingerprints.'''
+        with self._connection:
+            self._connection.execute(
+                '''DELETE FROM fingerprints WHERE fingerprint NOT IN (
+                       SELECT fingerprint FROM fingerprints
+                       ORDER BY used DESC LIMIT ?)''',
+                (self.max_fingerprints,))
+            self._connection.execute(
+                '''DELETE FROM results WHERE fingerprint NOT IN (
+                       SELECT fingerprint FROM fingerprints)''')
+
+    def _load(self, function, key):
+        # Stored result of the call of ``function`` cached under
+        # ``key``, or KeyError.
+        try:
+            fingerprint, query = self._query(function, key)
+        except _Unstorable:
+            raise KeyError(key) from None
+        row = self._connection.execute(
+            'SELECT result FROM results WHERE fingerprint = ? AND query = ?',
+            (fingerprint, query)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return self._decode(json.loads(row[0]), key)
+
+    def _save(self, function, key, result):
+        try:
+            fingerprint, query = self._query(function, key)
+            text = json.dumps(self._encode(result))
+        except (_Unstorable, TypeError, ValueError):
+            return  # e.g. a weight that isn't a number or a string
+        with self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO results VALUES (?, ?, ?)',
+                (fingerprint, query, text))
+
+    def _query(self, function, key):
+        # (fingerprint, text of the query), finding the names again if
+        # the network changed
+        fingerprint = self.network.fingerprint
+        if fingerprint != self._fingerprint:
+            self._use(fingerprint)
+        if self._names is None:
+            raise _Unstorable
+        return fingerprint, json.dumps([function] + [
+            self._encode_argument(value) for value in key])
+
+    def _use(self, fingerprint):
+        members = self.network._members
+        names = {}
+        storable = True
+        for node in members:
+            if names.setdefault(node.name, node) is not node:
+                storable = False
+        for edge in self.network._edges.values():
+            # searches would follow edges the fingerprint doesn't cover
+            if edge.node1 not in members or edge.node2 not in members:
+                storable = False
+        self._names = names if storable else None
+        self._fingerprint = fingerprint
+        with self._connection:
+            self._connection.execute(
+                '''INSERT OR REPLACE INTO fingerprints VALUES (?, (
+                       SELECT COALESCE(MAX(used), 0) + 1
+                       FROM fingerprints))''', (fingerprint,))
+        self.collect_garbage()
+
+    def _encode_argument(self, value):
+        from .networks import Network, Node  # networks imports this module
+        if isinstance(value, Node):
+            if self._names.get(value.name) is not value:
+                raise _Unstorable
+            return {'node': value.name}
+        if isinstance(value, Network):
+            if value is not self.network:
+                raise _Unstorable
+            return {'network': True}
+        if isinstance(value, frozenset):
+            return {'nodes': sorted(self._encode_argument(node)['node']
+                                    for node in value)}
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        raise _Unstorable
+
+    def _encode(self, result):
+        if result is None or isinstance(result, bool):
+            return result
+        return {'path': [[edge.node1.name, edge.node2.name, edge.weight]
+                         for edge in result]}
+
+    def _decode(self, stored, key):
+        from .pathfinding import Path  # pathfinding imports this module
+        if not isinstance(stored, dict):
+            return stored
+        edges = []
+        for name1, name2, weight in stored['path']:
+            node1 = self._names[name1]
+            for edge in node1._adjacency.get(self._names[name2], ()):
+                if edge.weight == weight:
+                    break
+            else:  # only if a weight was changed directly
+                raise KeyError(key)
+            edges.append(edge if edge.node1 is node1 else edge.reverse())
+        return Path(edges)
@@ -0,0 +1,112 @@
+'''Index of the connected component of every :class:`Node`.
+
+Components are kept in a union-find forest stored on the nodes
+themselves and updated in near-constant time by :meth:`Node.connect`.
+Union-find can't split a component, so removing an edge advances a
+global epoch instead. Nodes stamped with an older epoch are re-indexed
+lazily, one component per O(V + E) traversal, the next time they are
+queried.
+'''
+
+_epoch = 0
+
+
+def add(node):
+    '''Index a new :class:`Node` as a component of its own.'''
+    node._parent = node
+    node._rank = 0
+    node._epoch = _epoch
+
+
+def forget(node):
+    '''Drop ``node`` from the index, to be re-indexed with its whole
+    component when next queried. Used when edges are added in bulk.'''
+    node._epoch = -1
+
+
+def _fresh_root(node):
+    # Root of the component of ``node``, or None if it must be rebuilt.
+    if node._epoch != _epoch:
+        return None
+    while node._parent is not node:
+        node._parent = node._parent._parent  # path halving
+        node = node._parent
+    return node if node._epoch == _epoch else None
+
+
+def root(node):
+    '''Representative :class:`Node` of the component of ``node``.
+
+    Two nodes are connected exactly when they have the same root.
+
+    Parameters
+    ----------
+    node : :class:`Node`
+
+    Returns
+    -------
+    :class:`Node`
+    '''
+    found = _fresh_root(node)
+    if found is None:
+        found = _rebuild(node)
+    return found
+
+
+def _rebuild(start):
+    # Iterative traversal of everything reachable from ``start``.
+    start._parent = start
+    start._rank = 1
+    start._epoch = _epoch
+    seen = {start}
+    stack = [start]
+    while stack:
+        node = stack.pop()
+        for other in node._adjacency:
+            if other not in seen:
+                seen.add(other)
+                other._parent = start
+                other._rank = 0
+                other._epoch = _epoch
+                stack.append(other)
+    return start
+
+
+def connected(node1, node2):
+    '''Check if a path joins ``node1`` and ``node2``.
+
+    Parameters
+    ----------
+    node1 : :class:`Node`
+    node2 : :class:`Node`
+
+    Returns
+    -------
+    bool
+    '''
+    return root(node1) is _fresh_root(node2)
+
+
+def union(node1, node2):
+    '''Record a new edge between ``node1`` and ``node2``.'''
+    root1 = _fresh_root(node1)
+    root2 = _fresh_root(node2)
+    if root1 is None or root2 is None:
+        # merging into a stale component: the fresh one is now incomplete
+        for found in (root1, root2):
+            if found is not None:
+                found._epoch = -1
+        return
+    if root1 is root2:
+        return
+    if root1._rank < root2._rank:
+        root1, root2 = root2, root1
+    root2._parent = root1
+    if root1._rank == root2._rank:
+        root1._rank += 1
+
+
+def split():
+    '''Record that an edge was removed, so components may have split.'''
+    global _epoch
+    _epoch += 1
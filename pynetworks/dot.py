@@ -1,5 +1,19 @@
+import bz2
+import gzip
+import lzma
+import os
 import re
 
+_COMPRESSORS = {'gzip': gzip, 'bz2': bz2, 'xz': lzma}
+_SUFFIXES = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz'}
+_CHUNK_LINES = 4096  # lines per chunk yielded by iter_dot()
+
+_ID = R'"((?:[^"\\]|\\.)*)"'
+_HEADER = re.compile(Rf'graph (?:{_ID} )?{{', re.DOTALL)
+_STATEMENT = re.compile(Rf'\t{_ID}(?: -- {_ID}(?: \[label=(.*)\])?)?',
+                        re.DOTALL)
+_ESCAPED = re.compile(R'\\(.)', re.DOTALL)
+
 
 def escape_dot_id(string):
     '''Surround in double quotes and escape all double quotes.
@@ -20,7 +34,7 @@ def escape_dot_id(string):
     '"A\\"B"'
     '''
 
-    return '"' + re.sub(R'([\\"])', R'\\\1', string) + '"'
+    return '"' + string.replace('\\', '\\\\').replace('"', '\\"') + '"'
 
 
 def dotgraph(isolated_nodes=None, edges=None, name=''):
@@ -61,13 +75,226 @@ def dotgraph(isolated_nodes=None, edges=None, name=''):
         "B" -- "C" [label=5]
     }
     '''
-    if isolated_nodes is None:
-        isolated_nodes = []
-    if edges is None:
-        edges = []
-
-    nodes = '\n\t'.join([escape_dot_id(node.name) for node in isolated_nodes])
-    middle = '\n\t' if isolated_nodes and edges else ''
-    edges = '\n\t'.join([edge.dot() for edge in edges])
-    return (f'graph {f"{escape_dot_id(name)} " if name else ""}'
-            f'{{\n\t{nodes}{middle}{edges}\n}}')
+    return ''.join(iter_dot(isolated_nodes, edges, name))
+
+
+def iter_dot(isolated_nodes=None, edges=None, name=''):
+    '''Generate a DOT graph out of nodes and edges in chunks.
+
+    Joining the chunks gives exactly what :meth:`dotgraph` returns, but
+    the nodes and edges are only iterated once and the whole document
+    is never held in memory. Every node's escaped ID is computed once.
+
+    Parameters
+    ----------
+    isolated_nodes : iterable of :class:`Node`, optional
+        Isolated nodes to graph.
+    edges : iterable of :class:`Edge`, optional
+        Edges to graph.
+    name : optional
+        Name of the generated DOT graph.
+
+    Yields
+    ------
+    str
+        Consecutive pieces of the DOT graph.
+    '''
+    escaped = {}
+
+    def escape(node):
+        try:
+            return escaped[node]
+        except KeyError:
+            escaped[node] = escape_dot_id(node.name)
+            return escaped[node]
+
+    chunk = [f'graph {f"{escape_dot_id(name)} " if name else ""}{{']
+    empty = True
+    for node in isolated_nodes or ():
+        chunk.append('\n\t' + escape(node))
+        if len(chunk) >= _CHUNK_LINES:
+            yield ''.join(chunk)
+            chunk.clear()
+        empty = False
+    for edge in edges or ():
+        line = f'\n\t{escape(edge.node1)} -- {escape(edge.node2)}'
+        if edge.weight is not None:
+            line += f' [label={edge.weight}]'
+        chunk.append(line)
+        if len(chunk) >= _CHUNK_LINES:
+            yield ''.join(chunk)
+            chunk.clear()
+        empty = False
+    chunk.append('\n\t\n}' if empty else '\n}')
+    yield ''.join(chunk)
+
+
+def write_dot(file, isolated_nodes=None, edges=None, name='',
+              compression=None):
+    '''Stream a DOT graph out of nodes and edges to a file.
+
+    The written text is exactly what :meth:`dotgraph` returns, produced
+    chunk by chunk with :meth:`iter_dot`.
+
+    Parameters
+    ----------
+    file : str, path-like or file object
+        Path to write to, or an open file. Open files must be in text
+        mode, or in binary mode if ``compression`` is given.
+    isolated_nodes : iterable of :class:`Node`, optional
+        Isolated nodes to graph.
+    edges : iterable of :class:`Edge`, optional
+        Edges to graph.
+    name : optional
+        Name of the written DOT graph.
+    compression : {'gzip', 'bz2', 'xz'}, optional
+        Compress the output. For paths, it's guessed from a ``.gz``,
+        ``.bz2`` or ``.xz`` suffix if left out.
+
+    Raises
+    ------
+    ValueError
+        If ``compression`` is not recognized.
+
+    Example
+    -------
+    >>> write_dot('network.dot.gz', edges=network.edges)
+    '''
+    if compression is None and not hasattr(file, 'write'):
+        compression = _SUFFIXES.get(os.path.splitext(file)[1])
+    if compression is None:
+        if hasattr(file, 'write'):
+            file.writelines(iter_dot(isolated_nodes, edges, name))
+            return
+        opened = open(file, 'w', encoding='utf8')
+    elif compression in _COMPRESSORS:
+        opened = _COMPRESSORS[compression].open(file, 'wt', encoding='utf8')
+    else:
+        raise ValueError(f'unknown compression: {compression!r}')
+    with opened:
+        opened.writelines(iter_dot(isolated_nodes, edges, name))
+
+
+def unescape_dot_id(string):
+    '''Undo :meth:`escape_dot_id` on the text between the quotes.
+
+    Parameters
+    ----------
+    string : str
+        Escaped ID, without its surrounding double quotes.
+
+    Returns
+    -------
+    str
+
+    Example
+    -------
+    >>> unescape_dot_id('A\\\\"B')
+    'A"B'
+    '''
+    if '\\' not in string:
+        return string
+    return _ESCAPED.sub(R'\1', string)
+
+
+def parse_dot(file, compression=None):
+    '''Parse the DOT graphs written by :meth:`dotgraph`, line by line.
+
+    Only the undirected dialect :meth:`dotgraph` produces is supported:
+    one isolated node or one edge per line, with an optional
+    ``[label=...]`` weight. The text is read incrementally, so it is
+    never held in memory as a whole.
+
+    Parameters
+    ----------
+    file : str, path-like or file object
+        Path to read, or an open text or binary file, including a
+        :class:`mmap.mmap`.
+    compression : {'gzip', 'bz2', 'xz'}, optional
+        Decompress the input. For paths, it's guessed from a ``.gz``,
+        ``.bz2`` or ``.xz`` suffix if left out.
+
+    Yields
+    ------
+    tuple
+        First ``('graph', name)``, then ``('node', name)`` for every
+        isolated node and ``('edge', name1, name2, weight)`` for every
+        edge, in order. Weights are converted to ``int`` or ``float``
+        when that gives back the same text, otherwise they are left as
+        ``str``; a missing label gives ``None``.
+
+    Raises
+    ------
+    ValueError
+        If the text isn't in the supported dialect.
+    '''
+    lines = _read_lines(file, compression)
+    try:
+        header = next(lines).rstrip('\n')
+        match = _HEADER.fullmatch(header)
+        if match is None:
+            raise ValueError(f'invalid DOT header: {header!r}')
+        yield 'graph', unescape_dot_id(match.group(1) or '')
+
+        pending = None  # statement with a newline inside an ID
+        for line in lines:
+            if line.endswith('\n'):
+                line = line[:-1]
+            if pending is not None:
+                line = pending + '\n' + line
+                pending = None
+            if line == '}':
+                return
+            if line == '\t':
+                continue  # empty graph
+            match = _STATEMENT.fullmatch(line)
+            if match is None:
+                if _ESCAPED.sub('', line).count('"') % 2:
+                    pending = line  # an ID continues on the next line
+                    continue
+                raise ValueError(f'invalid DOT statement: {line!r}')
+            name1, name2, label = match.groups()
+            if '\\' in line:
+                name1 = unescape_dot_id(name1)
+                name2 = name2 and unescape_dot_id(name2)
+            if name2 is None:
+                yield 'node', name1
+            else:
+                yield ('edge', name1, name2,
+                       None if label is None else _parse_weight(label))
+        raise ValueError('DOT graph is missing its closing brace')
+    finally:
+        lines.close()
+
+
+def _parse_weight(text):
+    for kind in (int, float):
+        try:
+            weight = kind(text)
+        except ValueError:
+            continue
+        if str(weight) == text:
+            return weight
+    return text
+
+
+def _read_lines(file, compression):
+    if compression is None and not hasattr(file, 'readline'):
+        compression = _SUFFIXES.get(os.path.splitext(file)[1])
+    if compression is not None and compression not in _COMPRESSORS:
+        raise ValueError(f'unknown compression: {compression!r}')
+    if compression is not None:
+        with _COMPRESSORS[compression].open(file, 'rt',
+                                            encoding='utf8') as opened:
+            yield from opened
+    elif not hasattr(file, 'readline'):
+        with open(file, encoding='utf8') as opened:
+            yield from opened
+    else:
+        for line in iter(file.readline, ''):
+            if isinstance(line, str):
+                yield line
+            elif line:
+                yield line.decode('utf8')
+            else:
+                return  # end of a binary file
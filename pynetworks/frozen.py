@@ -0,0 +1,220 @@
+import bisect
+import collections.abc
+import itertools
+from array import array
+
+
+class FrozenNetwork:
+    '''Immutable, array-backed snapshot of a :class:`Network`.
+
+    Every :class:`Node` is given a dense integer id and adjacency is
+    stored in compressed-sparse-row form: the edges leaving node ``i``
+    occupy the slots ``offsets[i]`` up to ``offsets[i + 1]`` of
+    ``targets`` and ``weights``. Path-finding functions accept a
+    :class:`FrozenNetwork` through their ``graph`` parameter (or in
+    place of a network) and only map results back to :class:`Node` and
+    :class:`Edge` objects at the end.
+
+    Use :meth:`Network.freeze` to create one. Later changes to the
+    network aren't reflected in the snapshot.
+
+    Parameters
+    ----------
+    nodes : list of :class:`Node` ``None``
+        Node of every id. The first ``n_members`` belong to the frozen
+        network, the rest are outside nodes connected to it. If
+        ``None``, a new :class:`Node` is made from ``names`` the first
+        time each id is used.
+    offsets : array of int
+        ``len(nodes) + 1`` offsets into ``targets`` and ``weights``.
+    targets : array of int
+        Id of the far node of every edge slot.
+    weights : array of numerical
+        Weight of every edge slot.
+    edges : list of :class:`Edge`, optional
+        Original :class:`Edge` of every slot, in either direction. If
+        left out, a new :class:`Edge` is made whenever a slot is looked
+        up.
+    n_members : int, optional
+        Number of nodes that belong to the frozen network. All of them
+        if left out.
+    name : str, optional
+        Name of the frozen network.
+    names : sequence of str, optional
+        Name of every id, required when ``nodes`` is ``None``.
+
+    Attributes
+    ----------
+    nodes
+    offsets
+    targets
+    weights
+    name
+
+    Example
+    -------
+    >>> frozen = network.freeze()
+    >>> shortest_path(a, b, graph=frozen) == shortest_path(a, b)
+    True
+    '''
+
+    def __init__(self, nodes, offsets, targets, weights, edges=None,
+                 n_members=None, name='', names=None):
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.name = name
+        self._edges = edges
+        self._names = names
+        self._ids = None  # name -> id, built by node()
+        if nodes is None:
+            self._index = {}
+            self.nodes = _LazyNodes(names, self._index)
+        else:
+            self._index = {node: i for i, node in enumerate(nodes)}
+            self.nodes = nodes
+        self._n_members = (len(self.nodes) if n_members is None
+                           else n_members)
+
+    @classmethod
+    def from_network(cls, network):
+        '''Snapshot ``network``.
+
+        Outside nodes reachable through edges of ``network`` are
+        included too, so that paths found on the snapshot match the
+        paths found on the network itself.
+
+        Parameters
+        ----------
+        network : :class:`Network`
+            Network with numerical edge weights.
+
+        Returns
+        -------
+        :class:`FrozenNetwork`
+        '''
+        nodes = list(network)
+        n_members = len(nodes)
+        index = {node: i for i, node in enumerate(nodes)}
+        offsets = array('q', [0])
+        targets = array('q')
+        weights = array('d')
+        edges = []
+        i = 0
+        while i < len(nodes):  # nodes grows as outside nodes are found
+            for other, shared in nodes[i]._adjacency.items():
+                if other not in index:
+                    index[other] = len(nodes)
+                    nodes.append(other)
+                for edge in shared:
+                    targets.append(index[other])
+                    weights.append(edge.weight)
+                    edges.append(edge)  # oriented by edge()
+            offsets.append(len(targets))
+            i += 1
+        return cls(nodes, offsets, targets, weights, edges, n_members,
+                   network.name)
+
+    def __len__(self):
+        return self._n_members
+
+    def __iter__(self):
+        return itertools.islice(self.nodes, self._n_members)
+
+    def __contains__(self, node):
+        return self._index.get(node, self._n_members) < self._n_members
+
+    @property
+    def all_nodes(self):
+        '''All nodes in the frozen network.
+
+        :type: set
+        '''
+        return set(self)
+
+    def index(self, node):
+        '''
+        Parameters
+        ----------
+        node : :class:`Node`
+
+        Returns
+        -------
+        int
+            Id of ``node`` in this snapshot.
+
+        Raises
+        ------
+        KeyError
+            If ``node`` isn't in this snapshot.
+        '''
+        return self._index[node]
+
+    def node(self, name):
+        '''
+        Parameters
+        ----------
+        name : str
+
+        Returns
+        -------
+        :class:`Node`
+            Node called ``name``, the one with the lowest id if several
+            share it.
+
+        Raises
+        ------
+        KeyError
+            If no node is called ``name``.
+        '''
+        if self._ids is None:
+            names = (self._names if self._names is not None
+                     else [node.name for node in self.nodes])
+            self._ids = {}
+            for i, node_name in enumerate(names):
+                self._ids.setdefault(node_name, i)
+        return self.nodes[self._ids[name]]
+
+    def edge(self, slot):
+        '''
+        Parameters
+        ----------
+        slot : int
+            Index into ``targets`` and ``weights``.
+
+        Returns
+        -------
+        :class:`Edge`
+            The edge stored in ``slot``.
+        '''
+        tail = self.nodes[bisect.bisect_right(self.offsets, slot) - 1]
+        if self._edges is not None:
+            edge = self._edges[slot]
+            return edge if edge.node1 is tail else edge.reverse()
+        from .networks import Edge  # networks imports this module
+        return Edge(tail, self.nodes[self.targets[slot]], self.weights[slot])
+
+
+class _LazyNodes(collections.abc.Sequence):
+    # Node of every id of a FrozenNetwork, made on first use and
+    # registered in ``index`` so that ids can be looked up again.
+
+    def __init__(self, names, index):
+        self._names = names
+        self._index = index
+        self._made = {}  # id -> Node
+
+    def __len__(self):
+        return len(self._names)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        node = self._made.get(i)
+        if node is None:
+            from .networks import Node  # networks imports this module
+            node = self._made[i] = Node(self._names[i])
+            self._index[node] = i
+        return node
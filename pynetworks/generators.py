@@ -0,0 +1,270 @@
+'''Random networks for testing and benchmarking.
+
+Every generator takes time proportional to the number of nodes and
+edges it makes, so networks of millions of nodes can be generated. The
+nodes are linked in bulk, without the bookkeeping of
+:meth:`Node.connect`, and connectivity is repaired with a union-find
+over node indices. Pass ``seed`` to get the same network every time.
+'''
+
+import math
+import random
+from .networks import Network
+from .networks import Node
+from .networks import _finish_bulk
+from .networks import _gc_paused
+
+
+def generate_network(n_nodes=10, lower_bound=1, upper_bound=11,
+                     edge_prob=0.8, strongly_connected=True, *, seed=None):
+    '''Create a :class:`Network` of  :class:`Node` objects.
+
+    Every pair of nodes is connected with probability ``edge_prob``.
+    Pairs are picked by geometric skip sampling, so this takes
+    O(n_nodes + edges) time however sparse the network is.
+
+    Parameters
+    ----------
+    n_nodes : int, optional
+        Number of nodes in the returned network.
+    lower_bound : int, optional
+        Lower bound (inclusive) of range of edges' weights.
+    upper_bound : int, optional
+        Upper bound (exclusive) for range of edges' weights.
+    edge_prob : float, optional
+        Probability betweeen 0 and 1 of any two nodes being connected.
+        If ``strongly_connected`` is set to ``True``, ``edge_prob``
+        may be overridden to ensure a strongly connected network.
+    strongly_connected : bool
+        If ``False``, output does not need to be a strongly connected
+        network.
+    seed : int, optional
+        Seed of the random numbers, for a reproducible network.
+
+    Returns
+    -------
+    :class:`Network`
+        A network ``n_nodes`` interconnected :class:`Node` objects.
+
+    Raises
+    ------
+    ValueError
+        If ``edge_prob`` isn't between 0 and 1.
+    '''
+    if not 0 <= edge_prob <= 1:
+        raise ValueError(f'edge_prob must be between 0 and 1: {edge_prob}')
+    rng = random.Random(seed)
+    n_nodes = int(n_nodes)
+    return _build([f'Node {i}' for i in range(n_nodes)],
+                  _pairs(n_nodes, edge_prob, rng),
+                  _random_weight(rng, lower_bound, upper_bound),
+                  rng if strongly_connected else None)
+
+
+def _pairs(n_nodes, probability, rng):
+    # Every pair (v, w) with w < v, each kept with ``probability``, by
+    # skipping a geometrically distributed number of pairs at a time
+    # (Batagelj and Brandes, 2005).
+    if probability == 0:
+        return
+    if probability == 1:
+        for v in range(n_nodes):
+            for w in range(v):
+                yield v, w
+        return
+    log_q = math.log(1 - probability)
+    v, w = 1, -1
+    while v < n_nodes:
+        w += 1 + int(math.log(1 - rng.random()) / log_q)
+        while w >= v and v < n_nodes:
+            w -= v
+            v += 1
+        if v < n_nodes:
+            yield v, w
+
+
+def generate_grid_network(rows, columns, lower_bound=1, upper_bound=11, *,
+                          seed=None):
+    '''Create a :class:`Network` shaped like a rectangular grid, where
+    every node is connected to the nodes above, below and beside it.
+
+    Parameters
+    ----------
+    rows : int
+    columns : int
+    lower_bound : int, optional
+        Lower bound (inclusive) of range of edges' weights.
+    upper_bound : int, optional
+        Upper bound (exclusive) for range of edges' weights.
+    seed : int, optional
+        Seed of the random weights, for a reproducible network.
+
+    Returns
+    -------
+    :class:`Network`
+        Network of ``rows * columns`` nodes called ``'Node row,column'``.
+    '''
+    rng = random.Random(seed)
+
+    def links():
+        for row in range(rows):
+            for column in range(columns):
+                i = row * columns + column
+                if column + 1 < columns:
+                    yield i, i + 1
+                if row + 1 < rows:
+                    yield i, i + columns
+
+    return _build([f'Node {row},{column}' for row in range(rows)
+                   for column in range(columns)],
+                  links(), _random_weight(rng, lower_bound, upper_bound))
+
+
+def generate_scale_free_network(n_nodes, n_links=2, lower_bound=1,
+                                upper_bound=11, *, seed=None):
+    '''Create a scale-free :class:`Network` by preferential attachment
+    (the Barabási-Albert model).
+
+    Nodes are added one at a time and connected to ``n_links`` earlier
+    nodes, picked with probability proportional to their degree. A few
+    hubs end up with most of the edges, as in many real networks.
+
+    Parameters
+    ----------
+    n_nodes : int
+    n_links : int, optional
+        Number of edges from every new node.
+    lower_bound : int, optional
+        Lower bound (inclusive) of range of edges' weights.
+    upper_bound : int, optional
+        Upper bound (exclusive) for range of edges' weights.
+    seed : int, optional
+        Seed of the random numbers, for a reproducible network.
+
+    Returns
+    -------
+    :class:`Network`
+        A strongly connected network of ``n_nodes`` nodes.
+
+    Raises
+    ------
+    ValueError
+        If ``n_links`` is less than 1.
+    '''
+    if n_links < 1:
+        raise ValueError(f'n_links must be at least 1: {n_links}')
+    rng = random.Random(seed)
+
+    def links():
+        targets = list(range(min(n_links, n_nodes)))
+        ends = []  # every node once per edge it has
+        for new in range(len(targets), n_nodes):
+            for target in targets:
+                yield new, target
+            ends.extend(targets)
+            ends.extend([new] * len(targets))
+            targets = []
+            while len(targets) < n_links:
+                target = rng.choice(ends)
+                if target not in targets:
+                    targets.append(target)
+
+    return _build([f'Node {i}' for i in range(n_nodes)], links(),
+                  _random_weight(rng, lower_bound, upper_bound), rng)
+
+
+def generate_geometric_network(n_nodes, radius, strongly_connected=True, *,
+                               positions=None, seed=None):
+    '''Create a random geometric :class:`Network`.
+
+    Nodes are scattered uniformly over the unit square and every two
+    nodes closer than ``radius`` are connected, weighted by their
+    distance. This models road and sensor networks, where edges are
+    short and weights obey the triangle inequality.
+
+    Parameters
+    ----------
+    n_nodes : int
+    radius : float
+        Longest distance between connected nodes.
+    strongly_connected : bool, optional
+        If ``False``, output does not need to be a strongly connected
+        network. Otherwise, longer edges may be added.
+    positions : dict, optional
+        Filled with the ``(x, y)`` coordinates of every :class:`Node`.
+    seed : int, optional
+        Seed of the random numbers, for a reproducible network.
+
+    Returns
+    -------
+    :class:`Network`
+    '''
+    rng = random.Random(seed)
+    points = [(rng.random(), rng.random()) for _ in range(n_nodes)]
+    cells = {}  # square cells of side ``radius``
+    for i, (x, y) in enumerate(points):
+        cells.setdefault((int(x / radius), int(y / radius)), []).append(i)
+
+    def distance(i, j):
+        return math.hypot(points[i][0] - points[j][0],
+                          points[i][1] - points[j][1])
+
+    def links():
+        for (cell_x, cell_y), members in cells.items():
+            for k, i in enumerate(members):
+                for j in members[k + 1:]:
+                    if distance(i, j) <= radius:
+                        yield i, j
+            # each pair of neighbouring cells is compared once
+            for dx, dy in ((1, -1), (1, 0), (1, 1), (0, 1)):
+                for j in cells.get((cell_x + dx, cell_y + dy), ()):
+                    for i in members:
+                        if distance(i, j) <= radius:
+                            yield i, j
+
+    network = _build([f'Node {i}' for i in range(n_nodes)], links(),
+                     distance, rng if strongly_connected else None)
+    if positions is not None:
+        # members are tracked in the order of ``points``, unlike the set
+        # iterated by the network
+        positions.update(zip(network._members, points))
+    return network
+
+
+def _random_weight(rng, lower_bound, upper_bound):
+    def weight(i, j):
+        return rng.randrange(lower_bound, upper_bound)
+    return weight
+
+
+def _build(names, links, weight, rng=None):
+    # Network of a new Node per name, linked by the (i, j) index pairs
+    # in ``links`` with weight(i, j). If ``rng`` is given, every
+    # component is joined to the one of node 0 by an edge to a random
+    # earlier node.
+    network = Network()
+    edges = network._edges
+    parents = list(range(len(names))) if rng is not None else None
+
+    def root(i):
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]  # path halving
+            i = parents[i]
+        return i
+
+    def link(i, j):
+        edge = nodes[i]._link(nodes[j], weight(i, j))
+        edges[id(edge)] = edge
+        if parents is not None:
+            parents[root(i)] = root(j)
+
+    with _gc_paused():
+        nodes = [Node(name) for name in names]
+        for i, j in links:
+            link(i, j)
+        if rng is not None:
+            for i in range(1, len(nodes)):
+                if root(i) != root(0):
+                    link(i, rng.randrange(i))
+        _finish_bulk(network, nodes, nodes)
+    return network
@@ -0,0 +1,134 @@
+'''Lower bounds of path weights, to guide the ``'a-star'`` and
+``'bidirectional'`` searches of :meth:`shortest_path`.
+
+A heuristic is any callable ``heuristic(node, target)`` returning a
+lower bound of the weight of the shortest path between ``node`` and
+``target``. Both heuristics here are also consistent: the bound from a
+node is never more than the weight of one of its edges plus the bound
+from the other end of that edge.
+'''
+
+import math
+import random
+from .pathfinding import _dijkstra
+
+
+def euclidean_heuristic(positions, scale=1):
+    '''Bound path weights by the straight-line distance between nodes.
+
+    Only valid if every :class:`Edge` weighs at least ``scale`` times
+    the distance between its nodes, e.g. for networks made by
+    :meth:`generate_geometric_network`, or road networks weighted by
+    length.
+
+    Parameters
+    ----------
+    positions : dict
+        Coordinates of every :class:`Node`, as sequences of the same
+        length, e.g. ``(x, y)`` tuples.
+    scale : numerical, optional
+        Least weight per unit of distance, e.g. ``1 / top_speed`` for
+        networks weighted by travel time.
+
+    Returns
+    -------
+    callable
+
+    Example
+    -------
+    >>> positions = {}
+    >>> network = generate_geometric_network(1000, 0.05, positions=positions)
+    >>> shortest_path(a, b, algorithm='a-star',
+    ...               heuristic=euclidean_heuristic(positions))
+    Path(...)
+    '''
+    def heuristic(node, target):
+        return scale * math.dist(positions[node], positions[target])
+    return heuristic
+
+
+class LandmarkHeuristic:
+    '''Bound path weights with the triangle inequality over distances
+    to a few landmark nodes (ALT).
+
+    The distance from every landmark to every node is computed once,
+    so this works for any network with non-negative weights. The bound
+    is tightest for queries heading away from or towards a landmark,
+    which is why landmarks are picked far apart, on the edges of the
+    network.
+
+    Parameters
+    ----------
+    network : :class:`Network` :class:`FrozenNetwork`
+    n_landmarks : int, optional
+        Number of landmarks to pick, each far from the ones before.
+        Ignored if ``landmarks`` is given.
+    landmarks : iterable of :class:`Node`, optional
+        Landmarks to use instead of picking them.
+    seed : int, optional
+        Seed of the random node the landmarks are picked from.
+
+    Attributes
+    ----------
+    landmarks : list of :class:`Node`
+
+    Note
+    ----
+    Bounds are only valid for the weights at the time this heuristic was
+    made. Make a new one after changing the network.
+
+    Example
+    -------
+    >>> heuristic = LandmarkHeuristic(network, 16)
+    >>> shortest_path(a, b, algorithm='bidirectional', heuristic=heuristic)
+    Path(...)
+    '''
+
+    def __init__(self, network, n_landmarks=8, *, landmarks=None,
+                 seed=None):
+        self.landmarks = []
+        self._distances = []  # per landmark: node -> distance
+        if landmarks is not None:
+            for landmark in landmarks:
+                self._add(landmark)
+            return
+
+        nodes = sorted(network, key=lambda node: node.name)
+        if not nodes:
+            return
+        inf = float('inf')
+        # farthest from a random node first, then farthest from the
+        # nearest landmark; unreachable nodes count as infinitely far,
+        # so every component gets a landmark
+        reference = _dijkstra(random.Random(seed).choice(nodes))[0]
+        nearest = [reference.get(node, inf) for node in nodes]
+        for _ in range(min(n_landmarks, len(nodes))):
+            i = max(range(len(nodes)), key=nearest.__getitem__)
+            if self.landmarks and not nearest[i]:
+                break  # every node is a landmark
+            distances = self._add(nodes[i])
+            nearest = [distances.get(node, inf) if len(self.landmarks) == 1
+                       else min(distance, distances.get(node, inf))
+                       for node, distance in zip(nodes, nearest)]
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({len(self.landmarks)} landmarks)'
+
+    def __call__(self, node, target):
+        bound = 0
+        for distances in self._distances:
+            try:
+                difference = distances[node] - distances[target]
+            except KeyError:  # landmark in another component
+                continue
+            if difference > bound:
+                bound = difference
+            elif -difference > bound:
+                bound = -difference
+        return bound
+
+    def _add(self, landmark):
+        distances = _dijkstra(landmark)[0]
+        self.landmarks.append(landmark)
+        self._distances.append(distances)
+        return distances
@@ -0,0 +1,464 @@
+'''Contraction hierarchies, to answer many shortest-path queries on a
+network that rarely changes.
+
+Preprocessing contracts the nodes one at a time, least important first:
+a contracted node is taken out of the network, and a shortcut is added
+between two of its neighbours wherever the only shortest path between
+them went through it. A query then searches from both ends at once,
+only ever moving to more important nodes, so it settles a few hundred
+nodes even on huge networks (Geisberger et al., 2008).
+'''
+
+import bisect
+import heapq
+import struct
+from array import array
+from . import stats
+from .frozen import FrozenNetwork
+from .pathfinding import Path
+from .storage import _array_view
+from .storage import _little
+from .storage import _open
+from .storage import _parse
+from .storage import _sections
+from .storage import _typed_weights
+from .storage import _write
+
+_MAGIC = b'PYNETCH\x00'
+_VERSION = 1
+# magic, version, weight typecode, nodes, upward slots, network file bytes
+_HEADER = struct.Struct('<8sI1s3xQQQ')
+
+
+class ContractionHierarchy:
+    '''Preprocessed :class:`FrozenNetwork` answering shortest-path
+    queries with two small upward searches.
+
+    Use :meth:`build_hierarchy` to create one, and
+    :meth:`save_hierarchy` and :meth:`load_hierarchy` to keep it.
+
+    Every node id keeps the edges and shortcuts to more important
+    neighbours, in compressed-sparse-row form like in
+    :class:`FrozenNetwork`: they occupy the slots ``offsets[i]`` up to
+    ``offsets[i + 1]`` of the other arrays.
+
+    Parameters
+    ----------
+    graph : :class:`FrozenNetwork`
+        Network the hierarchy was built from.
+    offsets : array of int
+        ``len(graph.nodes) + 1`` offsets into the other arrays.
+    targets : array of int
+        Id of the more important end of every upward slot.
+    weights : array of numerical
+        Weight of every upward slot.
+    originals : array of int
+        Slot of ``graph`` holding the edge of every upward slot that
+        isn't a shortcut.
+    firsts : array of int
+        For shortcuts, the upward slot from the contracted node to the
+        less important end, or ``-1`` for edges.
+    seconds : array of int
+        For shortcuts, the upward slot from the contracted node to the
+        more important end, or ``-1`` for edges.
+
+    Attributes
+    ----------
+    graph
+    offsets
+    targets
+    weights
+
+    Example
+    -------
+    >>> hierarchy = build_hierarchy(network)
+    >>> hierarchy.shortest_path(a, b) == shortest_path(a, b)
+    True
+    '''
+
+    def __init__(self, graph, offsets, targets, weights, originals, firsts,
+                 seconds):
+        self.graph = graph
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self._originals = originals
+        self._firsts = firsts
+        self._seconds = seconds
+
+    def __repr__(self):
+        return (f'<{self.__class__.__name__} of {len(self.graph)} nodes, '
+                f'{self.n_shortcuts} shortcuts>')
+
+    @property
+    def n_shortcuts(self):
+        '''Number of shortcuts added by preprocessing.
+
+        :type: int
+        '''
+        return len(self._firsts) - list(self._firsts).count(-1)
+
+    def distance(self, start, end):
+        '''Weight of the shortest path between ``start`` and ``end``.
+
+        Parameters
+        ----------
+        start : :class:`Node`
+        end : :class:`Node`
+
+        Returns
+        -------
+        numerical
+            ``float('inf')`` if there is no path.
+
+        Raises
+        ------
+        KeyError
+            If ``start`` or ``end`` isn't in ``graph``.
+        '''
+        return self._search(self.graph.index(start),
+                            self.graph.index(end))[0]
+
+    def shortest_path(self, start, end):
+        '''Find the shortest path between ``start`` and ``end``.
+
+        Parameters
+        ----------
+        start : :class:`Node`
+        end : :class:`Node`
+
+        Returns
+        -------
+        :class:`Path` ``None``
+            Path of the original edges, with every shortcut unpacked,
+            or ``None`` if there is no path.
+
+        Raises
+        ------
+        KeyError
+            If ``start`` or ``end`` isn't in ``graph``.
+        '''
+        source = self.graph.index(start)
+        target = self.graph.index(end)
+        best, meeting, parents = self._search(source, target)
+        if meeting is None:
+            return None
+        slots = []
+        node = meeting
+        while node != source:
+            slot, node = parents[0][node]
+            slots.append(slot)
+        path = Path()
+        for slot in reversed(slots):
+            path.extend(self._unpack(slot, True))
+        node = meeting
+        while node != target:
+            slot, node = parents[1][node]
+            path.extend(self._unpack(slot, False))
+        return path
+
+    def _search(self, source, target):
+        # Dijkstra upwards from both ends. Each side stops once it can't
+        # improve the best meeting node. ``parents`` map every reached
+        # id to its upward slot and the id the slot belongs to.
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        inf = float('inf')
+        distances = ({source: 0}, {target: 0})
+        parents = ({}, {})
+        heaps = ([(0, source)], [(0, target)])
+        best = inf
+        meeting = None
+        settled = 0
+        while heaps[0] or heaps[1]:
+            side = 0 if heaps[0] and (not heaps[1] or heaps[0][0][0]
+                                      <= heaps[1][0][0]) else 1
+            heap = heaps[side]
+            distance, node = heapq.heappop(heap)
+            if distance >= best:
+                heap.clear()  # nothing left on this side can do better
+                continue
+            if distance > distances[side][node]:
+                continue  # stale heap entry
+            settled += 1
+            other = distances[1 - side].get(node)
+            if other is not None and distance + other < best:
+                best = distance + other
+                meeting = node
+            reached = distances[side]
+            for slot in range(offsets[node], offsets[node + 1]):
+                neighbour = targets[slot]
+                new_distance = distance + weights[slot]
+                if new_distance < reached.get(neighbour, inf):
+                    reached[neighbour] = new_distance
+                    parents[side][neighbour] = (slot, node)
+                    heapq.heappush(heap, (new_distance, neighbour))
+        if stats._enabled:
+            stats._count(settled)
+        return best, meeting, parents
+
+    def _unpack(self, slot, forward):
+        # Original edges of an upward slot, in order from the id it
+        # belongs to if ``forward``, or towards it otherwise. A shortcut
+        # replaced the path from the less important end, through the
+        # contracted node, to the more important end.
+        stack = [(slot, forward)]
+        while stack:
+            slot, forward = stack.pop()
+            first = self._firsts[slot]
+            if first == -1:
+                original = self._originals[slot]
+                edge = self.graph.edge(original)
+                tail = bisect.bisect_right(self.graph.offsets, original) - 1
+                owner = bisect.bisect_right(self.offsets, slot) - 1
+                yield edge if (tail == owner) == forward else edge.reverse()
+            elif forward:
+                stack.append((self._seconds[slot], True))
+                stack.append((first, False))
+            else:
+                stack.append((first, True))
+                stack.append((self._seconds[slot], False))
+
+
+def build_hierarchy(network, *, witness_limit=50):
+    '''Preprocess ``network`` into a :class:`ContractionHierarchy`.
+
+    Nodes are contracted in order of twice the number of shortcuts they
+    need minus the edges they remove, plus the number of their
+    neighbours already contracted, which spreads contractions evenly.
+    Building takes about two seconds per thousand nodes of a sparse
+    network, so it pays off when many queries follow.
+
+    Parameters
+    ----------
+    network : :class:`Network` :class:`FrozenNetwork`
+        Network with non-negative numerical edge weights.
+    witness_limit : int, optional
+        Most nodes settled while looking for a path that makes a
+        shortcut unnecessary. Higher limits add fewer shortcuts but
+        take longer.
+
+    Returns
+    -------
+    :class:`ContractionHierarchy`
+        Later changes to ``network`` aren't reflected in it.
+
+    Raises
+    ------
+    TypeError
+        If an edge weight isn't numerical.
+    '''
+    graph = (network if isinstance(network, FrozenNetwork)
+             else network.freeze())
+    n_nodes = len(graph.offsets) - 1
+    inf = float('inf')
+
+    # Undirected arcs between remaining nodes: edges, then shortcuts.
+    arc_ends = []
+    arc_weights = []
+    arc_originals = []  # slot of graph, or -1
+    arc_children = []  # (arc to the first end, arc to the second end)
+    # per remaining node: neighbour -> weight and neighbour -> arc of the
+    # lightest arc between them
+    adjacency = [{} for _ in range(n_nodes)]
+    arcs = [{} for _ in range(n_nodes)]
+
+    def add_arc(a, b, weight, original=-1, children=None):
+        arcs[a][b] = arcs[b][a] = len(arc_weights)
+        adjacency[a][b] = adjacency[b][a] = weight
+        arc_ends.append((a, b))
+        arc_weights.append(weight)
+        arc_originals.append(original)
+        arc_children.append(children)
+
+    offsets, targets = graph.offsets, graph.targets
+    weights = _typed_weights(graph)  # as in graph, including ints
+    for a in range(n_nodes):
+        for slot in range(offsets[a], offsets[a + 1]):
+            b = targets[slot]
+            if b == a:
+                continue  # self-loops are never on a shortest path
+            if weights[slot] < adjacency[a].get(b, inf):
+                add_arc(a, b, weights[slot], slot)
+
+    def witnesses(source, avoid, limit, ends):
+        # Distances of paths from ``source`` not through ``avoid``,
+        # searched until ``ends`` are settled or ``limit`` is passed.
+        distances = {source: 0}
+        get = distances.get
+        heap = [(0, source)]
+        left = len(ends)
+        settled = 0
+        while heap and settled < witness_limit:
+            distance, node = heapq.heappop(heap)
+            if distance > distances[node]:
+                continue
+            settled += 1
+            if node in ends:
+                left -= 1
+                if not left:
+                    break
+            for neighbour, weight in adjacency[node].items():
+                new_distance = distance + weight
+                if (new_distance <= limit and neighbour != avoid
+                        and new_distance < get(neighbour, inf)):
+                    distances[neighbour] = new_distance
+                    heapq.heappush(heap, (new_distance, neighbour))
+        return distances
+
+    def shortcuts(node):
+        # (a, b, weight) of every shortcut needed to contract ``node``
+        needed = []
+        neighbours = list(adjacency[node].items())
+        for k, (a, weight_a) in enumerate(neighbours[:-1]):
+            direct = adjacency[a]
+            # pairs not already joined by a light enough arc
+            ends = {b: weight_a + weight_b
+                    for b, weight_b in neighbours[k + 1:]
+                    if direct.get(b, inf) > weight_a + weight_b}
+            if not ends:
+                continue
+            distances = witnesses(a, node, max(ends.values()), ends)
+            needed.extend((a, b, weight) for b, weight in ends.items()
+                          if distances.get(b, inf) > weight)
+        return needed
+
+    contracted_neighbours = [0] * n_nodes
+    upward = [None] * n_nodes  # arcs to neighbours contracted later
+
+    def priority(node, needed):
+        return (2 * (len(needed) - len(adjacency[node]))
+                + contracted_neighbours[node])
+
+    queue = [(priority(node, shortcuts(node)), node)
+             for node in range(n_nodes)]
+    heapq.heapify(queue)
+    while queue:
+        _, node = heapq.heappop(queue)
+        needed = shortcuts(node)
+        current = priority(node, needed)
+        if queue and current > queue[0][0]:  # lazy update
+            heapq.heappush(queue, (current, node))
+            continue
+        for a, b, weight in needed:
+            if weight < adjacency[a].get(b, inf):
+                add_arc(a, b, weight,
+                        children=(arcs[node][a], arcs[node][b]))
+        upward[node] = list(arcs[node].items())
+        for neighbour in adjacency[node]:
+            del adjacency[neighbour][node]
+            del arcs[neighbour][node]
+            contracted_neighbours[neighbour] += 1
+        adjacency[node] = arcs[node] = None
+
+    up_offsets = array('q', [0])
+    up_targets = array('q')
+    up_weights = array(weights.typecode)
+    up_originals = array('q')
+    slot_of = {}  # arc -> upward slot
+    owners = []
+    for node in range(n_nodes):
+        for neighbour, arc in upward[node]:
+            slot_of[arc] = len(up_targets)
+            up_targets.append(neighbour)
+            up_weights.append(arc_weights[arc])
+            up_originals.append(arc_originals[arc])
+            owners.append((node, arc))
+        up_offsets.append(len(up_targets))
+    up_firsts = array('q')
+    up_seconds = array('q')
+    for node, arc in owners:
+        children = arc_children[arc]
+        if children is None:
+            up_firsts.append(-1)
+            up_seconds.append(-1)
+            continue
+        if arc_ends[arc][0] != node:
+            children = children[::-1]
+        up_firsts.append(slot_of[children[0]])
+        up_seconds.append(slot_of[children[1]])
+    return ContractionHierarchy(graph, up_offsets, up_targets, up_weights,
+                                up_originals, up_firsts, up_seconds)
+
+
+def save_hierarchy(hierarchy, file):
+    '''Write a :class:`ContractionHierarchy` and its network to a binary
+    file that :meth:`load_hierarchy` can memory-map.
+
+    Parameters
+    ----------
+    hierarchy : :class:`ContractionHierarchy`
+    file : str or path-like or binary file object
+    '''
+    network = _sections(hierarchy.graph)
+    weights = hierarchy.weights
+    weights = array(getattr(weights, 'typecode', None) or weights.format,
+                    weights)  # arrays, or memoryviews of a loaded file
+    header = _HEADER.pack(_MAGIC, _VERSION, weights.typecode.encode(),
+                          len(hierarchy.offsets) - 1,
+                          len(hierarchy.targets),
+                          sum(len(section) for section in network))
+    _write([header,
+            _little(array('q', hierarchy.offsets)),
+            _little(array('q', hierarchy.targets)),
+            _little(weights),
+            _little(array('q', hierarchy._originals)),
+            _little(array('q', hierarchy._firsts)),
+            _little(array('q', hierarchy._seconds))] + network, file)
+
+
+def load_hierarchy(file, *, use_mmap=True):
+    '''Open a file written by :meth:`save_hierarchy`.
+
+    Like :meth:`load_network`, the file is memory-mapped, and nodes and
+    edges are only made when they're looked up.
+
+    Parameters
+    ----------
+    file : str or path-like or binary file object
+    use_mmap : bool, optional
+        Read the whole file into memory instead of mapping it if
+        ``False``.
+
+    Returns
+    -------
+    :class:`ContractionHierarchy`
+        Its ``graph`` is loaded as by :meth:`load_network`.
+
+    Raises
+    ------
+    ValueError
+        If ``file`` isn't a hierarchy file, or was written by a newer
+        version of this package.
+
+    Example
+    -------
+    >>> save_hierarchy(build_hierarchy(network), 'network.ch')
+    >>> hierarchy = load_hierarchy('network.ch')
+    >>> graph = hierarchy.graph
+    >>> hierarchy.shortest_path(graph.node('a'), graph.node('b'))
+    '''
+    view = _open(file, use_mmap)
+    if len(view) < _HEADER.size:
+        raise ValueError('not a hierarchy file: too short')
+    (magic, version, typecode, n_nodes, n_slots,
+     n_network_bytes) = _HEADER.unpack_from(view)
+    if magic != _MAGIC:
+        raise ValueError('not a hierarchy file')
+    if version > _VERSION:
+        raise ValueError(f'unsupported hierarchy file version: {version}')
+    typecode = typecode.decode()
+    if typecode not in ('q', 'd'):
+        raise ValueError(f'unknown weight type: {typecode!r}')
+    if len(view) != (_HEADER.size + 8 * (n_nodes + 1 + 5 * n_slots)
+                     + n_network_bytes):
+        raise ValueError('hierarchy file is truncated or corrupt')
+
+    position = _HEADER.size
+    sections = []
+    for typecode_, length in (('q', n_nodes + 1), ('q', n_slots),
+                              (typecode, n_slots), ('q', n_slots),
+                              ('q', n_slots), ('q', n_slots)):
+        end = position + 8 * length
+        sections.append(_array_view(view[position:end], typecode_))
+        position = end
+    return ContractionHierarchy(_parse(view[position:]), *sections)
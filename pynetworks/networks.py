@@ -1,8 +1,16 @@
-import random
+import contextlib
+import gc
+import hashlib
+import numbers
+import weakref
 import pyperclip
+from . import components
+from .cache import bump_generation
 from .dot import dotgraph
 from .dot import escape_dot_id
-from .pathfinding import path_exists
+from .dot import parse_dot
+from .dot import write_dot
+from .frozen import FrozenNetwork
 
 
 class Node:
@@ -31,22 +39,61 @@ class Node:
         list of edges containing this :class:`Node`.
     '''
 
+    __slots__ = ('name', '_adjacency', '_incident', '_degree', '_networks',
+                 '_parent', '_rank', '_epoch', '__weakref__')
+
     def __init__(self, name):
         self.name = str(name)
-        self.edges = []
+        # neighbour -> tuple of edges between self and that neighbour,
+        # usually just one. Both ends share the same Edge, oriented as
+        # connected.
+        self._adjacency = {}
+        self._incident = {}  # id -> Edge, in the order they were connected
+        self._degree = 0
+        self._networks = None  # weak references to networks tracking self
+        components.add(self)
+
+    def __getstate__(self):
+        # networks and the component index are rebuilt, not pickled
+        return (self.name, self._adjacency, list(self._incident.values()),
+                self._degree)
+
+    def __setstate__(self, state):
+        self.name, self._adjacency, incident, self._degree = state
+        self._incident = {id(edge): edge for edge in incident}
+        self._networks = None
+        components.add(self)
+        components.forget(self)  # neighbours may not be unpickled yet
 
     def __str__(self):
-        if self.edges:
+        if self._degree:
             return dotgraph(edges=self.edges)
         return dotgraph(isolated_nodes=[self])
 
+    @property
+    def edges(self):
+        '''List of edges containing this :class:`Node`, with this
+        :class:`Node` as ``node1``.
+
+        :type: list of :class:`Edge`
+        '''
+        edges = []
+        for edge in self._incident.values():
+            if edge.node1 is not self:
+                edges.append(_ReversedEdge(edge))
+            elif edge.node2 is self:
+                edges += (edge, edge)  # a self-loop, seen from both ends
+            else:
+                edges.append(edge)
+        return edges
+
     @property
     def degree(self):
         '''Deegree of this node (number of outgoing edges).
 
         :type: int
         '''
-        return len(self.edges)
+        return self._degree
 
     def connect(self, other, weight=None):
         '''Add :class:`Edge` between ``self`` and ``other`` with
@@ -57,8 +104,24 @@ class Node:
         other : :class:`Node`
         weight : numerical, optional
         '''
-        self.edges.append(Edge(self, other, weight))
-        other.edges.append(Edge(other, self, weight))
+        edge = self._link(other, weight)
+        components.union(self, other)
+        bump_generation()
+        for network in self._networks_with(other):
+            network._add_edge(edge)
+        if _watchers:
+            _changed(edge, float('inf'), weight)
+
+    def _link(self, other, weight):
+        # Store an edge in both nodes, without notifying anything.
+        edge = Edge(self, other, weight)
+        self._adjacency[other] = self._adjacency.get(other, ()) + (edge,)
+        other._adjacency[self] = other._adjacency.get(self, ()) + (edge,)
+        self._incident[id(edge)] = edge
+        other._incident[id(edge)] = edge
+        self._degree += 1
+        other._degree += 1
+        return edge
 
     def disconnect(self, other, weight=None):
         '''Remove :class:`Edge` between ``self`` and ``other``
@@ -68,13 +131,144 @@ class Node:
         ----------
         other : :class:`Node`
         weight : numerical, optional
+
+        Raises
+        ------
+        ValueError
+            If no such :class:`Edge` exists.
         '''
-        self.edges.remove(Edge(self, other, weight))
-        other.edges.remove(Edge(other, self, weight))
+        for edge in self._adjacency.get(other, ()):
+            if edge.weight == weight:
+                break
+        else:
+            raise ValueError(f'{Edge(self, other, weight)!r} not in edges')
+        for node, neighbour in ((self, other), (other, self)):
+            edges = node._adjacency[neighbour]
+            i = next(i for i, found in enumerate(edges) if found is edge)
+            if len(edges) == 1:
+                del node._adjacency[neighbour]
+            else:
+                node._adjacency[neighbour] = edges[:i] + edges[i + 1:]
+            node._incident.pop(id(edge), None)
+            node._degree -= 1
+        components.split()
+        bump_generation()
+        for network in self._networks_with(other):
+            network._remove_edge(edge)
+        if _watchers:
+            _changed(edge, edge.weight, float('inf'))
+
+    def reweight(self, other, weight, old_weight=None):
+        '''Change the weight of the :class:`Edge` between ``self`` and
+        ``other`` in place.
+
+        The edge is shared by both nodes and every :class:`Network`, so
+        they all see the new weight. Trees kept up to date by
+        :meth:`shortest_paths_from` are repaired where the change
+        affects them.
+
+        Parameters
+        ----------
+        other : :class:`Node`
+        weight : numerical
+            New weight.
+        old_weight : numerical, optional
+            Current weight of the edge to change, if several edges join
+            ``self`` and ``other``. The oldest one is changed if left
+            out.
+
+        Raises
+        ------
+        ValueError
+            If no such :class:`Edge` exists.
+        '''
+        for edge in self._adjacency.get(other, ()):
+            if old_weight is None or edge.weight == old_weight:
+                break
+        else:
+            raise ValueError(
+                f'{Edge(self, other, old_weight)!r} not in edges')
+        old_weight = edge.weight
+        edge.weight = weight
+        bump_generation()
+        for network in self._networks_with(other):
+            network._reweight_edge(edge, old_weight)
+        if _watchers:
+            _changed(edge, old_weight, weight)
 
     def isolate(self):
         '''Disconnect from all connected :class:`Node` objects.'''
-        self.edges = []
+        adjacency = self._adjacency
+        self._adjacency = {}
+        self._incident = {}
+        self._degree = 0
+        components.split()
+        bump_generation()
+        for other, edges in adjacency.items():
+            if other is self:
+                edges = edges[::2]  # each self-loop is stored twice
+            else:
+                other._degree -= len(other._adjacency.pop(self))
+                for edge in edges:
+                    del other._incident[id(edge)]
+            for network in self._networks_with(other):
+                for edge in edges:
+                    network._remove_edge(edge)
+            if _watchers:
+                for edge in edges:
+                    _changed(edge, edge.weight, float('inf'))
+
+    def _networks_with(self, other):
+        # networks tracking either end of an edge between self and other
+        networks = []
+        for node in (self, other) if other is not self else (self,):
+            if not node._networks:
+                continue
+            dead = False
+            for reference in node._networks:
+                network = reference()
+                if network is None:
+                    dead = True
+                elif network not in networks:
+                    networks.append(network)
+            if dead:
+                node._networks = [reference for reference in node._networks
+                                  if reference() is not None]
+        return networks
+
+    def is_connected(self, other):
+        '''Check if an :class:`Edge` joins ``self`` and ``other``.
+
+        Parameters
+        ----------
+        other : :class:`Node`
+
+        Returns
+        -------
+        bool
+        '''
+        return other in self._adjacency
+
+    def weight_to(self, other):
+        '''Weight of the :class:`Edge` joining ``self`` and ``other``.
+
+        If several edges join them, the weight of the oldest one is
+        returned.
+
+        Parameters
+        ----------
+        other : :class:`Node`
+
+        Returns
+        -------
+        numerical
+
+        Raises
+        ------
+        KeyError
+            If ``self`` and ``other`` aren't connected.
+        '''
+        return self._adjacency[other][0].weight
 
     def copy_to_clipboard(self):
         '''Copy the DOT language representation of this :class:`Node`
@@ -102,11 +296,20 @@ class Edge:
     weight
     '''
 
+    __slots__ = ('node1', 'node2', 'weight')
+
     def __init__(self, node1, node2, weight=None):
         self.node1 = node1
         self.node2 = node2
         self.weight = weight
 
+    def __getstate__(self):
+        # slots only pickle by themselves with protocol 2 or later
+        return self.node1, self.node2, self.weight
+
+    def __setstate__(self, state):
+        self.node1, self.node2, self.weight = state
+
     def __repr__(self):
         return (f'{self.__class__.__name__}({self.node1!r}, {self.node2!r}'
                 f'{f", {self.weight!r}" if self.weight else ""})')
@@ -115,7 +318,7 @@ class Edge:
         return dotgraph(edges=[self])
 
     def __hash__(self):
-        return hash(self.node1) ^ hash(self.node2) ^ hash(self.weight)
+        return hash((self.node1, self.node2, self.weight))
 
     def __eq__(self, other):
         return (self.node1, self.node2, self.weight) == (other.node1,
@@ -129,8 +332,10 @@ class Edge:
         :class:`Edge`
             A :class:`Edge` with the same ``node1``, ``node2``,
             and ``weight`` but with ``node1`` and ``node2`` swapped.
+            It's a view of this :class:`Edge`, so it shares its
+            ``weight``.
         '''
-        return Edge(self.node2, self.node1, self.weight)
+        return _ReversedEdge(self)
 
     def dot(self):
         '''
@@ -152,6 +357,42 @@ class Edge:
         pyperclip.copy(str(self))
 
 
+class _ReversedEdge(Edge):
+    # An Edge seen from its node2. Every connection is stored as a single
+    # Edge shared by both nodes; Node.edges presents it through this view
+    # from the other end.
+
+    __slots__ = ('_edge',)
+
+    def __init__(self, edge):
+        self._edge = edge
+
+    @property
+    def node1(self):
+        return self._edge.node2
+
+    @property
+    def node2(self):
+        return self._edge.node1
+
+    @property
+    def weight(self):
+        return self._edge.weight
+
+    @weight.setter
+    def weight(self, weight):
+        self._edge.weight = weight
+
+    def __repr__(self):
+        return repr(Edge(self.node1, self.node2, self.weight))
+
+    def __reduce__(self):
+        return _ReversedEdge, (self._edge,)
+
+    def reverse(self):
+        return self._edge
+
+
 class Network:
     '''Contain a network of interconnected :class:`Node` objects.
 
@@ -167,23 +408,83 @@ class Network:
     ----------
     all_nodes
     name
-    edges : list
-        All edges in this :class:`Network`.
-    isolated_nodes : set
-        All nodes with no edges.
+
+    Note
+    ----
+    ``edges``, ``isolated_nodes`` and ``fingerprint`` follow changes
+    made through :meth:`Node.connect`, :meth:`Node.disconnect`,
+    :meth:`Node.reweight` and :meth:`Node.isolate`. Call :meth:`update`
+    after changing ``all_nodes`` directly.
     '''
 
     def __init__(self, all_nodes=None, name=None):
-        self.all_nodes = set(all_nodes) if all_nodes is not None else set()
+        all_nodes = list(all_nodes) if all_nodes is not None else []
+        self.all_nodes = set(all_nodes)
         self.name = str(name) if name is not None else ''
-        self.update()  # set self.isolated_nodes and self.edges
+        self._members = {}  # insertion-ordered set of tracked nodes
+        # id -> Edge, an insertion-ordered set of the shared Edge of
+        # every connection
+        self._edges = {}
+        self._isolated = {}  # insertion-ordered set of isolated members
+        self._digest = None  # fingerprint as an int, once computed
+        self._track(all_nodes)  # keep the given order
+        self.update()  # set isolated nodes and edges
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # edges are keyed by id, which changes with every copy
+        self._edges = {id(edge): edge for edge in self._edges.values()}
+        # nodes don't pickle the networks tracking them
+        members, self._members = self._members, {}
+        self._track(members)
 
     def __str__(self):
-        return dotgraph(self.isolated_nodes, self.edges, self.name)
+        return dotgraph(self._isolated, self._iter_edges(), self.name)
 
     def __iter__(self):
         yield from self.all_nodes
 
+    @property
+    def edges(self):
+        '''All edges in this :class:`Network`, each connection once.
+
+        :type: list of :class:`Edge`
+        '''
+        return list(self._iter_edges())
+
+    def _iter_edges(self):
+        return iter(self._edges.values())
+
+    @property
+    def isolated_nodes(self):
+        '''All nodes with no edges.
+
+        :type: set of :class:`Node`
+        '''
+        return set(self._isolated)
+
+    @property
+    def fingerprint(self):
+        '''Hash of the names of the nodes and of the ends and weights of
+        the edges of this network, the same in every process.
+
+        Networks with equal content have equal fingerprints, whatever
+        order they were built in. It's computed in full the first time
+        it's read and then kept up to date one edge at a time, so it can
+        be read after every change. Names of nodes are expected not to
+        change.
+
+        :type: str
+        '''
+        if self._digest is None:
+            digest = 0
+            for node in self._members:
+                digest += _hash_of(b'node', node.name)
+            for edge in self._edges.values():
+                digest += _edge_hash(edge, edge.weight)
+            self._digest = digest % _DIGEST_SIZE
+        return f'{self._digest:032x}'
+
     @property
     def strongly_connected(self):
         '''``True`` if every node in this network has a path to every
@@ -191,30 +492,102 @@ class Network:
 
         :type: bool
         '''
-        node_a = random.sample(self, 1)[0]
-        others = self - {node_a}
-        for node in others:
-            if not path_exists(node_a, node):
-                return False
-        return True
+        roots = {components.root(node) for node in self.all_nodes}
+        return len(roots) <= 1
 
     def update(self):
-        '''Update ``edges`` and ``isolated_nodes``, to be used
-        when :class:`Node` objects in this network have changed.
+        '''Rebuild ``edges`` and ``isolated_nodes`` from scratch, to be
+        used after ``all_nodes`` has been changed directly.
         '''
-        self.isolated_nodes = set()
-        self.edges = []
-        seen = set()  # store reverses of seen edges
-        for node in self.all_nodes:
-            if node.edges:
-                for con in node.edges:
-                    if con.reverse() in seen:
-                        # just node2 of an already-stored edge --> ignore
-                        continue
-                    self.edges.append(con)
-                    seen.add(con)
-            else:
-                self.isolated_nodes.add(node)
+        removed = [node for node in self._members
+                   if node not in self.all_nodes]
+        for node in removed:
+            del self._members[node]
+            node._networks.remove(weakref.ref(self))
+        n_members = len(self._members)
+        self._track(self.all_nodes)
+        if removed or len(self._members) != n_members:
+            bump_generation()  # results about this network are stale
+
+        self._edges = {}
+        self._isolated = {}
+        self._digest = None
+        seen = set()
+        for node in self._members:
+            if not node.degree:
+                self._isolated[node] = None
+                continue
+            for other, edges in node._adjacency.items():
+                if other is node:
+                    edges = edges[::2]  # each self-loop is stored twice
+                elif other in seen:
+                    continue  # already stored from the other end
+                for edge in edges:
+                    self._edges[id(edge)] = edge
+            seen.add(node)
+
+    def _track(self, nodes):
+        reference = weakref.ref(self)
+        for node in nodes:
+            if node in self._members:
+                continue
+            self._members[node] = None
+            references = node._networks
+            if references is None:
+                node._networks = [reference]
+                continue
+            references.append(reference)
+            # drop references to dead networks whenever the list doubles,
+            # so it stays within twice the number of live networks
+            if len(references) >= 8 and not len(references) & (
+                    len(references) - 1):
+                references[:] = [reference for reference in references
+                                 if reference() is not None]
+
+    def _add_edge(self, edge):
+        self._edges[id(edge)] = edge
+        self._isolated.pop(edge.node1, None)
+        self._isolated.pop(edge.node2, None)
+        if self._digest is not None:
+            self._digest = (self._digest + _edge_hash(edge, edge.weight)
+                            ) % _DIGEST_SIZE
+
+    def _remove_edge(self, edge):
+        if (self._edges.pop(id(edge), None) is not None
+                and self._digest is not None):
+            self._digest = (self._digest - _edge_hash(edge, edge.weight)
+                            ) % _DIGEST_SIZE
+        for node in (edge.node1, edge.node2):
+            if not node.degree and node in self._members:
+                self._isolated[node] = None
+
+    def _reweight_edge(self, edge, old_weight):
+        if id(edge) in self._edges and self._digest is not None:
+            self._digest = (self._digest - _edge_hash(edge, old_weight)
+                            + _edge_hash(edge, edge.weight)) % _DIGEST_SIZE
+
+    def write_dot(self, file, compression=None):
+        '''Stream the DOT language representation of this
+        :class:`Network` to a file, without building it in memory.
+
+        Parameters
+        ----------
+        file : str, path-like or file object
+            Path to write to, or an open file.
+        compression : {'gzip', 'bz2', 'xz'}, optional
+            Compress the output. See :meth:`write_dot`.
+        '''
+        write_dot(file, self._isolated, self._iter_edges(), self.name,
+                  compression)
+
+    def freeze(self):
+        '''Take an immutable, array-backed snapshot of this network.
+
+        Returns
+        -------
+        :class:`FrozenNetwork`
+        '''
+        return FrozenNetwork.from_network(self)
 
     def copy_to_clipboard(self):
         '''Copy the DOT language representation of this :class:`Network`
@@ -222,47 +595,118 @@ class Network:
         pyperclip.copy(str(self))
 
 
-def generate_network(n_nodes=10, lower_bound=1, upper_bound=11,
-                     edge_prob=0.8, strongly_connected=True):
-    '''Create a :class:`Network` of  :class:`Node` objects.
+def read_dot(file, compression=None):
+    '''Load a :class:`Network` from a DOT graph written by
+    :meth:`dotgraph`, :meth:`write_dot` or :meth:`Network.write_dot`.
+
+    The text is parsed incrementally with :meth:`parse_dot` and the
+    network is built in bulk, so ``str()`` of the returned network
+    gives back the same text.
 
     Parameters
     ----------
-    n_nodes : int, optional
-        Number of nodes in the returned network.
-    lower_bound : int, optional
-        Lower bound (inclusive) of range of edges' weights.
-    upper_bound : int, optional
-        Upper bound (exclusive) for range of edges' weights.
-    edges_prob : float, optional
-        Probability betweeen 0 and 1 of any two nodes being connected.
-        If ``strongly_connected`` is set to ``True``, ``edges_prob``
-        may be overridden to ensure a strongly connected network.
-    strongly_connected : bool
-        If ``False``, output does not need to be a strongly connected
-        network.
+    file : str, path-like or file object
+        Path to read, or an open text or binary file, including a
+        :class:`mmap.mmap`.
+    compression : {'gzip', 'bz2', 'xz'}, optional
+        Decompress the input. For paths, it's guessed from a ``.gz``,
+        ``.bz2`` or ``.xz`` suffix if left out.
 
     Returns
     -------
     :class:`Network`
-        A network ``n_nodes`` interconnected :class:`Node` objects.
-    '''
+        Network of new :class:`Node` objects, one per distinct name.
+
+    Raises
+    ------
+    ValueError
+        If the text isn't in the dialect written by :meth:`dotgraph`.
 
-    nodes = {Node(f'Node {i}') for i in range(int(n_nodes))}
-    done = set()
-
-    for cur_node in nodes:
-        done.add(cur_node)
-        for other_node in nodes:
-            if other_node not in done and random.random() < edge_prob:
-                cur_node.connect(other_node, random.randint(
-                    lower_bound, upper_bound - 1))
-    if strongly_connected:  # all nodes in our network must reach all others
-        node_a = random.sample(done, 1)[0]
-        others = done - {node_a}
-        for node in others:
-            if not path_exists(node_a, node, save_to_cache=False):
-                node.connect(node_a, random.randint(
-                    lower_bound, upper_bound - 1))
-
-    return Network(done)
+    Example
+    -------
+    >>> network.write_dot('network.dot')
+    >>> str(read_dot('network.dot')) == str(network)
+    True
+    '''
+    statements = parse_dot(file, compression)
+    network = Network(name=next(statements)[1])
+    nodes = {}
+    isolated = []
+    edges = network._edges
+    with _gc_paused():
+        for statement in statements:
+            if statement[0] == 'node':
+                node = nodes.get(statement[1])
+                if node is None:
+                    node = nodes[statement[1]] = Node(statement[1])
+                isolated.append(node)
+                continue
+            _, name1, name2, weight = statement
+            node1 = nodes.get(name1)
+            if node1 is None:
+                node1 = nodes[name1] = Node(name1)
+            node2 = nodes.get(name2)
+            if node2 is None:
+                node2 = nodes[name2] = Node(name2)
+            edge = node1._link(node2, weight)
+            edges[id(edge)] = edge
+        _finish_bulk(network, nodes.values(), isolated)
+    return network
+
+
+_DIGEST_SIZE = 2 ** 128
+
+
+def _hash_of(kind, *values):
+    # 128-bit hash of ``values``, each written with its length so that
+    # no two different lists of values hash the same text. Fingerprints
+    # add these up, modulo _DIGEST_SIZE, so element order doesn't matter.
+    text = ''.join(f'{len(value)}:{value}' for value in map(str, values))
+    return int.from_bytes(hashlib.blake2b(
+        kind + text.encode('utf-8', 'surrogatepass'),
+        digest_size=16).digest(), 'big')
+
+
+def _edge_hash(edge, weight):
+    # undirected, so the names are sorted
+    return _hash_of(b'edge', *sorted((edge.node1.name, edge.node2.name)),
+                    repr(weight))
+
+
+# id -> object told about every edge change through its
+# _edge_changed(edge, old_weight, new_weight) method. An added edge had
+# an infinite old weight, and a removed one has an infinite new weight.
+_watchers = weakref.WeakValueDictionary()
+
+
+def _changed(edge, old_weight, new_weight):
+    if not (isinstance(old_weight, numbers.Real)
+            and isinstance(new_weight, numbers.Real)):
+        return  # unweighted edges can't be on a weighted shortest path
+    for watcher in list(_watchers.values()):
+        watcher._edge_changed(edge, old_weight, new_weight)
+
+
+@contextlib.contextmanager
+def _gc_paused():
+    # Building millions of nodes and edges makes no garbage cycles, but
+    # would trigger many slow collections.
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def _finish_bulk(network, nodes, isolated):
+    # Register ``nodes``, linked with Node._link and whose edges were
+    # added to ``network._edges`` directly, as the members of
+    # ``network``. ``isolated`` are the members to list as isolated if
+    # they have no edges.
+    for node in nodes:
+        components.forget(node)  # indexed when first queried
+    network.all_nodes = set(nodes)
+    network._track(nodes)
+    network._isolated = {node: None for node in isolated if not node.degree}
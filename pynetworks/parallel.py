@@ -0,0 +1,145 @@
+'''Path-finding spread over a pool of worker processes.
+
+The network is written once with :meth:`save_network` and every worker
+memory-maps the file with :meth:`load_network`, so the operating system
+shares one copy of the graph between all processes and nothing but
+node ids and edge slots are sent between them.
+'''
+
+import multiprocessing
+import os
+import tempfile
+from .frozen import FrozenNetwork
+from .pathfinding import Path
+from .pathfinding import _csr_dijkstra
+from .pathfinding import _csr_slots
+from .storage import load_network
+from .storage import save_network
+
+_graph = None  # FrozenNetwork of a worker process
+
+
+def _init_worker(file):
+    global _graph
+    _graph = load_network(file)
+
+
+def parallel_shortest_paths(pairs, network, *, workers=None,
+                            chunksize=256, file=None):
+    '''Answer many shortest-path queries with a pool of processes.
+
+    Parameters
+    ----------
+    pairs : iterable of tuple
+        ``(start, end)`` pairs of :class:`Node` objects of ``network``.
+    network : :class:`Network` :class:`FrozenNetwork`
+    workers : int, optional
+        Number of worker processes. One per CPU if left out. With one
+        worker, queries are answered in this process.
+    chunksize : int, optional
+        Number of queries sent to a worker at a time. Queries of a chunk
+        that share a start are answered from one search.
+    file : str or path-like, optional
+        File written by :meth:`save_network` for ``network``, so it
+        doesn't have to be written again. A temporary file is used if
+        left out.
+
+    Returns
+    -------
+    list of :class:`Path` ``None``
+        Shortest path of every pair, in order.
+
+    Raises
+    ------
+    KeyError
+        If a node of ``pairs`` isn't in ``network``.
+
+    Example
+    -------
+    >>> paths = parallel_shortest_paths(queries, network, workers=8)
+    '''
+    return [path for _, path in iter_shortest_paths(
+        pairs, network, workers=workers, chunksize=chunksize, file=file)]
+
+
+def iter_shortest_paths(pairs, network, *, workers=None, chunksize=256,
+                        ordered=True, file=None):
+    '''Answer many shortest-path queries with a pool of processes,
+    yielding each result as soon as it's ready.
+
+    Takes the same parameters as :meth:`parallel_shortest_paths`, plus
+    ``ordered``.
+
+    Parameters
+    ----------
+    pairs : iterable of tuple
+        ``(start, end)`` pairs of :class:`Node` objects of ``network``.
+    network : :class:`Network` :class:`FrozenNetwork`
+    workers : int, optional
+    chunksize : int, optional
+    ordered : bool, optional
+        If ``False``, chunks are yielded in the order they finish
+        instead of the order of ``pairs``.
+    file : str or path-like, optional
+
+    Yields
+    ------
+    tuple
+        ``(index, path)``: the position of a pair in ``pairs`` and its
+        shortest :class:`Path`, or ``None`` if there is none.
+    '''
+    graph = (network if isinstance(network, FrozenNetwork)
+             else network.freeze())
+    ids = [(graph.index(start), graph.index(end)) for start, end in pairs]
+    chunks = [(i, ids[i:i + chunksize])
+              for i in range(0, len(ids), chunksize)]
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1:
+        for chunk in chunks:
+            yield from _paths(graph, _solve(chunk, graph))
+        return
+
+    directory = None
+    if file is None:
+        directory = tempfile.TemporaryDirectory()
+        file = os.path.join(directory.name, 'network.bin')
+        save_network(graph, file)
+    try:
+        with multiprocessing.Pool(workers, _init_worker, (file,)) as pool:
+            for solved in (pool.imap(_solve, chunks) if ordered
+                           else pool.imap_unordered(_solve, chunks)):
+                yield from _paths(graph, solved)
+    finally:
+        if directory is not None:
+            directory.cleanup()
+
+
+def _solve(chunk, graph=None):
+    # Slots of the shortest path of every (source, target) pair of a
+    # chunk. Pairs are solved grouped by source, with one full search
+    # per source shared by several pairs.
+    first, pairs = chunk
+    graph = _graph if graph is None else graph
+    results = [None] * len(pairs)
+    by_source = {}
+    for k, (source, target) in enumerate(pairs):
+        by_source.setdefault(source, []).append(k)
+    for source, positions in by_source.items():
+        if len(positions) == 1:
+            target = pairs[positions[0]][1]
+            _, previous = _csr_dijkstra(graph, source, target)
+        else:
+            _, previous = _csr_dijkstra(graph, source)
+        for k in positions:
+            results[k] = _csr_slots(graph.offsets, previous, source,
+                                    pairs[k][1])
+    return first, results
+
+
+def _paths(graph, solved):
+    first, results = solved
+    for i, slots in enumerate(results, first):
+        yield i, None if slots is None else Path(
+            graph.edge(slot) for slot in slots)
@@ -1,7 +1,24 @@
+import bisect
+import collections
+import collections.abc
+import heapq
 import inspect
 import functools
+import itertools
+import time
+import weakref
 import pyperclip
+from . import components
+from . import stats
+from .cache import PathCache
+from .cache import _stores
 from .dot import dotgraph
+from .frozen import FrozenNetwork
+from .networks import _watchers
+from .tours import approximate_tour
+from .tours import branch_and_bound
+from .tours import held_karp
+from .tours import spanning_tree_bound
 
 
 class Path(list):
@@ -48,16 +65,58 @@ class Path(list):
         pyperclip.copy(str(self))
 
 
+class _Route:
+    # Immutable path from a search: ``edge`` appended to the route
+    # ``prefix``, which may be shared by many routes. Appending is O(1)
+    # and the weight is kept as edges are added; the edges are only
+    # listed once a route becomes a Path.
+    __slots__ = ('edge', 'prefix', 'weight', 'length')
+
+    def __init__(self, edge=None, prefix=None):
+        self.edge = edge
+        self.prefix = prefix
+        if prefix is None:
+            self.weight = 0
+            self.length = 0
+        else:
+            self.weight = prefix.weight + edge.weight
+            self.length = prefix.length + 1
+
+    def edges(self):
+        edges = [None] * self.length
+        route = self
+        for i in range(self.length - 1, -1, -1):
+            edges[i] = route.edge
+            route = route.prefix
+        return edges
+
+
 class _IncompleteSearchFoundNone(Exception):
     pass
 
 
-def memoize(shortest_path_func):
+_MISSING = object()  # not in any DiskPathCache
+
+
+def memoize(shortest_path_func=None, *, maxsize=1024):
     '''Cache a path-finding function that expects two input parameters.
 
     The path-finding function may additionally accept some number of
     private parameters that don't affect cache.
 
+    Results are kept in a :class:`PathCache`, so they expire as soon as
+    any :class:`Node` is connected, disconnected, reweighted or
+    isolated, and the least recently used result is evicted once
+    ``maxsize`` results are cached.
+
+    Parameters
+    ----------
+    shortest_path_func : callable
+        Path-finding function to cache.
+    maxsize : int, optional
+        Most results to keep, or ``None`` for no limit. Can be changed
+        later through ``cache.maxsize``.
+
     Examples
     --------
     Accessing cache.
@@ -72,6 +131,11 @@ def memoize(shortest_path_func):
     >>> shortest_path.cache
     {}
 
+    Reading hit, miss and eviction statistics.
+
+    >>> shortest_path.cache_info()
+    CacheInfo(hits=3, misses=5, evictions=0, maxsize=1024, currsize=5)
+
     Calling path-finding functions without caching result.
 
     >>> old_cache = shortest_path.cache.copy()
@@ -79,6 +143,13 @@ def memoize(shortest_path_func):
     >>> shortest_path.cache == old_cache
     True
 
+    Public keyword-only options of the path-finding function (such as
+    ``algorithm``) are part of the cache key, so results found by
+    different algorithms are cached separately.
+
+    Results missing from memory are looked up in every open
+    :class:`DiskPathCache` before being computed.
+
     Note
     ----
     Supported path-finding functions:
@@ -87,18 +158,38 @@ def memoize(shortest_path_func):
     - :meth:`shortest_path_through_network`
     - :meth:`path_exists`
     '''
-    memo = {}
-    all_params = iter(inspect.signature(shortest_path_func).parameters)
+    if shortest_path_func is None:  # called as @memoize(maxsize=...)
+        return functools.partial(memoize, maxsize=maxsize)
+    memo = PathCache(maxsize)
+    parameters = inspect.signature(shortest_path_func).parameters
+    all_params = iter(parameters)
     param1_name = next(all_params)
     param2_name = next(all_params)
+    options = {name: param.default for name, param in parameters.items()
+               if param.kind is param.KEYWORD_ONLY
+               and not name.startswith('_') and name != 'save_to_cache'}
 
     @functools.wraps(shortest_path_func)
     def memoized_shortest_path_func(*args, save_to_cache=True, **kwargs):
+        if stats._enabled:
+            with stats._observe(shortest_path_func.__name__,
+                                arguments(args, kwargs)) as call:
+                return cached_call(args, save_to_cache, kwargs, call)
+        return cached_call(args, save_to_cache, kwargs)
+
+    def arguments(args, kwargs):
+        return (tuple(args[:2])
+                + tuple(kwargs[name] for name in (param1_name, param2_name)
+                        if name in kwargs))
+
+    def cached_call(args, save_to_cache, kwargs, call=None):
         if not save_to_cache:
             try:
                 return shortest_path_func(
                     *args, save_to_cache=save_to_cache, **kwargs)
             except _IncompleteSearchFoundNone:
+                if call is not None:
+                    call.incomplete = True
                 return None
         try:
             param1 = args[0]
@@ -113,20 +204,47 @@ def memoize(shortest_path_func):
 
         cachekey = tuple(frozenset(param) if isinstance(param, set)
                          else param for param in [param1, param2])
+        cachekey += tuple(kwargs.get(name, default)
+                          for name, default in options.items())
 
         try:
-            return memo[cachekey]
+            path = memo.lookup(cachekey)
         except KeyError:
+            path = load(cachekey) if _stores else _MISSING
+            if path is not _MISSING:
+                memo[cachekey] = path
+                if call is not None:
+                    call.cache_hit = True
+                return path
+            if call is not None:
+                call.cache_hit = False
             try:
                 path = shortest_path_func(
                     *args, save_to_cache=save_to_cache, **kwargs)
             except _IncompleteSearchFoundNone:
+                if call is not None:
+                    call.incomplete = True
                 return None  # but don't cache
             else:
                 memo[cachekey] = path
+                for store in _stores:
+                    store._save(shortest_path_func.__name__, cachekey, path)
                 return path
+        if call is not None:
+            call.cache_hit = True
+        return path
+
+    def load(cachekey):
+        # result from the first open DiskPathCache that has it
+        for store in _stores:
+            try:
+                return store._load(shortest_path_func.__name__, cachekey)
+            except KeyError:
+                pass
+        return _MISSING
 
     memoized_shortest_path_func.cache_clear = memo.clear
+    memoized_shortest_path_func.cache_info = memo.info
     memoized_shortest_path_func.cache = memo
     # pylint: disable=no-member
     memoized_shortest_path_func.__doc__ += '''
@@ -137,55 +255,579 @@ def memoize(shortest_path_func):
     return memoized_shortest_path_func
 
 
-def _continue_recursively(func, start, param2, save_to_cache, visited,
-                          tail_weight, best_path_weight):
-    if visited is None:
-        visited = set()
-    edges_were_skipped = False
+def _depth_first(start, end=None, remaining=None, visited=None,
+                 tail_weight=None, best_path_weight=None):
+    # Branch-and-bound over simple paths from ``start``, with an explicit
+    # stack so long paths don't hit the recursion limit. The search ends
+    # on reaching ``end``, or once every node of ``remaining`` has been
+    # visited. Nodes in ``visited`` are never entered.
+    remaining = set(remaining) if remaining is not None else None
+    if end is start or remaining is not None and not remaining:
+        return Path()
+    on_path = set(visited) if visited is not None else set()
+    on_path.add(start)
+    best = best_path_weight
+    best_route = None
+    pruned = 0  # edges skipped because of the bound
+    expanded = 1
 
-    for edge in start.edges:
-        if edge.node2 not in visited:
-            try:
-                new_tail_weight = edge.weight + tail_weight
-            except TypeError:  # catches _tail_weight is None
-                # haven't found a best --> we MUST keep going
-                new_tail_weight = None  # still no tail
-            else:
-                # move on if weight of a path down this edge will exceed best
-                if new_tail_weight >= best_path_weight:
-                    edges_were_skipped = True
-                    continue
-            path = func(
-                edge.node2, param2,
-                save_to_cache=save_to_cache,
-                _visited=visited | {start},
-                _tail_weight=new_tail_weight,
-                _best_path_weight=best_path_weight,
-            )
-            try:
-                best_path = Path([edge]) + path
-            except TypeError:  # no path found
-                pass
-            else:
-                best_path_weight = best_path.weight
-                # ensure future calls will keep track of tail:
-                tail_weight = 0  # change it from None to 0
+    offset = tail_weight or 0
+    route = _Route()  # edges from ``start`` to the current node
+    removed = []  # per depth: whether the node was taken from remaining
+    stack = [iter(start.edges)]
+    while stack:
+        edge = next(stack[-1], None)
+        if edge is None:  # all edges of this node tried: backtrack
+            stack.pop()
+            if route.prefix is not None:
+                node = route.edge.node2
+                route = route.prefix
+                on_path.discard(node)
+                if removed.pop():
+                    remaining.add(node)
+            continue
+        node = edge.node2
+        if node in on_path:
+            continue
+        new_weight = offset + route.weight + edge.weight
+        # move on if weight of a path down this edge will exceed best
+        if best is not None and new_weight >= best:
+            pruned += 1
+            continue
+        if node is end or remaining is not None and remaining == {node}:
+            best = new_weight
+            best_route = _Route(edge, route)  # shares route, no copy
+            continue  # going further can only add weight
+        route = _Route(edge, route)
+        on_path.add(node)
+        removed.append(remaining is not None and node in remaining)
+        if removed[-1]:
+            remaining.remove(node)
+        stack.append(iter(node.edges))
+        expanded += 1
 
-    try:
-        return best_path
-    except NameError:  # never found a path
-        if edges_were_skipped:
-            # the exception gets handled by memoize() wrapper, returning None
-            # but NOT caching result (a path may exist!)
-            raise _IncompleteSearchFoundNone(
-                'although a path may exist, some searches aborted because the '
-                'weight exceeded the current best: not caching, returning None'
-            )
+    if stats._enabled:
+        stats._count(expanded, pruned)
+    if best_route is not None:
+        return Path(best_route.edges())
+    if pruned:
+        # the exception gets handled by memoize() wrapper, returning None
+        # but NOT caching result (a path may exist!)
+        raise _IncompleteSearchFoundNone(
+            'although a path may exist, some searches aborted because the '
+            'weight exceeded the current best: not caching, returning None'
+        )
+    return None
+
+
+def _dijkstra(start, end=None):
+    # Heap-based Dijkstra from ``start``, stopping early once ``end`` is
+    # settled. Returns tentative distances and the shared Edge (in either
+    # orientation) used to reach each node. The counter breaks ties
+    # because nodes aren't orderable.
+    distances = {start: 0}
+    previous = {}
+    settled = set()
+    counter = itertools.count()
+    heap = [(0, next(counter), start)]
+    while heap:
+        distance, _, node = heapq.heappop(heap)
+        if node in settled:
+            continue  # stale heap entry
+        settled.add(node)
+        if node is end:
+            break
+        for neighbour, edges in node._adjacency.items():
+            if neighbour in settled:
+                continue
+            for edge in edges:
+                new_distance = distance + edge.weight
+                if (neighbour not in distances
+                        or new_distance < distances[neighbour]):
+                    distances[neighbour] = new_distance
+                    previous[neighbour] = edge
+                    heapq.heappush(heap, (new_distance, next(counter),
+                                          neighbour))
+    if stats._enabled:
+        stats._count(len(settled))
+    return distances, previous
+
+
+def _path_to(previous, start, end):
+    # Walk predecessor edges back from ``end`` to ``start``.
+    if end is not start and end not in previous:
+        return None
+    edges = []
+    node = end
+    while node is not start:
+        edge = previous[node]
+        if edge.node2 is not node:
+            edge = edge.reverse()
+        edges.append(edge)
+        node = edge.node1
+    edges.reverse()
+    return Path(edges)
+
+
+def _a_star(start, end, heuristic):
+    # Dijkstra ordered by distance plus ``heuristic``'s lower bound of
+    # the distance left to ``end``. A node is expanded again if it's
+    # reached by a shorter path later, so the result is exact even if
+    # rounding makes the heuristic slightly inconsistent.
+    distances = {start: 0}
+    previous = {}
+    estimates = {}  # node -> heuristic(node, end)
+    expanded = 0
+    counter = itertools.count()
+    heap = [(heuristic(start, end), next(counter), 0, start)]
+    while heap:
+        _, _, distance, node = heapq.heappop(heap)
+        if distance > distances[node]:
+            continue  # stale heap entry
+        expanded += 1
+        if node is end:
+            break
+        for neighbour, edges in node._adjacency.items():
+            for edge in edges:
+                new_distance = distance + edge.weight
+                if (neighbour not in distances
+                        or new_distance < distances[neighbour]):
+                    distances[neighbour] = new_distance
+                    previous[neighbour] = edge
+                    estimate = estimates.get(neighbour)
+                    if estimate is None:
+                        estimate = estimates[neighbour] = heuristic(
+                            neighbour, end)
+                    heapq.heappush(heap, (new_distance + estimate,
+                                          next(counter), new_distance,
+                                          neighbour))
+    if stats._enabled:
+        stats._count(expanded)
+    return _path_to(previous, start, end)
+
+
+def _bidirectional(start, end, heuristic=None):
+    # Dijkstra from both ends at once, always advancing the side with
+    # the smaller key, until no path through unsettled nodes can beat
+    # the best one found. With a heuristic, keys add the potential
+    # (heuristic(node, end) - heuristic(node, start)) / 2 going forward
+    # and subtract it going backward, which keeps both searches exact
+    # for consistent heuristics (Goldberg and Harrelson, 2005).
+    potentials = {}
+
+    def potential(node):
+        if heuristic is None:
+            return 0
+        value = potentials.get(node)
+        if value is None:
+            value = potentials[node] = (heuristic(node, end)
+                                        - heuristic(node, start)) / 2
+        return value
+
+    counter = itertools.count()
+    forward = ({start: 0}, {}, set(), [(potential(start), 0, start)], 1)
+    backward = ({end: 0}, {}, set(), [(-potential(end), 0, end)], -1)
+    best = float('inf')
+    meeting = None
+    while forward[3] and backward[3]:
+        if forward[3][0][0] + backward[3][0][0] >= best:
+            break
+        side, other = ((forward, backward)
+                       if forward[3][0][0] <= backward[3][0][0]
+                       else (backward, forward))
+        distances, previous, settled, heap, sign = side
+        _, _, node = heapq.heappop(heap)
+        if node in settled:
+            continue  # stale heap entry
+        settled.add(node)
+        distance = distances[node]
+        for neighbour, edges in node._adjacency.items():
+            if neighbour in settled:
+                continue
+            for edge in edges:
+                new_distance = distance + edge.weight
+                if (neighbour not in distances
+                        or new_distance < distances[neighbour]):
+                    distances[neighbour] = new_distance
+                    previous[neighbour] = edge
+                    heapq.heappush(heap, (
+                        new_distance + sign * potential(neighbour),
+                        next(counter), neighbour))
+                    if (neighbour in other[0]
+                            and new_distance + other[0][neighbour] < best):
+                        best = new_distance + other[0][neighbour]
+                        meeting = neighbour
+    if stats._enabled:
+        stats._count(len(forward[2]) + len(backward[2]))
+    if meeting is None:
+        return None
+    path = _path_to(forward[1], start, meeting)
+    node = meeting
+    while node is not end:  # follow the backward search's edges
+        edge = backward[1][node]
+        if edge.node1 is not node:
+            edge = edge.reverse()
+        path.append(edge)
+        node = edge.node2
+    return path
+
+
+def _csr_dijkstra(graph, source, target=-1):
+    # _dijkstra over the arrays of a FrozenNetwork, using node ids.
+    # ``previous`` holds the slot of the edge used to reach each id.
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    n_nodes = len(offsets) - 1
+    distances = [float('inf')] * n_nodes
+    previous = [-1] * n_nodes
+    settled = bytearray(n_nodes)
+    distances[source] = 0
+    heap = [(0, source)]
+    while heap:
+        distance, node = heapq.heappop(heap)
+        if settled[node]:
+            continue
+        settled[node] = 1
+        if node == target:
+            break
+        for slot in range(offsets[node], offsets[node + 1]):
+            neighbour = targets[slot]
+            if settled[neighbour]:
+                continue
+            new_distance = distance + weights[slot]
+            if new_distance < distances[neighbour]:
+                distances[neighbour] = new_distance
+                previous[neighbour] = slot
+                heapq.heappush(heap, (new_distance, neighbour))
+    if stats._enabled:
+        stats._count(settled.count(1))
+    return distances, previous
+
+
+def _csr_slots(offsets, previous, source, target):
+    # Slots of the edges on the path to ``target`` found by
+    # _csr_dijkstra, in order, or None if it wasn't reached.
+    if target != source and previous[target] == -1:
+        return None
+    slots = []
+    node = target
+    while node != source:
+        slot = previous[node]
+        slots.append(slot)
+        node = bisect.bisect_right(offsets, slot) - 1
+    slots.reverse()
+    return slots
+
+
+def _csr_path_to(graph, previous, source, target):
+    slots = _csr_slots(graph.offsets, previous, source, target)
+    if slots is None:
         return None
+    return Path(graph.edge(slot) for slot in slots)
+
+
+class ShortestPathTree(collections.abc.Mapping):
+    '''Shortest paths from one start to every reachable node.
+
+    A read-only mapping from each reachable :class:`Node` to its
+    shortest :class:`Path` from ``start``. The whole tree is computed
+    at once, but each :class:`Path` is only built when it's looked up.
+    Use :meth:`shortest_paths_from` to create one.
+
+    Parameters
+    ----------
+    start : :class:`Node`
+    graph : :class:`FrozenNetwork`, optional
+        Snapshot to search instead of following the edges of each
+        :class:`Node`.
+
+    Attributes
+    ----------
+    start
+    graph
+    '''
+
+    def __init__(self, start, graph=None):
+        self.start = start
+        self.graph = graph
+        if graph is None:
+            self._distances, self._previous = _dijkstra(start)
+        else:
+            self._source = graph.index(start)
+            self._distances, self._previous = _csr_dijkstra(graph,
+                                                            self._source)
+
+    def __getitem__(self, node):
+        path = self.path(node)
+        if path is None:
+            raise KeyError(node)
+        return path
+
+    def __contains__(self, node):
+        return self.distance(node) != float('inf')
+
+    def __iter__(self):
+        if self.graph is None:
+            yield from self._distances
+        else:
+            inf = float('inf')
+            for i, distance in enumerate(self._distances):
+                if distance != inf:
+                    yield self.graph.nodes[i]
+
+    def __len__(self):
+        if self.graph is None:
+            return len(self._distances)
+        return len(self._distances) - self._distances.count(float('inf'))
+
+    @property
+    def distances(self):
+        '''Weight of the shortest path to every reachable node, without
+        building any :class:`Path`.
+
+        :type: dict
+        '''
+        if self.graph is None:
+            return dict(self._distances)
+        return {node: self._distances[self.graph.index(node)]
+                for node in self}
+
+    def distance(self, node):
+        '''Weight of the shortest path from ``start`` to ``node``.
+
+        Parameters
+        ----------
+        node : :class:`Node`
+
+        Returns
+        -------
+        numerical
+            ``float('inf')`` if ``node`` can't be reached.
+        '''
+        try:
+            if self.graph is None:
+                return self._distances[node]
+            return self._distances[self.graph.index(node)]
+        except KeyError:
+            return float('inf')
+
+    def path(self, node):
+        '''Shortest path from ``start`` to ``node``.
+
+        Parameters
+        ----------
+        node : :class:`Node`
+
+        Returns
+        -------
+        :class:`Path` ``None``
+            ``None`` if ``node`` can't be reached.
+        '''
+        if self.graph is None:
+            return _path_to(self._previous, self.start, node)
+        try:
+            target = self.graph.index(node)
+        except KeyError:
+            return None
+        return _csr_path_to(self.graph, self._previous, self._source,
+                            target)
+
+
+class DynamicShortestPathTree(ShortestPathTree):
+    ''':class:`ShortestPathTree` that repairs itself whenever an edge is
+    connected, disconnected, reweighted or isolated.
+
+    Only the nodes a change affects are searched again, in the manner
+    of Ramalingam and Reps (1996): a lighter or new edge is followed
+    from the end it now reaches more cheaply, and a heavier or removed
+    edge of the tree only makes its subtree look for new parents. A
+    change elsewhere costs nothing. Use :meth:`shortest_paths_from`
+    with ``dynamic=True`` to create one.
+
+    Parameters
+    ----------
+    start : :class:`Node`
+
+    Attributes
+    ----------
+    start
+    graph : ``None``
+
+    Note
+    ----
+    Edge weights must be non-negative. Changes to edges without a
+    numeric weight are ignored.
+    '''
+
+    def __init__(self, start):
+        super().__init__(start)
+        _watchers[id(self)] = self
+
+    def _edge_changed(self, edge, old_weight, new_weight):
+        distances, previous = self._distances, self._previous
+        node1, node2 = edge.node1, edge.node2
+        if node1 is node2:
+            return  # self-loops are never on a shortest path
+        inf = float('inf')
+        if new_weight == old_weight:
+            return
+        if new_weight < old_weight:
+            for tail, head in ((node1, node2), (node2, node1)):
+                distance = distances.get(tail, inf) + new_weight
+                if distance < distances.get(head, inf):
+                    distances[head] = distance
+                    previous[head] = edge
+                    self._propagate([(distance, 0, head)])
+            return
+        if previous.get(node2) is edge:
+            child = node2
+        elif previous.get(node1) is edge:
+            child = node1
+        else:
+            return  # not in the tree, so no distance grows
+
+        # nodes whose shortest path went through the edge
+        subtree = [child]
+        members = {child}
+        for node in subtree:  # grows while iterating
+            for neighbour, edges in node._adjacency.items():
+                if neighbour in members:
+                    continue
+                parent = previous.get(neighbour)
+                if any(parent is shared for shared in edges):
+                    subtree.append(neighbour)
+                    members.add(neighbour)
+        for node in subtree:
+            del distances[node]
+            del previous[node]
+        # best parent outside the subtree, then Dijkstra within it
+        heap = []
+        for node in subtree:
+            for neighbour, edges in node._adjacency.items():
+                if neighbour in members or neighbour not in distances:
+                    continue
+                for shared in edges:
+                    distance = distances[neighbour] + shared.weight
+                    if distance < distances.get(node, inf):
+                        distances[node] = distance
+                        previous[node] = shared
+            if node in distances:
+                heap.append((distances[node], len(heap), node))
+        heapq.heapify(heap)
+        self._propagate(heap)
+
+    def _propagate(self, heap):
+        # Dijkstra from the nodes of ``heap``, whose distances have just
+        # dropped. Entries are (distance, tie-breaker, node).
+        distances, previous = self._distances, self._previous
+        counter = itertools.count(len(heap))
+        expanded = 0
+        while heap:
+            distance, _, node = heapq.heappop(heap)
+            if distance > distances[node]:
+                continue  # stale heap entry
+            expanded += 1
+            for neighbour, edges in node._adjacency.items():
+                for edge in edges:
+                    new_distance = distance + edge.weight
+                    if new_distance < distances.get(neighbour,
+                                                    float('inf')):
+                        distances[neighbour] = new_distance
+                        previous[neighbour] = edge
+                        heapq.heappush(heap, (new_distance, next(counter),
+                                              neighbour))
+        if stats._enabled:
+            stats._count(expanded)
+
+
+_trees = PathCache(maxsize=32)  # (start, graph) -> ShortestPathTree
+# start -> DynamicShortestPathTree, for as long as the tree is in use
+_dynamic_trees = weakref.WeakValueDictionary()
+
+
+def shortest_paths_from(start, *, graph=None, dynamic=False):
+    '''Find the shortest paths from ``start`` to every node it can
+    reach, in one O(E log V) search.
+
+    The result is remembered, so later :meth:`shortest_path` calls from
+    ``start`` are answered from it until the graph changes, or for as
+    long as the tree is kept if it's ``dynamic``.
+
+    Parameters
+    ----------
+    start : :class:`Node`
+    graph : :class:`FrozenNetwork`, optional
+        Snapshot to search instead of following the edges of each
+        :class:`Node`.
+    dynamic : bool, optional
+        Return a :class:`DynamicShortestPathTree`, which stays correct
+        as the network changes at a fraction of the cost of searching
+        again.
+
+    Returns
+    -------
+    :class:`ShortestPathTree`
+
+    Raises
+    ------
+    ValueError
+        If both ``graph`` and ``dynamic`` are given.
+
+    Example
+    -------
+    >>> tree = shortest_paths_from(depot)
+    >>> tree[customer].weight == tree.distance(customer)
+    True
+
+    >>> tree = shortest_paths_from(depot, dynamic=True)
+    >>> depot.reweight(warehouse, 50)  # repairs the tree, no new search
+    >>> tree.distance(customer) == shortest_path(depot, customer).weight
+    True
+    '''
+    if dynamic:
+        if graph is not None:
+            raise ValueError('a FrozenNetwork never changes: '
+                             'dynamic trees only follow nodes')
+        tree = _dynamic_trees[start] = DynamicShortestPathTree(start)
+        return tree
+    tree = ShortestPathTree(start, graph)
+    _trees[start, graph] = tree
+    return tree
+
+
+def shortest_paths(pairs, *, graph=None):
+    '''Answer many shortest-path queries at once.
+
+    Queries are grouped by start, and every start is searched once with
+    :meth:`shortest_paths_from`.
+
+    Parameters
+    ----------
+    pairs : iterable of tuple
+        ``(start, end)`` pairs of :class:`Node` objects.
+    graph : :class:`FrozenNetwork`, optional
+        Snapshot to search instead of following the edges of each
+        :class:`Node`.
+
+    Returns
+    -------
+    list of :class:`Path` ``None``
+        Shortest path of every pair, in order.
+    '''
+    pairs = list(pairs)
+    trees = {}
+    for start, _ in pairs:
+        if start not in trees:
+            trees[start] = _trees.get((start, graph))
+            if trees[start] is None and graph is None:
+                trees[start] = _dynamic_trees.get(start)
+            if trees[start] is None:
+                trees[start] = shortest_paths_from(start, graph=graph)
+    return [trees[start].path(end) for start, end in pairs]
 
 
 @memoize
-def shortest_path(start, end, *, save_to_cache=True,
+def shortest_path(start, end, *, algorithm='dijkstra', heuristic=None,
+                  graph=None, save_to_cache=True,
                   _visited=None,
                   _tail_weight=None,  # weight from the start of the best path
                   _best_path_weight=None):
@@ -195,26 +837,359 @@ def shortest_path(start, end, *, save_to_cache=True,
     ----------
     start: :class:`Node`
     end: :class:`Node`
+    algorithm : str, optional
+        ``'dijkstra'`` (the default) runs a binary-heap Dijkstra search
+        that stops as soon as ``end`` is reached. ``'bidirectional'``
+        searches from ``start`` and ``end`` at once, guided by
+        ``heuristic`` if given, and ``'a-star'`` runs an A* search
+        guided by ``heuristic``. Both usually settle far fewer nodes
+        than ``'dijkstra'`` between distant nodes; compare the
+        ``expanded`` counts of :meth:`collect_stats`. ``'depth-first'``
+        runs the original branch-and-bound search over all simple
+        paths, which is exponential in the size of the network and kept
+        for comparison.
+    heuristic : callable, optional
+        ``heuristic(node, target)`` returning a lower bound of the
+        weight of the shortest path from ``node`` to ``target``, such
+        as :meth:`euclidean_heuristic` or a :class:`LandmarkHeuristic`.
+        Required by ``'a-star'``. ``'bidirectional'`` needs it to be
+        consistent as well: never more than the weight of an edge plus
+        the bound from the other end of that edge.
+    graph : :class:`FrozenNetwork`, optional
+        Snapshot containing ``start`` and ``end`` to search instead of
+        following the edges of each :class:`Node`. Only supported by
+        ``'dijkstra'``.
 
     Returns
     -------
     :class:`Path` ``None``
         If a path exists from ``start`` to ``end``, return that
         :class:`Path` object. Otherwise, return ``None``.
+
+    Raises
+    ------
+    ValueError
+        If ``algorithm`` is not recognized or doesn't support
+        ``graph`` or ``heuristic``, or if ``'a-star'`` is given no
+        ``heuristic``.
+
+    Note
+    ----
+    Edge weights must be non-negative.
     '''
+    if algorithm not in ('dijkstra', 'bidirectional', 'a-star',
+                         'depth-first'):
+        raise ValueError(f'unknown algorithm: {algorithm!r}')
+    if graph is not None and algorithm != 'dijkstra':
+        raise ValueError(f'{algorithm!r} does not support graph')
+    if heuristic is not None and algorithm in ('dijkstra', 'depth-first'):
+        raise ValueError(f'{algorithm!r} does not support heuristic')
+    if heuristic is None and algorithm == 'a-star':
+        raise ValueError("'a-star' needs a heuristic")
     if start is end:
         return Path()
+    if algorithm == 'dijkstra':
+        tree = _trees.get((start, graph))
+        if tree is None and graph is None:
+            tree = _dynamic_trees.get(start)
+        if tree is not None:
+            return tree.path(end)
+    if graph is not None:
+        source = graph.index(start)
+        target = graph.index(end)
+        _, previous = _csr_dijkstra(graph, source, target)
+        return _csr_path_to(graph, previous, source, target)
+    if algorithm == 'dijkstra':
+        _, previous = _dijkstra(start, end)
+        return _path_to(previous, start, end)
+    if algorithm == 'bidirectional':
+        return _bidirectional(start, end, heuristic)
+    if algorithm == 'a-star':
+        return _a_star(start, end, heuristic)
+
+    return _depth_first(start, end=end, visited=_visited,
+                        tail_weight=_tail_weight,
+                        best_path_weight=_best_path_weight)
+
+
+def _tour_matrix(start, nodes, graph=None, deadline=None):
+    # Shortest distances between ``start`` and every node in ``nodes``,
+    # and a function expanding a visiting order into a Path. None if
+    # some node can't be reached or ``deadline`` passes first.
+    nodes = [start] + [node for node in nodes if node is not start]
+    trees = []
+    for node in nodes:
+        if deadline is not None and time.perf_counter() >= deadline:
+            return None
+        trees.append(ShortestPathTree(node, graph))
+    distances = [[tree.distance(node) for node in nodes] for tree in trees]
+    if float('inf') in distances[0]:  # some node can't be reached
+        return None
+
+    def expand(order):
+        path = Path()
+        for i, j in zip(order, order[1:]):
+            path.extend(trees[i].path(nodes[j]))
+        return path
+    return distances, expand
+
+
+def _tree_route(start, nodes, graph=None):
+    # Path from ``start`` through ``nodes`` going depth-first along the
+    # shortest-path tree from ``start``, only down branches leading to
+    # one of ``nodes``. It weighs at most twice those branches, and
+    # takes one Dijkstra search. None if a node can't be reached.
+    tree = ShortestPathTree(start, graph)
+    if any(node not in tree for node in nodes):
+        return None
+    parents = {}  # node -> edge from its parent in the tree
+    if graph is None:
+        for node, edge in tree._previous.items():
+            parents[node] = edge if edge.node2 is node else edge.reverse()
+    else:
+        for i, slot in enumerate(tree._previous):
+            if slot != -1:
+                parents[graph.nodes[i]] = graph.edge(slot)
+    needed = {start}
+    for node in nodes:
+        while node not in needed:
+            needed.add(node)
+            node = parents[node].node1
+    children = collections.defaultdict(list)
+    for node in needed:
+        if node is not start:
+            children[parents[node].node1].append(parents[node])
+
+    path = Path()
+    length = 0  # up to the last node reached for the first time
+    stack = [(start, iter(children[start]))]
+    while stack:
+        node, branches = stack[-1]
+        edge = next(branches, None)
+        if edge is not None:
+            path.append(edge)
+            length = len(path)
+            stack.append((edge.node2, iter(children[edge.node2])))
+            continue
+        stack.pop()
+        if stack:
+            path.append(parents[node].reverse())
+    del path[length:]  # no need to come back
+    return path
+
+
+def _nearest_neighbour_walk(start, nodes, graph=None, deadline=None):
+    # Path from ``start`` that always moves on to the nearest node of
+    # ``nodes`` not visited yet, or None if one can't be reached or
+    # ``deadline`` passes first. Each step only searches until it
+    # settles an unvisited node, so this is far cheaper than the full
+    # distance matrix.
+    path = Path()
+    if graph is not None:
+        unvisited = {graph.index(node) for node in nodes}
+        source = graph.index(start)
+        unvisited.discard(source)
+        while unvisited:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return None
+            found, previous = _csr_nearest(graph, source, unvisited)
+            if found is None:
+                return None
+            path.extend(graph.edge(slot) for slot in _csr_slots(
+                graph.offsets, previous, source, found))
+            unvisited.discard(found)
+            source = found
+        return path
+    unvisited = set(nodes)
+    unvisited.discard(start)
+    while unvisited:
+        if deadline is not None and time.perf_counter() >= deadline:
+            return None
+        found, previous = _nearest(start, unvisited)
+        if found is None:
+            return None
+        path.extend(_path_to(previous, start, found))
+        unvisited.discard(found)
+        start = found
+    return path
+
+
+def _nearest(start, ends):
+    # _dijkstra stopping at the first node of ``ends`` it settles.
+    # Returns that node, or None, and the predecessor edges.
+    distances = {start: 0}
+    previous = {}
+    settled = set()
+    counter = itertools.count()
+    heap = [(0, next(counter), start)]
+    found = None
+    while heap:
+        distance, _, node = heapq.heappop(heap)
+        if node in settled:
+            continue  # stale heap entry
+        settled.add(node)
+        if node in ends:
+            found = node
+            break
+        for neighbour, edges in node._adjacency.items():
+            if neighbour in settled:
+                continue
+            for edge in edges:
+                new_distance = distance + edge.weight
+                if (neighbour not in distances
+                        or new_distance < distances[neighbour]):
+                    distances[neighbour] = new_distance
+                    previous[neighbour] = edge
+                    heapq.heappush(heap, (new_distance, next(counter),
+                                          neighbour))
+    if stats._enabled:
+        stats._count(len(settled))
+    return found, previous
+
+
+def _csr_nearest(graph, source, ends):
+    # _nearest over the arrays of a FrozenNetwork, like _csr_dijkstra.
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    distances = {source: 0}
+    previous = collections.defaultdict(lambda: -1)
+    settled = set()
+    heap = [(0, source)]
+    found = None
+    while heap:
+        distance, node = heapq.heappop(heap)
+        if node in settled:
+            continue
+        settled.add(node)
+        if node in ends:
+            found = node
+            break
+        for slot in range(offsets[node], offsets[node + 1]):
+            neighbour = targets[slot]
+            if neighbour in settled:
+                continue
+            new_distance = distance + weights[slot]
+            if new_distance < distances.get(neighbour, float('inf')):
+                distances[neighbour] = new_distance
+                previous[neighbour] = slot
+                heapq.heappush(heap, (new_distance, neighbour))
+    if stats._enabled:
+        stats._count(len(settled))
+    return found, previous
+
+
+def _entry_bound(nodes, graph=None):
+    # Lower bound of any path from elsewhere through ``nodes``: the
+    # first visit of each node goes over one of its edges, so the path
+    # weighs at least the lightest edge of every node.
+    bound = 0
+    for node in nodes:
+        if graph is not None:
+            i = graph.index(node)
+            weights = [graph.weights[slot] for slot in range(
+                graph.offsets[i], graph.offsets[i + 1])
+                if graph.targets[slot] != i]
+        else:
+            weights = [edge.weight
+                       for other, edges in node._adjacency.items()
+                       if other is not node for edge in edges]
+        bound += min(weights, default=0)
+    return bound
+
+
+TourEstimate = collections.namedtuple('TourEstimate',
+                                      ['path', 'lower_bound', 'gap'])
+TourEstimate.__doc__ = '''Result of
+:meth:`approximate_path_through_network`.
+
+Attributes
+----------
+path : :class:`Path` ``None``
+    Best path found, or ``None`` if the network isn't connected.
+lower_bound : numerical
+    No path through the network can weigh less than this.
+gap : float
+    Relative distance of ``path.weight`` above ``lower_bound``.
+    ``0.0`` means ``path`` is optimal.
+'''
+
+
+def approximate_path_through_network(start, network, *, time_budget=0.2,
+                                     max_iterations=None):
+    '''Find a short path from ``start`` through all other
+    :class:`Node` objects in ``network`` within a time budget.
+
+    A nearest-neighbour route is improved with 2-opt and Or-opt local
+    search until no move helps or the budget runs out. The returned
+    path is checked against a minimum spanning tree lower bound.
+
+    The budget covers the nearest-neighbour route and the shortest
+    distances between all nodes, which the local search and the
+    spanning tree need. If they take too long to compute, the best
+    route found so far is returned with a weaker lower bound from the
+    lightest edge of every node. At worst, that's a depth-first walk
+    along the shortest-path tree from ``start``, which takes a single
+    search.
+
+    Parameters
+    ----------
+    start : :class:`Node`
+        Start of the returned :class:`Path`.
+    network : :class:`Network` :class:`FrozenNetwork`
+        Fully-connected network through which the returned
+        :class:`Path` travels.
+    time_budget : float, optional
+        Seconds allowed. ``None`` means unlimited. The walk along the
+        shortest-path tree is always found, even if that takes longer.
+    max_iterations : int, optional
+        Number of improving moves allowed. Unlimited if left out.
+
+    Returns
+    -------
+    :class:`TourEstimate`
 
-    return _continue_recursively(func=shortest_path,
-                                 start=start, param2=end,
-                                 save_to_cache=save_to_cache,
-                                 visited=_visited,
-                                 tail_weight=_tail_weight,
-                                 best_path_weight=_best_path_weight)
+    Example
+    -------
+    >>> estimate = approximate_path_through_network(a, network)
+    >>> estimate.path.weight >= estimate.lower_bound
+    True
+    '''
+    deadline = (None if time_budget is None
+                else time.perf_counter() + time_budget)
+    try:
+        reduced_set = network.all_nodes - {start}
+    except AttributeError:  # network is set of Node, not Network
+        reduced_set = network - {start}
+    graph = network if isinstance(network, FrozenNetwork) else None
+    # always have a path to return, however short the budget
+    route = _tree_route(start, reduced_set, graph)
+    if route is None:
+        return TourEstimate(None, None, None)
+    walk = _nearest_neighbour_walk(start, reduced_set, graph, deadline)
+    if walk is not None and walk.weight < route.weight:
+        route = walk
+    matrix = (None if walk is None
+              else _tour_matrix(start, reduced_set, graph, deadline))
+    if matrix is None:  # out of time
+        path = route
+        lower_bound = _entry_bound(reduced_set, graph)
+    else:
+        distances, expand = matrix
+        lower_bound = spanning_tree_bound(distances)
+        remaining = (None if deadline is None
+                     else max(deadline - time.perf_counter(), 0))
+        path = expand(approximate_tour(distances, remaining,
+                                       max_iterations))
+        if route.weight < path.weight:
+            path = route
+    weight = path.weight
+    gap = (weight - lower_bound) / lower_bound if lower_bound else 0.0
+    return TourEstimate(path, lower_bound, gap)
 
 
 @memoize
-def shortest_path_through_network(start, network, *, save_to_cache=True,
+def shortest_path_through_network(start, network, *, algorithm='held-karp',
+                                  time_budget=0.2, max_iterations=None,
+                                  workers=None, save_to_cache=True,
                                   _visited=None,
                                   # weight from the start of the best path
                                   _tail_weight=None,
@@ -226,54 +1201,117 @@ def shortest_path_through_network(start, network, *, save_to_cache=True,
     ----------
     start : :class:`Node`
         Start of the returned :class:`Path`.
-    network : :class:`Network`
+    network : :class:`Network` :class:`FrozenNetwork`
         Fully-connected network through which the returned
         :class:`Path` travels.
+    algorithm : str, optional
+        One of ``'held-karp'``, ``'branch-and-bound'``, ``'heuristic'``
+        or ``'depth-first'``.
+        ``'held-karp'`` (the default) computes the shortest distance
+        between every pair of nodes and solves the tour exactly with a
+        bitmask dynamic program, so the returned path may pass through
+        a node more than once. It takes O(2^n n^2) time, which is
+        practical up to about 20 nodes. ``'branch-and-bound'`` solves
+        the same problem exactly with a search split over ``workers``
+        processes, which needs far less memory on larger networks.
+        ``'heuristic'`` returns the best path found by
+        :meth:`approximate_path_through_network` within
+        ``time_budget`` and ``max_iterations``. ``'depth-first'`` runs
+        the original branch-and-bound search over simple paths.
+    time_budget : float, optional
+        Seconds of local search allowed by ``'heuristic'``.
+    max_iterations : int, optional
+        Number of improving moves allowed by ``'heuristic'``.
+    workers : int, optional
+        Number of processes used by ``'branch-and-bound'``. One per CPU
+        if left out.
 
     Returns
     -------
     :class:`Path` ``None``
         If a path exists from ``start`` to ``end``, return that
         :class:`Path` object. Otherwise, return ``None``.
+
+    Raises
+    ------
+    ValueError
+        If ``algorithm`` is not recognized or doesn't support a
+        :class:`FrozenNetwork`.
     '''
+    if algorithm not in ('held-karp', 'branch-and-bound', 'heuristic',
+                         'depth-first'):
+        raise ValueError(f'unknown algorithm: {algorithm!r}')
     try:
         reduced_set = network.all_nodes - {start}
     except AttributeError:  # network is set of Node, not Network
         reduced_set = network - {start}
     if not reduced_set:
         return Path()
+    graph = network if isinstance(network, FrozenNetwork) else None
+    if algorithm == 'heuristic':
+        return approximate_path_through_network(
+            start, reduced_set if graph is None else graph,
+            time_budget=time_budget, max_iterations=max_iterations).path
+    if algorithm in ('held-karp', 'branch-and-bound'):
+        matrix = _tour_matrix(start, reduced_set, graph)
+        if matrix is None:
+            return None
+        distances, expand = matrix
+        if algorithm == 'branch-and-bound':
+            return expand(branch_and_bound(distances, workers))
+        return expand(held_karp(distances))
+    if graph is not None:
+        raise ValueError(f'{algorithm!r} does not support FrozenNetwork')
+
+    return _depth_first(start, remaining=reduced_set, visited=_visited,
+                        tail_weight=_tail_weight,
+                        best_path_weight=_best_path_weight)
 
-    return _continue_recursively(func=shortest_path_through_network,
-                                 start=start, param2=reduced_set,
-                                 save_to_cache=save_to_cache,
-                                 visited=_visited,
-                                 tail_weight=_tail_weight,
-                                 best_path_weight=_best_path_weight)
+
+def _csr_path_exists(graph, source, target):
+    offsets, targets = graph.offsets, graph.targets
+    seen = bytearray(len(offsets) - 1)
+    seen[source] = 1
+    stack = [source]
+    while stack:
+        node = stack.pop()
+        for slot in range(offsets[node], offsets[node + 1]):
+            neighbour = targets[slot]
+            if neighbour == target:
+                return True
+            if not seen[neighbour]:
+                seen[neighbour] = 1
+                stack.append(neighbour)
+    return False
 
 
 @memoize
-def path_exists(start, end, *, save_to_cache=True, _visited=None):
+def path_exists(start, end, *, graph=None, save_to_cache=True):
     '''Check if a path exists between ``start`` and ``end``.
 
     Parameters
     ----------
     start : :class:`Node`
     end : :class:`Node`
+    graph : :class:`FrozenNetwork`, optional
+        Snapshot containing ``start`` and ``end`` to search instead of
+        following the edges of each :class:`Node`.
 
     Returns
     -------
     bool
         ``True`` if a path exists, otherwise ``False``.
+
+    Note
+    ----
+    Without ``graph``, this compares the connected components of
+    ``start`` and ``end`` in an index kept up to date by
+    :meth:`Node.connect`. Only the first query after an edge is removed
+    traverses the component again.
     '''
 
     if start == end:
         return True
-    if _visited is None:
-        _visited = set()
-
-    for edge in start.edges:
-        if edge.node2 not in _visited:
-            if path_exists(edge.node2, end, save_to_cache=save_to_cache,
-                           _visited=_visited | {start}):
-                return True
-    return False
+    if graph is not None:
+        return _csr_path_exists(graph, graph.index(start), graph.index(end))
+    return components.connected(start, end)
@@ -0,0 +1,207 @@
+'''Opt-in statistics of path-finding calls.
+
+Path-finding functions only look at the module-level ``_enabled`` flag,
+which is set while statistics are collected (see :meth:`collect_stats`)
+or a callback is registered (see :meth:`add_stats_callback`). When it
+isn't set, they skip every bit of bookkeeping.
+'''
+
+import contextlib
+import time
+
+_enabled = False
+_collectors = []  # active SearchStats
+_callbacks = []
+_calls = []  # CallStats of the calls in progress, innermost last
+
+
+class CallStats:
+    '''Statistics of one call to a path-finding function.
+
+    Attributes
+    ----------
+    function : str
+        Name of the function called, e.g. ``'shortest_path'``.
+    arguments : tuple
+        The two main arguments of the call, e.g. the start and end.
+    seconds : float
+        Wall time of the call.
+    cache_hit : bool ``None``
+        Whether the result was found in the cache, or ``None`` if the
+        cache wasn't used.
+    expanded : int
+        Nodes expanded by the searches run for the call.
+    pruned : int
+        Branches cut by the weight bound of a depth-first search.
+    incomplete : bool
+        Whether pruning hid every path, so that ``None`` was returned
+        without being cached.
+    '''
+
+    def __init__(self, function, arguments):
+        self.function = function
+        self.arguments = arguments
+        self.seconds = 0.0
+        self.cache_hit = None
+        self.expanded = 0
+        self.pruned = 0
+        self.incomplete = False
+
+    def __repr__(self):
+        return (f'{self.__class__.__name__}({self.function!r}, '
+                f'seconds={self.seconds!r}, cache_hit={self.cache_hit!r}, '
+                f'expanded={self.expanded!r}, pruned={self.pruned!r}, '
+                f'incomplete={self.incomplete!r})')
+
+
+class SearchStats:
+    '''Totals of the path-finding calls made while collecting.
+
+    Use :meth:`collect_stats` to create one.
+
+    Attributes
+    ----------
+    calls : list of :class:`CallStats`
+        Every call to a cached path-finding function, in the order they
+        finished. Empty if ``keep_calls`` was ``False``.
+    n_calls : int
+    seconds : float
+        Total wall time of the outermost calls.
+    cache_hits : int
+    cache_misses : int
+    expanded : int
+        Nodes expanded by all searches, including those run outside of
+        a cached function, e.g. by :meth:`shortest_paths_from`.
+    pruned : int
+    incomplete : int
+        Calls that returned an uncached ``None`` because of pruning.
+    '''
+
+    def __init__(self, keep_calls=True):
+        self.keep_calls = keep_calls
+        self.calls = []
+        self.n_calls = 0
+        self.seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.expanded = 0
+        self.pruned = 0
+        self.incomplete = 0
+
+    def __repr__(self):
+        return (f'{self.__class__.__name__}(n_calls={self.n_calls!r}, '
+                f'seconds={self.seconds!r}, hit_rate={self.hit_rate!r}, '
+                f'expanded={self.expanded!r}, pruned={self.pruned!r}, '
+                f'incomplete={self.incomplete!r})')
+
+    @property
+    def hit_rate(self):
+        '''Fraction of cache lookups that were hits, or ``None`` if
+        there were none.
+
+        :type: float ``None``
+        '''
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else None
+
+
+def _update():
+    global _enabled
+    _enabled = bool(_collectors or _callbacks)
+
+
+@contextlib.contextmanager
+def collect_stats(keep_calls=True):
+    '''Collect statistics of path-finding calls within a ``with``
+    block.
+
+    Parameters
+    ----------
+    keep_calls : bool, optional
+        Keep a :class:`CallStats` for every call, not just totals.
+
+    Yields
+    ------
+    :class:`SearchStats`
+
+    Example
+    -------
+    >>> with collect_stats() as stats:
+    ...     shortest_path(a, b, algorithm='depth-first')
+    >>> stats.calls[0].expanded, stats.calls[0].pruned
+    (12, 30)
+    '''
+    collector = SearchStats(keep_calls)
+    _collectors.append(collector)
+    _update()
+    try:
+        yield collector
+    finally:
+        _collectors.remove(collector)
+        _update()
+
+
+def add_stats_callback(callback):
+    '''Call ``callback`` with the :class:`CallStats` of every call to a
+    cached path-finding function, e.g. to forward them to a metrics
+    system.
+
+    Parameters
+    ----------
+    callback : callable
+    '''
+    _callbacks.append(callback)
+    _update()
+
+
+def remove_stats_callback(callback):
+    '''Stop calling a callback added with :meth:`add_stats_callback`.
+
+    Parameters
+    ----------
+    callback : callable
+
+    Raises
+    ------
+    ValueError
+        If ``callback`` wasn't added.
+    '''
+    _callbacks.remove(callback)
+    _update()
+
+
+@contextlib.contextmanager
+def _observe(function, arguments):
+    # Record a call to ``function``. Only used while _enabled is set.
+    call = CallStats(function, arguments)
+    _calls.append(call)
+    start = time.perf_counter()
+    try:
+        yield call
+    finally:
+        call.seconds = time.perf_counter() - start
+        _calls.pop()
+        for collector in _collectors:
+            collector.n_calls += 1
+            if not _calls:  # nested calls are part of their caller's time
+                collector.seconds += call.seconds
+            if call.cache_hit is not None:
+                if call.cache_hit:
+                    collector.cache_hits += 1
+                else:
+                    collector.cache_misses += 1
+            collector.incomplete += call.incomplete
+            if collector.keep_calls:
+                collector.calls.append(call)
+        for callback in list(_callbacks):
+            callback(call)
+
+
+def _count(expanded=0, pruned=0):
+    # Add search counters to the current call and all collectors.
+    if _calls:
+        _calls[-1].expanded += expanded
+        _calls[-1].pruned += pruned
+    for collector in _collectors:
+        collector.expanded += expanded
+        collector.pruned += pruned
@@ -0,0 +1,218 @@
+'''Compact binary files of networks that can be memory-mapped.
+
+A file holds, in order and all little-endian:
+
+* a fixed header (see ``_HEADER``) with the format version, the type of
+  the weights and the size of every section;
+* the ``offsets``, ``targets`` and ``weights`` arrays of a
+  :class:`FrozenNetwork`, as 8-byte integers (``weights`` are 8-byte
+  floats unless every weight is an integer);
+* the table of node names, as 8-byte integer offsets into a block of
+  UTF-8 text;
+* the name of the network, as UTF-8 text.
+
+Every array starts at a multiple of 8 bytes, so the loader can view the
+mapped pages in place instead of copying them.
+'''
+
+import collections.abc
+import mmap
+import struct
+import sys
+from array import array
+from .frozen import FrozenNetwork
+
+_MAGIC = b'PYNETWK\x00'
+_VERSION = 1
+# magic, version, weight typecode, nodes, members, slots, name bytes,
+# network name bytes
+_HEADER = struct.Struct('<8sI1s3xQQQQQ')
+_LITTLE = sys.byteorder == 'little'
+
+
+def save_network(network, file):
+    '''Write ``network`` to a binary file that :meth:`load_network` can
+    memory-map.
+
+    Nodes are stored by name, as text. Outside nodes connected to
+    ``network`` are stored as well, like in :meth:`Network.freeze`.
+
+    Parameters
+    ----------
+    network : :class:`Network` :class:`FrozenNetwork`
+        Network with numerical edge weights.
+    file : str or path-like or binary file object
+
+    Raises
+    ------
+    TypeError
+        If an edge weight isn't numerical.
+    '''
+    _write(_sections(network), file)
+
+
+def _sections(network):
+    # The bytes of a network file, as a list of sections.
+    graph = (network if isinstance(network, FrozenNetwork)
+             else network.freeze())
+    weights = _typed_weights(graph)
+    names = bytearray()
+    name_offsets = array('q', [0])
+    for node_name in (graph._names if graph._names is not None
+                      else (node.name for node in graph.nodes)):
+        names += str(node_name).encode()
+        name_offsets.append(len(names))
+    network_name = str(graph.name).encode()
+
+    header = _HEADER.pack(_MAGIC, _VERSION, weights.typecode.encode(),
+                          len(graph.offsets) - 1, len(graph),
+                          len(graph.targets), len(names), len(network_name))
+    return [header, _little(array('q', graph.offsets)),
+            _little(array('q', graph.targets)), _little(weights),
+            _little(name_offsets), bytes(names), network_name]
+
+
+def _write(sections, file):
+    if hasattr(file, 'write'):
+        file.write(b''.join(sections))
+    else:
+        with open(file, 'wb') as f:
+            for section in sections:
+                f.write(section)
+
+
+def _typed_weights(graph):
+    values = (graph.weights if graph._edges is None
+              else [edge.weight for edge in graph._edges])
+    for value in values:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise TypeError(f'edge weight is not numerical: {value!r}')
+    if all(isinstance(value, int) for value in values):
+        try:
+            return array('q', values)
+        except OverflowError:
+            pass
+    return array('d', values)
+
+
+def _little(values):
+    if not _LITTLE:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def load_network(file, *, use_mmap=True):
+    '''Open a file written by :meth:`save_network`.
+
+    The file is memory-mapped, so opening even a huge network is nearly
+    instant and processes that load the same file share its pages.
+    Path queries run directly on the mapped arrays: a :class:`Node` or
+    :class:`Edge` is only made when it's looked up, e.g. with
+    :meth:`FrozenNetwork.node` or in a returned :class:`Path`.
+
+    Parameters
+    ----------
+    file : str or path-like or binary file object
+    use_mmap : bool, optional
+        Read the whole file into memory instead of mapping it if
+        ``False``. Files are always read if they can't be mapped, e.g.
+        on big-endian machines.
+
+    Returns
+    -------
+    :class:`FrozenNetwork`
+        Nodes made by the snapshot have no edges of their own.
+
+    Raises
+    ------
+    ValueError
+        If ``file`` isn't a network file, or was written by a newer
+        version of this package.
+
+    Example
+    -------
+    >>> save_network(network, 'network.bin')
+    >>> graph = load_network('network.bin')
+    >>> shortest_path(graph.node('a'), graph.node('b'), graph=graph)
+    '''
+    return _parse(_open(file, use_mmap))
+
+
+def _open(file, use_mmap):
+    if hasattr(file, 'read'):
+        buffer = _map_or_read(file, use_mmap)
+    else:
+        with open(file, 'rb') as f:
+            buffer = _map_or_read(f, use_mmap)
+    return memoryview(buffer)
+
+
+def _parse(view):
+    # FrozenNetwork viewing the network file in ``view``.
+    if len(view) < _HEADER.size:
+        raise ValueError('not a network file: too short')
+    (magic, version, typecode, n_nodes, n_members, n_slots, n_name_bytes,
+     n_network_name_bytes) = _HEADER.unpack_from(view)
+    if magic != _MAGIC:
+        raise ValueError('not a network file')
+    if version > _VERSION:
+        raise ValueError(f'unsupported network file version: {version}')
+    typecode = typecode.decode()
+    if typecode not in ('q', 'd'):
+        raise ValueError(f'unknown weight type: {typecode!r}')
+    expected = (_HEADER.size + 8 * (2 * n_nodes + 2 + 2 * n_slots)
+                + n_name_bytes + n_network_name_bytes)
+    if len(view) != expected:
+        raise ValueError('network file is truncated or corrupt')
+
+    position = _HEADER.size
+    sections = []
+    for typecode_, length in (('q', n_nodes + 1), ('q', n_slots),
+                              (typecode, n_slots), ('q', n_nodes + 1)):
+        end = position + 8 * length
+        sections.append(_array_view(view[position:end], typecode_))
+        position = end
+    offsets, targets, weights, name_offsets = sections
+    names = _NameTable(view[position:position + n_name_bytes],
+                       name_offsets)
+    position += n_name_bytes
+    network_name = str(view[position:], 'utf-8')
+    return FrozenNetwork(None, offsets, targets, weights,
+                         n_members=n_members, name=network_name,
+                         names=names)
+
+
+def _map_or_read(file, use_mmap):
+    if use_mmap and _LITTLE:
+        try:
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (AttributeError, OSError, ValueError):
+            pass  # not a real file, or empty
+    return file.read()
+
+
+def _array_view(view, typecode):
+    if _LITTLE:
+        return view.cast(typecode)
+    values = array(typecode, view.tobytes())
+    values.byteswap()
+    return values
+
+
+class _NameTable(collections.abc.Sequence):
+    # Node names, decoded from a block of UTF-8 text when looked up.
+
+    def __init__(self, text, offsets):
+        self._text = text
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if not -len(self) <= i < len(self):
+            raise IndexError(i)
+        i %= len(self)
+        return str(self._text[self._offsets[i]:self._offsets[i + 1]],
+                   'utf-8')
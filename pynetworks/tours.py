@@ -0,0 +1,369 @@
+'''Solvers for the shortest open tour over a distance matrix.
+
+The functions in this module work on plain matrices of pairwise
+distances, where index ``0`` is the start of the tour. They are used by
+:meth:`shortest_path_through_network`, which builds the matrix from a
+network and expands the returned order back into :class:`Edge` objects.
+'''
+
+import multiprocessing
+import os
+import time
+
+try:
+    import numpy
+except ImportError:  # numpy is optional
+    numpy = None
+
+
+def held_karp(distances):
+    '''Find the shortest open tour from index ``0`` through every other
+    index with the Held-Karp dynamic program.
+
+    Subsets of visited indices are stored as integer bitmasks, so the
+    solver takes O(2^n n^2) time and O(2^n n) memory. NumPy is used
+    when it is installed.
+
+    Parameters
+    ----------
+    distances : sequence of sequence of numerical
+        Square matrix of pairwise distances.
+
+    Returns
+    -------
+    list of int
+        Visiting order, starting with ``0``.
+    '''
+    n_others = len(distances) - 1
+    if n_others <= 0:
+        return [0]
+    if numpy is not None:
+        return _held_karp_numpy(distances, n_others)
+    return _held_karp_python(distances, n_others)
+
+
+def _held_karp_python(distances, n_others):
+    inf = float('inf')
+    full = (1 << n_others) - 1
+    # cost[mask * n_others + j]: shortest route from 0 through ``mask``
+    # ending at j + 1 (bit j of ``mask`` stands for index j + 1)
+    cost = [inf] * ((full + 1) * n_others)
+    for j in range(n_others):
+        cost[(1 << j) * n_others + j] = distances[0][j + 1]
+    for mask in range(1, full + 1):
+        base = mask * n_others
+        for j in range(n_others):
+            current = cost[base + j]
+            if current == inf:
+                continue
+            row = distances[j + 1]
+            for k in range(n_others):
+                bit = 1 << k
+                if mask & bit:
+                    continue
+                index = (mask | bit) * n_others + k
+                new_cost = current + row[k + 1]
+                if new_cost < cost[index]:
+                    cost[index] = new_cost
+
+    base = full * n_others
+    last = min(range(n_others), key=lambda j: cost[base + j])
+    order = [last + 1]
+    mask = full
+    while mask & (mask - 1):  # more than one bit set
+        mask ^= 1 << last
+        base = mask * n_others
+        column = last + 1
+        last = min(range(n_others), key=lambda i: (
+            cost[base + i] + distances[i + 1][column]))
+        order.append(last + 1)
+    order.append(0)
+    order.reverse()
+    return order
+
+
+def _held_karp_numpy(distances, n_others):
+    matrix = numpy.asarray(distances, dtype=float)
+    between = matrix[1:, 1:]
+    indices = numpy.arange(n_others)
+    masks = numpy.arange(1 << n_others)
+    sizes = numpy.zeros(len(masks), dtype=numpy.int64)
+    for k in range(n_others):
+        sizes += (masks >> k) & 1
+
+    cost = numpy.full((len(masks), n_others), numpy.inf)
+    cost[1 << indices, indices] = matrix[0, 1:]
+    for size in range(2, n_others + 1):
+        level = masks[sizes == size]
+        for k in range(n_others):
+            selected = level[(level >> k) & 1 == 1]
+            previous = selected ^ (1 << k)
+            cost[selected, k] = (cost[previous]
+                                 + between[:, k]).min(axis=1)
+
+    mask = len(masks) - 1
+    last = int(cost[mask].argmin())
+    order = [last + 1]
+    while mask & (mask - 1):
+        mask ^= 1 << last
+        last = int((cost[mask] + between[:, last]).argmin())
+        order.append(last + 1)
+    order.append(0)
+    order.reverse()
+    return order
+
+
+def branch_and_bound(distances, workers=None, split_depth=2):
+    '''Find the shortest open tour from index ``0`` through every other
+    index with a depth-first branch-and-bound search spread over a
+    pool of processes.
+
+    The tours starting with every possible sequence of ``split_depth``
+    indices after ``0`` are searched as independent subproblems. Workers
+    share the weight of the best tour found so far, starting from the
+    one found by :meth:`approximate_tour`, and cut every branch whose
+    minimum spanning tree bound can't beat it.
+
+    Parameters
+    ----------
+    distances : sequence of sequence of numerical
+        Square matrix of pairwise distances.
+    workers : int, optional
+        Number of worker processes. One per CPU if left out. With one
+        worker, the subproblems are searched in this process.
+    split_depth : int, optional
+        Number of levels of the search tree split into subproblems.
+
+    Returns
+    -------
+    list of int
+        Visiting order, starting with ``0``.
+    '''
+    order = approximate_tour(distances)
+    prefixes = [[0]]
+    for _ in range(min(split_depth, len(distances) - 2)):
+        prefixes = [prefix + [i] for prefix in prefixes
+                    for i in range(1, len(distances)) if i not in prefix]
+    prefixes.sort(key=lambda prefix: tour_weight(distances, prefix))
+
+    bound = multiprocessing.RawValue('d', tour_weight(distances, order))
+    lock = multiprocessing.Lock()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        state = (distances, bound, lock)
+        results = [_search(prefix, state) for prefix in prefixes]
+    else:
+        with multiprocessing.Pool(workers, _init_search,
+                                  (distances, bound, lock)) as pool:
+            results = list(pool.imap_unordered(_search, prefixes))
+    best = min((result for result in results if result is not None),
+               default=None)
+    return order if best is None else best[1]
+
+
+_state = None  # (distances, bound, lock) of a worker process
+
+
+def _init_search(distances, bound, lock):
+    global _state
+    _state = (distances, bound, lock)
+
+
+def _search(prefix, state=None):
+    # Best (weight, order) starting with ``prefix`` that beats the
+    # shared bound, or None.
+    distances, bound, lock = _state if state is None else state
+    best = None
+    remaining = frozenset(range(len(distances))) - set(prefix)
+    stack = [(prefix, tour_weight(distances, prefix), remaining)]
+    while stack:
+        order, weight, remaining = stack.pop()
+        if not remaining:
+            with lock:
+                if weight < bound.value - _EPSILON:
+                    bound.value = weight
+                    best = (weight, order)
+            continue
+        last = order[-1]
+        if (weight + _path_bound(distances, last, remaining)
+                > bound.value - _EPSILON):
+            continue
+        row = distances[last]
+        for i in sorted(remaining, key=row.__getitem__, reverse=True):
+            stack.append((order + [i], weight + row[i], remaining - {i}))
+    return best
+
+
+def _path_bound(distances, last, remaining):
+    # Weight of a minimum spanning tree over ``last`` and ``remaining``,
+    # a lower bound on any path from ``last`` through ``remaining``.
+    row = distances[last]
+    cheapest = {i: row[i] for i in remaining}
+    total = 0
+    while cheapest:
+        nearest = min(cheapest, key=cheapest.__getitem__)
+        total += cheapest.pop(nearest)
+        row = distances[nearest]
+        for i in cheapest:
+            if row[i] < cheapest[i]:
+                cheapest[i] = row[i]
+    return total
+
+
+def tour_weight(distances, order):
+    '''Total distance travelled when visiting indices in ``order``.
+
+    Parameters
+    ----------
+    distances : sequence of sequence of numerical
+        Square matrix of pairwise distances.
+    order : sequence of int
+
+    Returns
+    -------
+    numerical
+    '''
+    return sum(distances[i][j] for i, j in zip(order, order[1:]))
+
+
+def spanning_tree_bound(distances):
+    '''Weight of a minimum spanning tree over all indices.
+
+    Every open tour is a spanning tree, so this is a lower bound on the
+    weight of any tour over ``distances``.
+
+    Parameters
+    ----------
+    distances : sequence of sequence of numerical
+        Square matrix of pairwise distances.
+
+    Returns
+    -------
+    numerical
+    '''
+    n_indices = len(distances)
+    if n_indices < 2:
+        return 0
+    cheapest = list(distances[0])  # Prim's algorithm on a dense matrix
+    in_tree = [False] * n_indices
+    in_tree[0] = True
+    total = 0
+    for _ in range(n_indices - 1):
+        nearest = min((i for i in range(n_indices) if not in_tree[i]),
+                      key=cheapest.__getitem__)
+        total += cheapest[nearest]
+        in_tree[nearest] = True
+        row = distances[nearest]
+        for i in range(n_indices):
+            if not in_tree[i] and row[i] < cheapest[i]:
+                cheapest[i] = row[i]
+    return total
+
+
+def approximate_tour(distances, time_budget=None, max_iterations=None):
+    '''Find a short open tour from index ``0`` through every other
+    index without guaranteeing that it is the shortest.
+
+    A nearest-neighbour tour is improved with 2-opt and Or-opt moves
+    until no move helps or the budget runs out. The best tour found so
+    far is always returned.
+
+    Parameters
+    ----------
+    distances : sequence of sequence of numerical
+        Square, symmetric matrix of pairwise distances.
+    time_budget : float, optional
+        Seconds of local search allowed. Unlimited if left out.
+    max_iterations : int, optional
+        Number of improving moves allowed. Unlimited if left out.
+
+    Returns
+    -------
+    list of int
+        Visiting order, starting with ``0``.
+    '''
+    deadline = (None if time_budget is None
+                else time.perf_counter() + time_budget)
+    order = _nearest_neighbour_tour(distances)
+    iterations = 0
+    while max_iterations is None or iterations < max_iterations:
+        if not (_two_opt_move(distances, order, deadline)
+                or _or_opt_move(distances, order, deadline)):
+            break
+        iterations += 1
+    return order
+
+
+def _nearest_neighbour_tour(distances):
+    unvisited = set(range(1, len(distances)))
+    order = [0]
+    while unvisited:
+        row = distances[order[-1]]
+        nearest = min(unvisited, key=row.__getitem__)
+        unvisited.remove(nearest)
+        order.append(nearest)
+    return order
+
+
+def _out_of_time(deadline):
+    return deadline is not None and time.perf_counter() >= deadline
+
+
+def _link(distances, order, i, j):
+    # distance between positions i and j, or 0 past the open end
+    if j >= len(order):
+        return 0
+    return distances[order[i]][order[j]]
+
+
+_EPSILON = 1e-9  # ignore float noise so local search always terminates
+
+
+def _two_opt_move(distances, order, deadline):
+    # Apply the first segment reversal that shortens ``order``.
+    size = len(order)
+    for i in range(1, size - 1):
+        if _out_of_time(deadline):
+            return False
+        removed_before = _link(distances, order, i - 1, i)
+        for j in range(i + 1, size):
+            delta = (distances[order[i - 1]][order[j]]
+                     + _link(distances, order, i, j + 1)
+                     - removed_before
+                     - _link(distances, order, j, j + 1))
+            if delta < -_EPSILON:
+                order[i:j + 1] = order[i:j + 1][::-1]
+                return True
+    return False
+
+
+def _or_opt_move(distances, order, deadline):
+    # Apply the first move of a run of up to three positions to a
+    # later or earlier place in ``order`` that shortens it.
+    size = len(order)
+    for length in (1, 2, 3):
+        for i in range(1, size - length + 1):
+            if _out_of_time(deadline):
+                return False
+            j = i + length - 1  # last position of the moved run
+            removed = (distances[order[i - 1]][order[i]]
+                       + _link(distances, order, j, j + 1)
+                       - _link(distances, order, i - 1, j + 1))
+            for k in range(size):
+                if i - 1 <= k <= j:
+                    continue
+                # insert the run between positions k and k + 1
+                added = (distances[order[k]][order[i]]
+                         + _link(distances, order, j, k + 1)
+                         - _link(distances, order, k, k + 1))
+                if added - removed < -_EPSILON:
+                    run = order[i:j + 1]
+                    if k > j:
+                        order[k + 1:k + 1] = run
+                        del order[i:j + 1]
+                    else:
+                        del order[i:j + 1]
+                        order[k + 1:k + 1] = run
+                    return True
+    return False
@@ -8,5 +8,8 @@ setup(
     install_requires=[
         'pyperclip>=1.8.0',
     ],
+    extras_require={
+        'numpy': ['numpy'],
+    },
     version=version,
 )  # Metadata is in setup.cfg
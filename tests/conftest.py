@@ -0,0 +1,14 @@
+import pytest
+from pynetworks import generate_network
+
+
+@pytest.fixture
+def random_nodes():
+    '''Make the nodes of a reproducible random network, in the order
+    :meth:`generate_network` made them.'''
+    def make(n_nodes, edge_prob=0.5, seed=0, strongly_connected=False):
+        network = generate_network(n_nodes, edge_prob=edge_prob,
+                                   strongly_connected=strongly_connected,
+                                   seed=seed)
+        return sorted(network, key=lambda node: int(node.name.split()[1]))
+    return make
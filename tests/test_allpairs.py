@@ -0,0 +1,49 @@
+import pytest
+from pynetworks import Network
+from pynetworks import all_pairs_shortest_paths, allpairs
+from pynetworks import shortest_path, shortest_paths
+
+
+@pytest.fixture
+def network(random_nodes):
+    nodes = random_nodes(15, edge_prob=0.2, seed=8)
+    nodes[0].connect(nodes[1], 20)  # parallel, heavier edge
+    nodes[0].connect(nodes[1], 1)
+    return Network(nodes)
+
+
+@pytest.mark.parametrize('method', ['floyd-warshall', 'dijkstra'])
+def test_all_pairs_shortest_paths(network, method):
+    if method == 'floyd-warshall' and allpairs.numpy is None:
+        pytest.skip('numpy is not installed')
+    matrix = all_pairs_shortest_paths(network, method=method)
+    for start in network:
+        for end in network:
+            expected = shortest_path(start, end)
+            path = matrix.path(start, end)
+            if expected is None:
+                assert path is None
+                assert matrix.distance(start, end) == float('inf')
+            else:
+                assert path.weight == expected.weight
+                assert matrix.distance(start, end) == expected.weight
+
+
+def test_all_pairs_without_numpy(network, monkeypatch):
+    monkeypatch.setattr(allpairs, 'numpy', None)
+    matrix = all_pairs_shortest_paths(network)
+    a, b = list(network)[:2]
+    assert matrix.distance(a, b) == shortest_path(a, b).weight
+    with pytest.raises(ValueError):
+        all_pairs_shortest_paths(network, method='floyd-warshall')
+
+
+def test_batch_shortest_paths(network):
+    nodes = list(network)
+    pairs = [(nodes[i], nodes[j]) for i in range(3) for j in range(5)]
+    expected = [shortest_path(start, end, save_to_cache=False)
+                for start, end in pairs]
+    assert shortest_paths(pairs) == expected
+    matrix = all_pairs_shortest_paths(network)
+    assert [path and path.weight for path in matrix.shortest_paths(pairs)] \
+        == [path and path.weight for path in expected]
@@ -0,0 +1,139 @@
+import pytest
+from pynetworks import DiskPathCache, Network, Node, PathCache
+from pynetworks import collect_stats, generate_network, memoize
+from pynetworks import path_exists, shortest_path
+from pynetworks import shortest_path_through_network
+
+
+def test_path_cache_lru_eviction():
+    cache = PathCache(maxsize=2)
+    cache['a'] = 1
+    cache['b'] = 2
+    assert cache.lookup('a') == 1  # 'b' is now least recently used
+    cache['c'] = 3
+    assert set(cache) == {'a', 'c'}
+    info = cache.info()
+    assert (info.hits, info.evictions, info.currsize) == (1, 1, 2)
+
+
+def test_path_cache_expires_on_graph_change():
+    cache = PathCache()
+    cache['a'] = 1
+    Node('A').connect(Node('B'))
+    assert 'a' not in cache
+    assert len(cache) == 0
+
+
+def test_path_cache_clear_resets_stats():
+    cache = PathCache()
+    cache['a'] = 1
+    cache.lookup('a')
+    cache.clear()
+    assert cache.info() == (0, 0, 0, None, 0)
+
+
+def test_memoized_shortest_path_sees_new_edges():
+    a, b, c = Node('A'), Node('B'), Node('C')
+    a.connect(b, 10)
+    b.connect(c, 10)
+    assert shortest_path(a, c).weight == 20
+    assert shortest_path(a, c).weight == 20
+    assert shortest_path.cache_info().hits >= 1
+    a.connect(c, 1)
+    assert shortest_path(a, c).weight == 1
+
+
+def test_memoized_tour_sees_new_members():
+    a, b, c = Node('A'), Node('B'), Node('C')
+    a.connect(b, 1)
+    b.connect(c, 1)
+    network = Network([a, b])
+    assert len(shortest_path_through_network(a, network)) == 1
+    network.all_nodes.add(c)
+    network.update()
+    assert len(shortest_path_through_network(a, network)) == 2
+
+
+def test_memoize_maxsize():
+    @memoize(maxsize=1)
+    def func(start, end, *, save_to_cache=True):
+        '''Return both.'''
+        return start, end
+
+    func(1, 2)
+    func(3, 4)
+    assert func.cache_info().evictions == 1
+    assert list(func.cache) == [(3, 4)]
+
+
+@pytest.fixture
+def clear_caches():
+    for function in (shortest_path, path_exists,
+                     shortest_path_through_network):
+        function.cache_clear()
+    yield
+
+
+def tour_queries(network):
+    nodes = sorted(network, key=lambda node: node.name)
+    return [(shortest_path, nodes[0], nodes[-1]),
+            (path_exists, nodes[1], nodes[2]),
+            (shortest_path_through_network, nodes[0], network)]
+
+
+def test_disk_cache_survives_restart(tmp_path, clear_caches):
+    file = tmp_path / 'paths.db'
+    network = generate_network(12, edge_prob=0.4, seed=1)
+    with DiskPathCache(file, network) as store:
+        expected = [function(a, b) for function, a, b in
+                    tour_queries(network)]
+        assert len(store) == 3
+
+    # a new process: equal network, new objects, empty memory caches
+    network = generate_network(12, edge_prob=0.4, seed=1)
+    for function, _, _ in tour_queries(network):
+        function.cache_clear()
+    with DiskPathCache(file, network):
+        with collect_stats() as stats:
+            results = [function(a, b) for function, a, b in
+                       tour_queries(network)]
+    assert stats.cache_hits == 3 and stats.expanded == 0
+    assert results[1] is True
+    for result, old in zip(results[::2], expected[::2]):
+        assert result.weight == old.weight
+        assert [(edge.node1.name, edge.node2.name) for edge in result] == [
+            (edge.node1.name, edge.node2.name) for edge in old]
+        assert all(edge.node1 in network.all_nodes for edge in result)
+
+
+def test_disk_cache_drops_stale_fingerprints(tmp_path, clear_caches):
+    nodes = [Node(name) for name in 'abc']
+    nodes[0].connect(nodes[1], 1)
+    nodes[1].connect(nodes[2], 1)
+    network = Network(nodes)
+    with DiskPathCache(tmp_path / 'paths.db', network,
+                       max_fingerprints=1) as store:
+        shortest_path(nodes[0], nodes[2])
+        assert len(store) == 1
+        nodes[0].connect(nodes[2], 5)
+        assert len(store) == 0  # a new fingerprint
+        shortest_path(nodes[0], nodes[2])
+        nodes[0].disconnect(nodes[2], 5)
+        shortest_path(nodes[0], nodes[2])  # the first one, collected
+        assert len(store) == 1
+        assert store._connection.execute(
+            'SELECT COUNT(*) FROM results').fetchone()[0] == 1
+
+
+def test_disk_cache_skips_networks_with_edges_out(tmp_path, clear_caches):
+    a, b, x, y = (Node(name) for name in 'abxy')
+    a.connect(x, 1)
+    x.connect(y, 100)
+    y.connect(b, 1)
+    a.connect(b, 10)
+    network = Network([a, b])
+    with DiskPathCache(tmp_path / 'paths.db', network) as store:
+        assert shortest_path(a, b).weight == 10
+        assert len(store) == 0
+        x.reweight(y, 1)  # outside the network, same fingerprint
+        assert shortest_path(a, b).weight == 3
@@ -0,0 +1,62 @@
+import random
+from pynetworks import Network, Node, components
+from pynetworks import generate_network, path_exists
+
+
+def reachable(start):
+    seen = {start}
+    stack = [start]
+    while stack:
+        for edge in stack.pop().edges:
+            if edge.node2 not in seen:
+                seen.add(edge.node2)
+                stack.append(edge.node2)
+    return seen
+
+
+def test_components_follow_changes():
+    rng = random.Random(2)
+    nodes = [Node(i) for i in range(25)]
+    connections = []
+    for step in range(300):
+        if rng.random() < 0.7 or not connections:
+            a, b = rng.sample(nodes, 2)
+            a.connect(b, 1)
+            connections.append((a, b))
+        else:
+            a, b = connections.pop(rng.randrange(len(connections)))
+            a.disconnect(b, 1)
+        if step % 10 == 0:
+            a, b = rng.sample(nodes, 2)
+            assert components.connected(a, b) == (b in reachable(a))
+    for a in nodes:
+        component = reachable(a)
+        for b in nodes:
+            assert path_exists(a, b) == (b in component)
+
+
+def test_path_exists_after_disconnect():
+    a, b, c = Node('A'), Node('B'), Node('C')
+    a.connect(b, 1)
+    b.connect(c, 1)
+    assert path_exists(a, c)
+    b.disconnect(c, 1)
+    assert not path_exists(a, c)
+    c.connect(a, 1)
+    assert path_exists(a, b) and path_exists(b, c)
+
+
+def test_strongly_connected():
+    a, b, c = Node('A'), Node('B'), Node('C')
+    network = Network([a, b, c])
+    assert not network.strongly_connected
+    a.connect(b, 1)
+    b.connect(c, 1)
+    assert network.strongly_connected
+    assert Network().strongly_connected
+
+
+def test_generate_network_strongly_connected():
+    random.seed(1)
+    network = generate_network(30, edge_prob=0.02)
+    assert network.strongly_connected
@@ -1,7 +1,13 @@
+import bz2
+import gzip
+import io
+import lzma
+import mmap
 import pytest
 from random import randint
-from pynetworks import Edge, Node
-from pynetworks import dotgraph, escape_dot_id
+from pynetworks import Edge, Network, Node
+from pynetworks import dot, dotgraph, escape_dot_id, iter_dot, write_dot
+from pynetworks import parse_dot, path_exists, read_dot
 
 ISOLATED_NODE_NAMES = ['N1', '#2', 'node a', 'jAmes']
 
@@ -48,3 +54,105 @@ def test_dotgraph_with_just_edges(isolated_nodes):
         first.connect(other, i)
     assert (dotgraph(edges=first.edges) == 'graph {\n\t"N1" -- "#2" [label=0]'
             '\n\t"N1" -- "node a" [label=1]\n\t"N1" -- "jAmes" [label=2]\n}')
+
+
+def test_escape_dot_id_with_backslashes():
+    assert escape_dot_id('a\\"b') == R'"a\\\"b"'
+
+
+def test_iter_dot_matches_dotgraph(isolated_nodes, monkeypatch):
+    monkeypatch.setattr(dot, '_CHUNK_LINES', 2)
+    first = isolated_nodes[0]
+    for i, other in enumerate(isolated_nodes[1:]):
+        first.connect(other, i)
+    edges = first.edges
+    for args in [([], [], ''), (isolated_nodes, [], 'n'), ([], edges, ''),
+                 (isolated_nodes[:1], edges, 'x"y')]:
+        chunks = list(iter_dot(*args))
+        assert ''.join(chunks) == dotgraph(*args)
+    assert len(list(iter_dot(isolated_nodes, edges))) > 1
+
+
+@pytest.mark.parametrize('compression, opener', [
+    (None, open), ('gzip', gzip.open), ('bz2', bz2.open), ('xz', lzma.open)])
+def test_write_dot(tmp_path, compression, opener):
+    a, b, c = Node('A'), Node('B'), Node('C "3"')
+    a.connect(b, 1.5)
+    network = Network([a, b, c], name='net')
+    path = tmp_path / 'network.dot'
+    network.write_dot(path, compression=compression)
+    with opener(path, 'rt', encoding='utf8') as file:
+        assert file.read() == str(network)
+
+
+def test_write_dot_guesses_compression(tmp_path):
+    path = tmp_path / 'network.dot.gz'
+    write_dot(path, isolated_nodes=[Node('A')])
+    with gzip.open(path, 'rt', encoding='utf8') as file:
+        assert file.read() == 'graph {\n\t"A"\n}'
+
+
+def test_write_dot_to_file_object():
+    buffer = io.StringIO()
+    write_dot(buffer, isolated_nodes=[Node('A')], name='g')
+    assert buffer.getvalue() == 'graph "g" {\n\t"A"\n}'
+
+
+def round_trip_network():
+    a, b, c, d = Node('A'), Node('b "quoted"'), Node('back\\slash'), Node('')
+    e, f = Node('multi\nline'), Node('lonely')
+    a.connect(b, 3)
+    b.connect(c, 2.5)
+    c.connect(a)
+    a.connect(b, 3)
+    d.connect(d, 'heavy')
+    e.connect(a, 10 ** 20)
+    return Network([a, b, c, d, e, f], name='round "trip"')
+
+
+def test_read_dot_round_trip(tmp_path):
+    network = round_trip_network()
+    path = tmp_path / 'network.dot'
+    network.write_dot(path)
+    loaded = read_dot(path)
+    assert str(loaded) == str(network)
+    assert loaded.name == network.name
+    assert sorted(node.name for node in loaded) == sorted(
+        node.name for node in network)
+    names = {node.name: node for node in loaded}
+    assert names['A'].weight_to(names['b "quoted"']) == 3
+    assert path_exists(names['A'], names['back\\slash'])
+
+
+def test_read_dot_sources(tmp_path):
+    network = round_trip_network()
+    text = str(network)
+    path = tmp_path / 'network.dot.gz'
+    network.write_dot(path)
+    assert str(read_dot(path)) == text
+    assert str(read_dot(io.StringIO(text))) == text
+    assert str(read_dot(io.BytesIO(text.encode('utf8')))) == text
+    plain = tmp_path / 'network.dot'
+    plain.write_text(text, encoding='utf8')
+    with open(plain, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            assert str(read_dot(mapped)) == text
+
+
+def test_read_dot_empty():
+    assert str(read_dot(io.StringIO('graph {\n\t\n}'))) == 'graph {\n\t\n}'
+
+
+@pytest.mark.parametrize('text', [
+    'digraph {\n}', 'graph {\n\t"A" -> "B"\n}', 'graph {\n\t"A"\n',
+    'graph {\n\t"A\n}'])
+def test_read_dot_invalid(text):
+    with pytest.raises(ValueError):
+        read_dot(io.StringIO(text))
+
+
+def test_parse_dot():
+    text = 'graph "g" {\n\t"A"\n\t"B" -- "C" [label=1.5]\n\t"C" -- "D"\n}'
+    assert list(parse_dot(io.StringIO(text))) == [
+        ('graph', 'g'), ('node', 'A'), ('edge', 'B', 'C', 1.5),
+        ('edge', 'C', 'D', None)]
@@ -0,0 +1,83 @@
+import pytest
+from pynetworks import FrozenNetwork, Network, Node
+from pynetworks import path_exists, shortest_path
+from pynetworks import shortest_path_through_network, shortest_paths_from
+
+
+@pytest.fixture
+def network(random_nodes):
+    return Network(random_nodes(12, edge_prob=0.3, seed=4))
+
+
+def test_freeze_layout(network):
+    frozen = network.freeze()
+    assert isinstance(frozen, FrozenNetwork)
+    assert len(frozen) == len(network.all_nodes)
+    assert frozen.all_nodes == network.all_nodes
+    for node in network:
+        i = frozen.index(node)
+        slots = range(frozen.offsets[i], frozen.offsets[i + 1])
+        assert [frozen.edge(slot) for slot in slots] == node.edges
+        assert [frozen.nodes[frozen.targets[slot]] for slot in slots] == [
+            edge.node2 for edge in node.edges]
+
+
+def test_freeze_includes_outside_nodes():
+    a, b, c = Node('A'), Node('B'), Node('C')
+    a.connect(b, 1)
+    b.connect(c, 1)
+    frozen = Network([a]).freeze()
+    assert c not in frozen
+    assert shortest_path(a, c, graph=frozen).weight == 2
+
+
+def test_frozen_pathfinding_matches(network):
+    frozen = network.freeze()
+    nodes = list(network)
+    for start in nodes:
+        for end in nodes:
+            expected = shortest_path(start, end)
+            path = shortest_path(start, end, graph=frozen)
+            if expected is None:
+                assert path is None
+            else:
+                assert path.weight == expected.weight
+            assert path_exists(start, end, graph=frozen) == (
+                expected is not None)
+
+
+def test_frozen_shortest_path_through_network(network):
+    start = next(iter(network))
+    expected = shortest_path_through_network(start, network)
+    path = shortest_path_through_network(start, network.freeze())
+    assert (path is None) == (expected is None)
+    if path is not None:
+        assert path.weight == expected.weight
+
+
+def test_frozen_heuristic_uses_snapshot():
+    a, b, c = Node('A'), Node('B'), Node('C')
+    a.connect(b, 1)
+    b.connect(c, 1)
+    a.connect(c, 5)
+    frozen = Network([a, b, c]).freeze()
+    a.disconnect(b, 1)  # after the snapshot
+    for algorithm in ('held-karp', 'heuristic'):
+        path = shortest_path_through_network(
+            a, frozen, algorithm=algorithm, save_to_cache=False)
+        assert path.weight == 2
+
+
+def test_frozen_unsupported_algorithm(network):
+    a, b = list(network)[:2]
+    with pytest.raises(ValueError):
+        shortest_path(a, b, algorithm='depth-first', graph=network.freeze())
+
+
+def test_frozen_shortest_paths_from(network):
+    frozen = network.freeze()
+    start = next(iter(network))
+    tree = shortest_paths_from(start, graph=frozen)
+    assert tree.distances == shortest_paths_from(start).distances
+    for node in tree:
+        assert tree[node].weight == tree.distance(node)
@@ -0,0 +1,74 @@
+import math
+import pytest
+from pynetworks import generate_geometric_network, generate_grid_network
+from pynetworks import generate_network, generate_scale_free_network
+from pynetworks import path_exists, shortest_path
+
+
+def summary(network):
+    return sorted((edge.node1.name, edge.node2.name, edge.weight)
+                  for edge in network.edges)
+
+
+def test_generate_network_seed():
+    assert summary(generate_network(50, edge_prob=0.1, seed=3)) == summary(
+        generate_network(50, edge_prob=0.1, seed=3))
+    assert summary(generate_network(50, edge_prob=0.1, seed=3)) != summary(
+        generate_network(50, edge_prob=0.1, seed=4))
+
+
+@pytest.mark.parametrize('edge_prob', [0, 0.05, 0.5, 1])
+def test_generate_network_density(edge_prob):
+    n_nodes = 200
+    network = generate_network(n_nodes, edge_prob=edge_prob,
+                               strongly_connected=False, seed=1)
+    pairs = n_nodes * (n_nodes - 1) / 2
+    assert len(network.all_nodes) == n_nodes
+    assert abs(len(network.edges) - edge_prob * pairs) <= 0.1 * pairs
+    assert all(1 <= edge.weight < 11 for edge in network.edges)
+    assert len({frozenset((edge.node1, edge.node2))
+                for edge in network.edges}) == len(network.edges)
+    with pytest.raises(ValueError):
+        generate_network(10, edge_prob=2)
+
+
+def test_generate_network_repairs_connectivity():
+    network = generate_network(2000, edge_prob=0.0005, seed=2)
+    assert network.strongly_connected
+    nodes = list(network)
+    assert path_exists(nodes[0], nodes[-1])
+
+
+def test_generate_grid_network():
+    network = generate_grid_network(3, 4, seed=0)
+    assert len(network.all_nodes) == 12
+    assert len(network.edges) == 3 * 3 + 2 * 4
+    nodes = {node.name: node for node in network}
+    assert len(shortest_path(nodes['Node 0,0'], nodes['Node 2,3'])) == 5
+
+
+def test_generate_scale_free_network():
+    network = generate_scale_free_network(500, n_links=2, seed=5)
+    assert len(network.all_nodes) == 500
+    assert len(network.edges) == 2 * 498
+    assert network.strongly_connected
+    degrees = sorted(node.degree for node in network)
+    assert degrees[0] >= 2
+    assert degrees[-1] > 10 * degrees[0]  # hubs
+
+
+def test_generate_geometric_network():
+    positions = {}
+    network = generate_geometric_network(300, 0.1, strongly_connected=False,
+                                         positions=positions, seed=6)
+    assert len(positions) == 300
+    expected = sum(1 for i, a in enumerate(network)
+                   for b in list(network)[i + 1:]
+                   if ((positions[a][0] - positions[b][0]) ** 2
+                       + (positions[a][1] - positions[b][1]) ** 2) <= 0.01)
+    assert len(network.edges) == expected
+    assert all(edge.weight <= 0.1 for edge in network.edges)
+    assert all(edge.weight == math.dist(positions[edge.node1],
+                                        positions[edge.node2])
+               for edge in network.edges)
+    assert generate_geometric_network(300, 0.01, seed=6).strongly_connected
@@ -0,0 +1,86 @@
+import pytest
+from pynetworks import LandmarkHeuristic, collect_stats, euclidean_heuristic
+from pynetworks import generate_geometric_network, generate_network
+from pynetworks import shortest_path
+
+
+def queries(network, n_queries=40):
+    nodes = sorted(network, key=lambda node: node.name)
+    return [(nodes[i], nodes[-1 - i]) for i in range(n_queries)]
+
+
+@pytest.fixture
+def geometric():
+    positions = {}
+    network = generate_geometric_network(400, 0.1, positions=positions,
+                                         seed=1)
+    return network, positions
+
+
+@pytest.mark.parametrize('algorithm, heuristic', [
+    ('bidirectional', None),
+    ('bidirectional', 'euclidean'),
+    ('bidirectional', 'landmarks'),
+    ('a-star', 'euclidean'),
+    ('a-star', 'landmarks'),
+])
+def test_searches_match_dijkstra(geometric, algorithm, heuristic):
+    network, positions = geometric
+    heuristic = {None: None,
+                 'euclidean': euclidean_heuristic(positions),
+                 'landmarks': LandmarkHeuristic(network, 6, seed=0),
+                 }[heuristic]
+    for start, end in queries(network):
+        expected = shortest_path(start, end, save_to_cache=False)
+        path = shortest_path(start, end, algorithm=algorithm,
+                             heuristic=heuristic, save_to_cache=False)
+        assert path.weight == pytest.approx(expected.weight)
+        assert path[0].node1 is start and path[-1].node2 is end
+        assert all(a.node2 is b.node1 for a, b in zip(path, path[1:]))
+
+
+def test_heuristics_settle_fewer_nodes(geometric):
+    network, positions = geometric
+    expanded = {}
+    for algorithm, heuristic in [('dijkstra', None),
+                                 ('bidirectional', None),
+                                 ('a-star', euclidean_heuristic(positions))]:
+        with collect_stats() as stats:
+            for start, end in queries(network):
+                shortest_path(start, end, algorithm=algorithm,
+                              heuristic=heuristic, save_to_cache=False)
+        expanded[algorithm] = stats.expanded
+    assert expanded['bidirectional'] < expanded['dijkstra']
+    assert expanded['a-star'] < expanded['bidirectional']
+
+
+def test_landmarks_on_integer_weights():
+    network = generate_network(60, edge_prob=0.1, seed=2)
+    heuristic = LandmarkHeuristic(network, 4, seed=0)
+    assert len(heuristic.landmarks) == 4
+    for start, end in queries(network, 20):
+        expected = shortest_path(start, end, save_to_cache=False)
+        assert heuristic(start, end) <= expected.weight
+        assert shortest_path(start, end, algorithm='bidirectional',
+                             heuristic=heuristic).weight == expected.weight
+
+
+def test_unreachable():
+    network = generate_geometric_network(80, 0.05, strongly_connected=False,
+                                         seed=3)
+    heuristic = LandmarkHeuristic(network, 4)
+    for start, end in queries(network, 20):
+        expected = shortest_path(start, end, save_to_cache=False)
+        for algorithm in ('bidirectional', 'a-star'):
+            path = shortest_path(start, end, algorithm=algorithm,
+                                 heuristic=heuristic, save_to_cache=False)
+            assert (path is None) == (expected is None)
+
+
+def test_a_star_needs_heuristic(geometric):
+    network, positions = geometric
+    start, end = queries(network, 1)[0]
+    with pytest.raises(ValueError):
+        shortest_path(start, end, algorithm='a-star')
+    with pytest.raises(ValueError):
+        shortest_path(start, end, heuristic=euclidean_heuristic(positions))
@@ -0,0 +1,87 @@
+import io
+import pytest
+import random
+from pynetworks import Network, Node
+from pynetworks import build_hierarchy, load_hierarchy, save_hierarchy
+from pynetworks import generate_geometric_network, generate_network
+from pynetworks import shortest_path
+
+
+def queries(network, n_queries=60, seed=0):
+    rng = random.Random(seed)
+    nodes = sorted(network, key=lambda node: node.name)
+    return [(rng.choice(nodes), rng.choice(nodes)) for _ in range(n_queries)]
+
+
+def check(hierarchy, network, pairs):
+    for start, end in pairs:
+        expected = shortest_path(start, end, save_to_cache=False)
+        path = hierarchy.shortest_path(start, end)
+        if expected is None:
+            assert path is None
+            assert hierarchy.distance(start, end) == float('inf')
+            continue
+        assert path.weight == pytest.approx(expected.weight)
+        assert hierarchy.distance(start, end) == pytest.approx(
+            expected.weight)
+        if start is end:
+            assert path == []
+            continue
+        assert path[0].node1 is start and path[-1].node2 is end
+        assert all(a.node2 is b.node1 for a, b in zip(path, path[1:]))
+
+
+@pytest.mark.parametrize('network', [
+    generate_network(80, edge_prob=0.08, seed=1),
+    generate_geometric_network(150, 0.15, seed=2),
+    generate_geometric_network(100, 0.1, strongly_connected=False, seed=3),
+])
+def test_queries_match_dijkstra(network):
+    hierarchy = build_hierarchy(network)
+    assert hierarchy.n_shortcuts > 0
+    check(hierarchy, network, queries(network))
+
+
+def test_paths_hold_original_edges():
+    a, b, c, d = (Node(name) for name in 'abcd')
+    a.connect(b, 1)
+    b.connect(c, 1)
+    c.connect(d, 1)
+    a.connect(d, 5)
+    b.connect(b, 0)  # self-loop
+    c.connect(b, 3)  # heavier parallel edge
+    network = Network([a, b, c, d])
+    path = build_hierarchy(network).shortest_path(a, d)
+    assert path == shortest_path(a, d)
+    originals = [edge for edge in network.edges]
+    assert all(any(edge.reverse() is original or edge is original
+                   for original in originals) for edge in path)
+
+
+def test_round_trip(tmp_path):
+    network = generate_network(60, edge_prob=0.1, seed=4)
+    file = tmp_path / 'network.ch'
+    save_hierarchy(build_hierarchy(network), file)
+    hierarchy = load_hierarchy(file)
+    graph = hierarchy.graph
+    assert isinstance(hierarchy.weights[0], int)
+    for start, end in queries(network, 20):
+        path = hierarchy.shortest_path(graph.node(start.name),
+                                       graph.node(end.name))
+        expected = shortest_path(start, end)
+        assert path.weight == expected.weight
+        if path:
+            assert path[-1].node2.name == end.name
+
+    buffer = io.BytesIO()
+    save_hierarchy(hierarchy, buffer)  # saved again from the mapped file
+    assert buffer.getvalue() == file.read_bytes()
+
+
+def test_load_rejects_other_files(tmp_path):
+    with pytest.raises(ValueError):
+        load_hierarchy(io.BytesIO(b'not a hierarchy file at all, really'))
+    file = tmp_path / 'network.ch'
+    save_hierarchy(build_hierarchy(generate_network(10, seed=5)), file)
+    with pytest.raises(ValueError):
+        load_hierarchy(io.BytesIO(file.read_bytes()[:-1]))
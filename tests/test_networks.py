@@ -1,3 +1,252 @@
+import copy
+import pickle
+import random
+from collections import Counter
 from pynetworks import Edge, Network, Node, generate_network
+from pynetworks import shortest_path
 import pytest
 
+
+def test_node_connect_and_disconnect():
+    a, b, c = Node('A'), Node('B'), Node('C')
+    a.connect(b, 2)
+    a.connect(c, 3)
+    assert a.edges == [Edge(a, b, 2), Edge(a, c, 3)]
+    assert b.edges == [Edge(b, a, 2)]
+    assert a.degree == 2
+    assert a.is_connected(b) and b.is_connected(a)
+    assert not b.is_connected(c)
+    assert a.weight_to(c) == 3
+    a.disconnect(b, 2)
+    assert a.edges == [Edge(a, c, 3)]
+    assert b.edges == []
+    assert not a.is_connected(b)
+    with pytest.raises(ValueError):
+        a.disconnect(b, 2)
+    with pytest.raises(KeyError):
+        a.weight_to(b)
+
+
+def test_node_parallel_edges():
+    a, b = Node('A'), Node('B')
+    a.connect(b, 1)
+    a.connect(b, 5)
+    assert a.degree == b.degree == 2
+    a.disconnect(b, 1)
+    assert a.edges == [Edge(a, b, 5)]
+    assert a.weight_to(b) == 5
+
+
+def test_node_reweight():
+    a, b = Node('A'), Node('B')
+    network = Network([a, b])
+    a.connect(b, 1)
+    a.connect(b, 5)
+    a.reweight(b, 2)  # the oldest edge
+    b.reweight(a, 7, old_weight=5)
+    assert a.edges == [Edge(a, b, 2), Edge(a, b, 7)]
+    assert b.edges == [Edge(b, a, 2), Edge(b, a, 7)]
+    assert network.edges == [Edge(a, b, 2), Edge(a, b, 7)]
+    with pytest.raises(ValueError):
+        a.reweight(b, 3, old_weight=5)
+    with pytest.raises(ValueError):
+        a.reweight(Node('C'), 3)
+
+
+def test_node_isolate():
+    a, b, c = Node('A'), Node('B'), Node('C')
+    a.connect(b, 1)
+    a.connect(c, 1)
+    b.connect(c, 1)
+    a.isolate()
+    assert a.edges == [] and a.degree == 0
+    assert b.edges == [Edge(b, c, 1)] and b.degree == 1
+    assert c.edges == [Edge(c, b, 1)]
+
+
+def test_network_str():
+    a, b, c = Node('A'), Node('B'), Node('C')
+    a.connect(b, 3)
+    assert str(Network([a, b, c])) == (
+        'graph {\n\t"C"\n\t"A" -- "B" [label=3]\n}')
+
+
+def test_network_tracks_changes():
+    a, b, c = Node('A'), Node('B'), Node('C')
+    network = Network([a, b, c], name='net')
+    assert network.isolated_nodes == {a, b, c}
+    a.connect(b, 1)
+    b.connect(c, 2)
+    assert network.edges == [Edge(a, b, 1), Edge(b, c, 2)]
+    assert network.isolated_nodes == set()
+    c.disconnect(b, 2)
+    assert network.edges == [Edge(a, b, 1)]
+    assert network.isolated_nodes == {c}
+    a.isolate()
+    assert network.edges == []
+    assert network.isolated_nodes == {a, b, c}
+
+
+def test_network_incremental_matches_update():
+    rng = random.Random(7)
+    nodes = [Node(i) for i in range(10)]
+    outside = Node('outside')
+    network = Network(nodes)
+    connections = []
+    for _ in range(200):
+        action = rng.random()
+        if action < 0.6 or not connections:
+            a, b = rng.choice(nodes), rng.choice(nodes + [outside])
+            weight = rng.randint(1, 3)
+            a.connect(b, weight)
+            connections.append((a, b, weight))
+        elif action < 0.9:
+            a, b, weight = connections.pop(rng.randrange(len(connections)))
+            b.disconnect(a, weight)
+        else:
+            node = rng.choice(nodes)
+            node.isolate()
+            connections = [con for con in connections if node not in con[:2]]
+    edges = network.edges
+    isolated_nodes = network.isolated_nodes
+    network.update()
+    assert Counter(map(_undirected, edges)) == Counter(
+        map(_undirected, network.edges))
+    assert len(edges) == len(connections)
+    assert isolated_nodes == network.isolated_nodes
+
+
+def _undirected(edge):
+    return frozenset([edge.node1, edge.node2]), edge.weight
+
+
+def test_edge_hash_differs_from_reverse():
+    a, b = Node('A'), Node('B')
+    assert Edge(a, b, 1) != Edge(b, a, 1)
+    assert len({hash(Edge(a, b, 1)), hash(Edge(b, a, 1))}) == 2
+
+
+def test_edges_are_shared_between_both_ends():
+    a, b = Node('A'), Node('B')
+    a.connect(b, 4)
+    forward, = a.edges
+    backward, = b.edges
+    assert not hasattr(forward, '__dict__') and not hasattr(a, '__dict__')
+    assert isinstance(backward, Edge)
+    assert backward == Edge(b, a, 4) and hash(backward) == hash(
+        Edge(b, a, 4))
+    assert backward.reverse() is forward
+    assert forward.reverse() == backward
+    backward.weight = 6
+    assert forward.weight == 6 and a.weight_to(b) == 6
+    b.disconnect(a, 6)
+    assert a.edges == [] and b.edges == []
+
+
+@pytest.mark.parametrize('protocol', range(pickle.HIGHEST_PROTOCOL + 1))
+def test_pickle(protocol):
+    a, b, c = Node('A'), Node('B'), Node('C')
+    a.connect(b, 2)
+    b.connect(c, 3)
+    network = Network([a, b, c], name='net')
+    path = shortest_path(c, a, save_to_cache=False)
+    copied, node, copied_path = pickle.loads(
+        pickle.dumps((network, a, path), protocol))
+    assert str(copied) == str(network)
+    assert copied.fingerprint == network.fingerprint
+    assert node in copied.all_nodes and node.name == 'A'
+    assert copied_path.weight == 5 and copied_path[-1].node2 is node
+    edge, = pickle.loads(pickle.dumps(a, protocol)).edges
+    assert (edge.node1.name, edge.node2.name, edge.weight) == ('A', 'B', 2)
+
+    # the copy follows changes like the original
+    d = Node('D')
+    node.connect(d, 1)
+    assert len(copied.edges) == 3 and len(network.edges) == 2
+    assert shortest_path(node, d, save_to_cache=False).weight == 1
+    copied_b = next(other for other in copied if other.name == 'B')
+    node.disconnect(copied_b, 2)
+    copied_b.connect(node, 4)
+    assert sorted(edge.weight for edge in copied.edges) == [1, 3, 4]
+    assert 'label=2' not in str(copied)
+    node.isolate()
+    assert copied.isolated_nodes == {node}
+    assert [edge.weight for edge in copied.edges] == [3]
+
+    deep = copy.deepcopy(network)
+    deep_a = next(other for other in deep if other.name == 'A')
+    deep_b = next(other for other in deep if other.name == 'B')
+    deep_a.disconnect(deep_b, 2)
+    deep_a.connect(deep_b, 4)
+    assert 'label=2' not in str(deep) and 'label=4' in str(deep)
+    assert deep.isolated_nodes == set()
+
+
+def test_dead_networks_are_forgotten():
+    a, b = Node('A'), Node('B')
+    a.connect(b, 1)
+    kept = [Network([a, b]) for _ in range(10)]
+    for _ in range(1000):
+        Network([a, b])
+    assert len(a._networks) <= 2 * len(kept) + 1
+    a.connect(Node('C'), 1)
+    assert all(len(network.edges) == 2 for network in kept)
+
+
+def test_node_edges_keep_connection_order():
+    a, b, c = Node('A'), Node('B'), Node('C')
+    a.connect(b, 1)
+    a.connect(c, 2)
+    a.connect(b, 3)
+    assert a.edges == [Edge(a, b, 1), Edge(a, c, 2), Edge(a, b, 3)]
+    assert [line.strip() for line in str(a).splitlines()[1:-1]] == [
+        '"A" -- "B" [label=1]', '"A" -- "C" [label=2]',
+        '"A" -- "B" [label=3]']
+    a.disconnect(b, 1)
+    b.connect(a, 4)
+    assert a.edges == [Edge(a, c, 2), Edge(a, b, 3), Edge(a, b, 4)]
+    copied = pickle.loads(pickle.dumps(a))
+    assert [edge.weight for edge in copied.edges] == [2, 3, 4]
+    c.isolate()
+    assert a.edges == [Edge(a, b, 3), Edge(a, b, 4)]
+
+
+def test_self_loop():
+    a = Node('A')
+    a.connect(a, 2)
+    assert a.edges == [Edge(a, a, 2), Edge(a, a, 2)] and a.degree == 2
+    network = Network([a])
+    assert network.edges == [Edge(a, a, 2)]
+    a.disconnect(a, 2)
+    assert a.edges == [] and network.edges == []
+    assert network.isolated_nodes == {a}
+
+
+def test_fingerprint():
+    def build(order):
+        nodes = {name: Node(name) for name in 'abcd'}
+        for name1, name2, weight in order:
+            nodes[name1].connect(nodes[name2], weight)
+        return Network(nodes.values()), nodes
+
+    links = [('a', 'b', 1), ('b', 'c', 2), ('c', 'd', 3), ('a', 'a', 4)]
+    network, nodes = build(links)
+    fingerprint = network.fingerprint
+    assert fingerprint == build(links[::-1])[0].fingerprint
+    assert fingerprint == build([(b, a, w) for a, b, w in links])[
+        0].fingerprint
+
+    nodes['a'].connect(nodes['c'], 5)
+    changed = network.fingerprint
+    assert changed != fingerprint
+    network.update()
+    assert network.fingerprint == changed  # kept up to date exactly
+    nodes['a'].disconnect(nodes['c'], 5)
+    assert network.fingerprint == fingerprint
+    nodes['b'].reweight(nodes['c'], 7)
+    assert network.fingerprint != fingerprint
+    nodes['b'].reweight(nodes['c'], 2)
+    assert network.fingerprint == fingerprint
+    nodes['d'].isolate()
+    assert network.fingerprint == build(links[:2] + links[3:])[
+        0].fingerprint
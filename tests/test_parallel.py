@@ -0,0 +1,47 @@
+import pytest
+import random
+from pynetworks import Network, iter_shortest_paths
+from pynetworks import parallel_shortest_paths, save_network, shortest_path
+
+
+@pytest.fixture
+def network(random_nodes):
+    nodes = random_nodes(40, edge_prob=0.1, seed=11)
+    nodes[0].connect(nodes[1], 20)  # parallel, heavier edge
+    nodes[0].connect(nodes[1], 1)
+    nodes[2].connect(nodes[2], 3)  # self-loop
+    return Network(nodes)
+
+
+@pytest.fixture
+def pairs(network):
+    rng = random.Random(12)
+    nodes = sorted(network, key=lambda node: node.name)
+    pairs = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(60)]
+    return pairs + [(nodes[0], node) for node in nodes]  # shared start
+
+
+def weights(paths):
+    return [None if path is None else path.weight for path in paths]
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_parallel_shortest_paths(network, pairs, workers):
+    paths = parallel_shortest_paths(pairs, network, workers=workers,
+                                    chunksize=16)
+    assert weights(paths) == weights(
+        shortest_path(start, end) for start, end in pairs)
+    for path, (start, end) in zip(paths, pairs):
+        if path:
+            assert path[0].node1 is start and path[-1].node2 is end
+
+
+def test_iter_shortest_paths_unordered(network, pairs, tmp_path):
+    file = tmp_path / 'network.bin'
+    graph = network.freeze()
+    save_network(graph, file)
+    results = dict(iter_shortest_paths(pairs, graph, workers=2, chunksize=7,
+                                       ordered=False, file=file))
+    assert sorted(results) == list(range(len(pairs)))
+    assert weights(results[i] for i in range(len(pairs))) == weights(
+        shortest_path(start, end) for start, end in pairs)
@@ -0,0 +1,264 @@
+import copy
+import itertools
+import pytest
+import random
+import time
+from pynetworks import Node, Path
+from pynetworks import approximate_path_through_network, path_exists
+from pynetworks import shortest_path, shortest_path_through_network
+from pynetworks import collect_stats, generate_network, shortest_paths_from
+from pynetworks import pathfinding, tours
+
+
+@pytest.fixture
+def diamond():
+    a, b, c, d = (Node(name) for name in 'ABCD')
+    a.connect(b, 1)
+    a.connect(c, 4)
+    b.connect(c, 1)
+    c.connect(d, 1)
+    b.connect(d, 5)
+    return a, b, c, d
+
+
+def test_shortest_path_dijkstra(diamond):
+    a, b, c, d = diamond
+    path = shortest_path(a, d)
+    assert path.weight == 3
+    assert [edge.node2 for edge in path] == [b, c, d]
+
+
+def test_path_weight_follows_changes(diamond):
+    a, b, c, d = diamond
+    path = shortest_path(a, d, algorithm='depth-first', save_to_cache=False)
+    assert path.weight == 3
+    edge = path.pop()
+    assert path.weight == 2
+    path.append(edge)
+    assert path.weight == 3
+    assert (path + path).weight == 6
+    edge.weight = 100
+    assert path.weight == 102
+    path[0] = path[2]
+    assert path.weight == 201
+
+
+def test_path_weight_of_copies(diamond):
+    a, _, _, d = diamond
+    path = shortest_path(a, d, algorithm='depth-first', save_to_cache=False)
+    assert path.weight == 3
+    assert copy.copy(path).weight == 3
+    assert copy.deepcopy(path).weight == 3
+    assert isinstance(copy.copy(path), Path)
+
+
+def test_shortest_path_to_self(diamond):
+    a = diamond[0]
+    assert shortest_path(a, a) == []
+
+
+def test_shortest_path_unreachable(diamond):
+    assert shortest_path(diamond[0], Node('E')) is None
+
+
+def test_shortest_path_unknown_algorithm(diamond):
+    a, _, _, d = diamond
+    with pytest.raises(ValueError):
+        shortest_path(a, d, algorithm='magic')
+
+
+def test_shortest_path_algorithms_agree(random_nodes):
+    nodes = random_nodes(8)
+    for start in nodes:
+        for end in nodes:
+            dijkstra = shortest_path(start, end, save_to_cache=False)
+            depth_first = shortest_path(start, end, algorithm='depth-first',
+                                        save_to_cache=False)
+            assert dijkstra.weight == depth_first.weight
+
+
+def brute_force_tour_weight(start, nodes):
+    others = [node for node in nodes if node is not start]
+    best = None
+    for order in itertools.permutations(others):
+        weight = 0
+        for a, b in zip((start,) + order, order):
+            weight += shortest_path(a, b).weight
+        if best is None or weight < best:
+            best = weight
+    return best
+
+
+@pytest.mark.parametrize('use_numpy', [True, False])
+def test_shortest_path_through_network_held_karp(monkeypatch, use_numpy,
+                                                 random_nodes):
+    if not use_numpy:
+        monkeypatch.setattr(tours, 'numpy', None)
+    elif tours.numpy is None:
+        pytest.skip('numpy is not installed')
+    nodes = random_nodes(7, edge_prob=0.4, seed=3)
+    path = shortest_path_through_network(nodes[0], set(nodes),
+                                         save_to_cache=False)
+    assert path.weight == brute_force_tour_weight(nodes[0], nodes)
+    assert path[0].node1 is nodes[0]
+    assert {edge.node2 for edge in path} >= set(nodes[1:])
+    for edge, next_edge in zip(path, path[1:]):
+        assert edge.node2 is next_edge.node1
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_shortest_path_through_network_branch_and_bound(workers, random_nodes):
+    for seed in range(4):
+        nodes = random_nodes(9, edge_prob=0.6, seed=seed)
+        path = shortest_path_through_network(
+            nodes[0], set(nodes), algorithm='branch-and-bound',
+            workers=workers, save_to_cache=False)
+        exact = shortest_path_through_network(nodes[0], set(nodes),
+                                              save_to_cache=False)
+        assert path.weight == exact.weight
+        assert {edge.node2 for edge in path} >= set(nodes[1:])
+    a = Node('A')
+    assert shortest_path_through_network(
+        a, {a}, algorithm='branch-and-bound') == []
+
+
+def test_shortest_path_through_network_disconnected():
+    a, b = Node('A'), Node('B')
+    assert shortest_path_through_network(a, {a, b}) is None
+
+
+def test_approximate_path_through_network_bounds(random_nodes):
+    nodes = random_nodes(9, edge_prob=0.4, seed=5)
+    exact = shortest_path_through_network(nodes[0], set(nodes))
+    estimate = approximate_path_through_network(nodes[0], set(nodes))
+    assert estimate.lower_bound <= exact.weight <= estimate.path.weight
+    assert estimate.gap == pytest.approx(
+        (estimate.path.weight - estimate.lower_bound)
+        / estimate.lower_bound)
+
+
+def test_approximate_path_through_network_budget(random_nodes):
+    nodes = random_nodes(80, edge_prob=0.1, seed=1)
+    start = time.perf_counter()
+    estimate = approximate_path_through_network(
+        nodes[0], set(nodes), time_budget=0.05)
+    assert time.perf_counter() - start < 2
+    visited = {edge.node2 for edge in estimate.path}
+    assert visited | {nodes[0]} == set(nodes)
+    untuned = approximate_path_through_network(
+        nodes[0], set(nodes), max_iterations=0)
+    assert estimate.path.weight <= untuned.path.weight
+
+
+@pytest.mark.parametrize('n_nodes, edge_prob',
+                         [(1000, 0.005), (10000, 0.0004)])
+def test_approximate_path_through_network_budget_covers_everything(
+        n_nodes, edge_prob):
+    network = generate_network(n_nodes, edge_prob=edge_prob, seed=1)
+    first = next(iter(network))
+    start = time.perf_counter()
+    estimate = approximate_path_through_network(first, network,
+                                                time_budget=0.1)
+    assert time.perf_counter() - start < 0.1 + 0.5
+    path = estimate.path
+    assert path[0].node1 is first
+    for edge, next_edge in zip(path, path[1:]):
+        assert edge.node2 is next_edge.node1
+    assert {edge.node2 for edge in path} | {first} == network.all_nodes
+    assert 0 < estimate.lower_bound <= path.weight
+
+
+def test_shortest_path_through_network_heuristic(random_nodes):
+    nodes = random_nodes(6, seed=2, strongly_connected=True)
+    path = shortest_path_through_network(nodes[0], set(nodes),
+                                         algorithm='heuristic')
+    assert path.weight >= shortest_path_through_network(
+        nodes[0], set(nodes)).weight
+
+
+def test_shortest_paths_from(diamond):
+    a, b, c, d = diamond
+    outsider = Node('E')
+    tree = shortest_paths_from(a)
+    assert tree.distances == {a: 0, b: 1, c: 2, d: 3}
+    assert set(tree) == {a, b, c, d}
+    assert tree[d] == shortest_path(a, d, save_to_cache=False)
+    assert tree.path(outsider) is None
+    assert tree.distance(outsider) == float('inf')
+    assert outsider not in tree
+    with pytest.raises(KeyError):
+        tree[outsider]
+
+
+def test_shortest_paths_from_feeds_shortest_path(diamond, monkeypatch):
+    a, _, _, d = diamond
+    tree = shortest_paths_from(a)
+
+    def fail(*args, **kwargs):
+        raise AssertionError('searched again')
+    monkeypatch.setattr(pathfinding, '_dijkstra', fail)
+    assert shortest_path(a, d).weight == tree.distance(d)
+
+
+def test_long_chain_does_not_recurse():
+    nodes = [Node(i) for i in range(100_000)]
+    for node, next_node in zip(nodes, nodes[1:]):
+        node.connect(next_node, 1)
+    start, end = nodes[0], nodes[-1]
+    assert shortest_path(start, end).weight == 99_999
+    assert shortest_path(start, end, algorithm='depth-first').weight == 99_999
+    assert path_exists(start, end)
+    path = shortest_path_through_network(start, set(nodes),
+                                         algorithm='depth-first')
+    assert path.weight == 99_999
+
+
+def test_dynamic_tree_follows_changes(random_nodes):
+    rng = random.Random(3)
+    nodes = random_nodes(40, edge_prob=0.1, seed=3)
+    tree = shortest_paths_from(nodes[0], dynamic=True)
+    for _ in range(300):
+        node = rng.choice(nodes)
+        change = rng.random()
+        if change < 0.3 or not node.degree:
+            node.connect(rng.choice(nodes), rng.randint(1, 10))
+            continue
+        edge = rng.choice(node.edges)
+        if change < 0.6:
+            node.disconnect(edge.node2, edge.weight)
+        elif change < 0.95:
+            node.reweight(edge.node2, rng.randint(0, 12), edge.weight)
+        else:
+            node.isolate()
+        expected = shortest_paths_from(nodes[0])
+        assert tree.distances == expected.distances
+        end = rng.choice(nodes)
+        path = tree.path(end)
+        assert (float('inf') if path is None
+                else path.weight) == expected.distance(end)
+
+
+def test_dynamic_tree_repairs_locally():
+    network = generate_network(2000, edge_prob=0.003, seed=4)
+    start = min(network, key=lambda node: node.name)
+    tree = shortest_paths_from(start, dynamic=True)
+    edge = tree.path(max(tree, key=tree.distance))[-1]
+    with collect_stats() as stats:
+        edge.node1.disconnect(edge.node2, edge.weight)
+        edge.node1.connect(edge.node2, edge.weight)
+        edge.node1.reweight(edge.node2, edge.weight + 1)
+    assert stats.expanded < len(tree) / 10
+    assert shortest_path(start, edge.node2).weight == tree.distance(
+        edge.node2)
+
+
+def test_dynamic_tree_ignores_unweighted_edges(diamond):
+    a, b, c, d = diamond
+    tree = shortest_paths_from(a, dynamic=True)
+    e, f = Node('E'), Node('F')
+    e.connect(f)
+    b.connect(e)
+    b.disconnect(e)
+    e.isolate()
+    assert e.degree == f.degree == 0
+    assert tree.distance(d) == 3
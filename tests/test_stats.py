@@ -0,0 +1,66 @@
+import pytest
+from pynetworks import Node, collect_stats, path_exists, shortest_path
+from pynetworks import add_stats_callback, remove_stats_callback
+from pynetworks import shortest_paths_from
+from pynetworks import stats
+
+
+@pytest.fixture
+def square():
+    a, b, c, d = Node('A'), Node('B'), Node('C'), Node('D')
+    a.connect(b, 1)
+    b.connect(d, 1)
+    a.connect(c, 5)
+    c.connect(d, 5)
+    shortest_path.cache_clear()
+    return a, b, c, d
+
+
+def test_collect_stats(square):
+    a, b, c, d = square
+    assert not stats._enabled
+    with collect_stats() as collected:
+        assert stats._enabled
+        shortest_path(a, d)
+        shortest_path(a, d)
+        shortest_path(a, d, algorithm='depth-first', save_to_cache=False)
+    assert not stats._enabled
+    shortest_path(a, c)  # not collected
+    assert collected.n_calls == 3
+    first, second, third = collected.calls
+    assert first.function == 'shortest_path'
+    assert first.arguments == (a, d)
+    assert (first.cache_hit, second.cache_hit, third.cache_hit) == (
+        False, True, None)
+    assert first.expanded > 0 and second.expanded == 0
+    assert third.pruned > 0
+    assert collected.cache_hits == 1 and collected.cache_misses == 1
+    assert collected.hit_rate == 0.5
+    assert collected.expanded == first.expanded + third.expanded
+    assert collected.seconds >= first.seconds
+
+
+def test_incomplete_and_uncached_searches(square):
+    a, b, c, d = square
+    with collect_stats(keep_calls=False) as collected:
+        shortest_path(a, d, algorithm='depth-first', _best_path_weight=1)
+        shortest_paths_from(a)
+    assert collected.calls == []
+    assert collected.n_calls == 1
+    assert collected.incomplete == 1
+    assert collected.expanded == 1 + 4  # depth-first start, then the tree
+
+
+def test_callbacks(square):
+    a, b, c, d = square
+    calls = []
+    add_stats_callback(calls.append)
+    try:
+        path_exists(a, d)
+    finally:
+        remove_stats_callback(calls.append)
+    path_exists(a, d)
+    assert [call.function for call in calls] == ['path_exists']
+    assert not stats._enabled
+    with pytest.raises(ValueError):
+        remove_stats_callback(calls.append)
@@ -0,0 +1,92 @@
+import io
+import pytest
+from pynetworks import Network, Node
+from pynetworks import load_network, save_network, shortest_path
+from pynetworks import all_pairs_shortest_paths, shortest_paths_from
+from pynetworks import shortest_path_through_network
+
+
+@pytest.fixture
+def network(random_nodes):
+    nodes = random_nodes(15, edge_prob=0.3, seed=7)
+    nodes[0].connect(nodes[0], 3)  # self-loop
+    return Network(nodes + [Node('lonely')], name='saved')
+
+
+def test_round_trip(network, tmp_path):
+    file = tmp_path / 'network.bin'
+    save_network(network, file)
+    graph = load_network(file)
+    assert graph.name == 'saved'
+    assert len(graph) == len(network.all_nodes)
+    assert {node.name for node in graph} == {
+        node.name for node in network}
+    assert isinstance(graph.weights[0], int)
+    for node in network:
+        loaded = graph.node(node.name)
+        i = graph.index(loaded)
+        edges = [graph.edge(slot)
+                 for slot in range(graph.offsets[i], graph.offsets[i + 1])]
+        assert [(edge.node1.name, edge.node2.name, edge.weight)
+                for edge in edges] == [
+            (edge.node1.name, edge.node2.name, edge.weight)
+            for edge in node.edges]
+
+
+def test_queries_on_mapped_file(network, tmp_path):
+    file = tmp_path / 'network.bin'
+    save_network(network, file)
+    graph = load_network(file)
+    assert not graph.nodes._made  # nothing built by loading
+    start = next(iter(network))
+    tree = shortest_paths_from(graph.node(start.name), graph=graph)
+    for node in network:
+        expected = shortest_path(start, node)
+        path = tree.path(graph.node(node.name))
+        if expected is None:
+            assert path is None
+        else:
+            assert path.weight == expected.weight
+    matrix = all_pairs_shortest_paths(graph)
+    a, b = graph.node('Node 1'), graph.node('Node 2')
+    assert matrix.distance(a, b) == shortest_path(a, b, graph=graph).weight
+
+
+def test_tours_on_loaded_network(tmp_path):
+    nodes = [Node(f'n{i}') for i in range(6)]
+    for i, node in enumerate(nodes):
+        node.connect(nodes[i - 1], i + 1)  # a ring
+    file = tmp_path / 'network.bin'
+    save_network(Network(nodes), file)
+    graph = load_network(file)
+    start = graph.node('n0')
+    weights = {algorithm: shortest_path_through_network(
+        start, graph, algorithm=algorithm, save_to_cache=False).weight
+        for algorithm in ('held-karp', 'branch-and-bound', 'heuristic')}
+    assert weights == dict.fromkeys(weights, 16)
+
+
+def test_float_weights_and_file_objects():
+    a, b = Node('a'), Node('b')
+    a.connect(b, 0.5)
+    buffer = io.BytesIO()
+    save_network(Network([a, b]), buffer)
+    buffer.seek(0)
+    graph = load_network(buffer)
+    assert graph.weights[0] == 0.5
+    assert shortest_path(graph.node('a'), graph.node('b'),
+                         graph=graph).weight == 0.5
+
+
+def test_invalid_files(tmp_path):
+    with pytest.raises(ValueError):
+        load_network(io.BytesIO(b'not a network file at all, sorry, no'))
+    a, b = Node('a'), Node('b')
+    a.connect(b, 1)
+    buffer = io.BytesIO()
+    save_network(Network([a, b]), buffer)
+    with pytest.raises(ValueError):
+        load_network(io.BytesIO(buffer.getvalue()[:-3]))
+    a.connect(b, 'heavy')
+    with pytest.raises(TypeError):
+        save_network(Network([a, b]), io.BytesIO())